@@ -0,0 +1,208 @@
+import sqlite3
+import time
+from itertools import chain, islice
+from typing import Any, Callable, Iterable, List, Optional, Sequence, Tuple, Type
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import Model
+
+# The amount of multi row statements sent on each `executemany` call
+STATEMENTS_PER_BATCH = 64
+
+# Bigger statements take longer to compile than what they save on execution
+MAX_ROWS_PER_STATEMENT = 100
+
+
+def max_query_params(using: str = DEFAULT_DB_ALIAS) -> int:
+    """
+    The maximum amount of parameters a single statement can have in the database.
+    For SQLite it asks the connection for its `SQLITE_LIMIT_VARIABLE_NUMBER`,
+    which is 999 in old builds and 32766 since SQLite 3.32.
+
+    Args:
+        using (str): The alias of the database.
+
+    Returns:
+        int: The maximum amount of parameters of a statement.
+    """
+
+    connection = connections[using]
+    connection.ensure_connection()
+    if connection.vendor == "sqlite" and hasattr(connection.connection, "getlimit"):
+        return connection.connection.getlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER)
+
+    return connection.features.max_query_params or 65535
+
+
+class BulkLoader:
+    """
+    Writes plain rows of values into the table of a model, bypassing the ORM.
+
+    Rows are grouped into multi row `INSERT` statements as big as the variable limit
+    of the database allows (up to `MAX_ROWS_PER_STATEMENT`), sent with `executemany` in batches of tuples and committed
+    every `commit_every` rows. It is meant to be used as a context manager:
+
+        with BulkLoader(GenericData, ["column", "row", "string_value"]) as loader:
+            loader.load(rows)
+
+    Notice that inside an already open transaction the commits become savepoints,
+    so the whole load is still committed (or rolled back) by the outer transaction.
+    Each transaction is only opened by the first insert after a commit, so no lock is
+    held while the caller prepares the next rows after a `commit`.
+    """
+
+    def __init__(
+        self,
+        model: Type[Model],
+        fields: Sequence[str],
+        commit_every: Optional[int] = None,
+        on_progress: Optional[Callable[[int], None]] = None,
+        using: str = DEFAULT_DB_ALIAS,
+    ):
+        """
+        Args:
+            model (Type[Model]): The model whose table is loaded.
+            fields (Sequence[str]): The model fields of each row, in the order of the row values.
+            commit_every (Optional[int]): The amount of rows per commit. Defaults to `INGEST_COMMIT_ROWS`.
+            on_progress (Optional[Callable[[int], None]]): Called with the total of loaded rows after each commit.
+            using (str): The alias of the database.
+        """
+
+        self.model = model
+        self.using = using
+        self.commit_every = commit_every or settings.INGEST_COMMIT_ROWS
+        self.on_progress = on_progress
+
+        self.db_columns = [model._meta.get_field(field).column for field in fields]
+        self.rows_per_statement = max(
+            1, min(MAX_ROWS_PER_STATEMENT, max_query_params(using) // len(fields))
+        )
+        self.batch_rows = self.rows_per_statement * STATEMENTS_PER_BATCH
+
+        self.rows_loaded = 0
+        self.rows_since_commit = 0
+        self.elapsed = 0.0
+        self._atomic = None
+        self._entered = False
+        self._start_time = 0.0
+
+    def insert_sql(self, num_of_rows: int) -> str:
+        """
+        Builds the `INSERT` statement of `num_of_rows` rows.
+
+        Args:
+            num_of_rows (int): The amount of rows in the `VALUES` clause.
+
+        Returns:
+            sql (str): The statement with `%s` placeholders.
+        """
+
+        ops = connections[self.using].ops
+        placeholders = f"({', '.join(['%s'] * len(self.db_columns))})"
+        return (
+            f"INSERT INTO {ops.quote_name(self.model._meta.db_table)} "
+            f"({', '.join(ops.quote_name(column) for column in self.db_columns)}) "
+            f"VALUES {', '.join([placeholders] * num_of_rows)}"
+        )
+
+    @property
+    def rows_per_second(self) -> float:
+        """The load throughput, counting only the time spent inside the loader."""
+        return self.rows_loaded / self.elapsed if self.elapsed else 0.0
+
+    def __enter__(self) -> "BulkLoader":
+        self._start_time = time.time()
+        self._entered = True
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> bool:
+        if self._atomic is not None:
+            self._atomic.__exit__(exc_type, exc_value, traceback)
+            self._atomic = None
+        self._entered = False
+        self.elapsed += time.time() - self._start_time
+
+        if exc_type is None:
+            print(
+                f"Loaded {self.rows_loaded} rows into {self.model._meta.db_table} "
+                f"in {self.elapsed * 1000:.4f} ms ({self.rows_per_second:.0f} rows/s)."
+            )
+
+        return False
+
+    def _begin(self) -> None:
+        self._atomic = transaction.atomic(using=self.using)
+        self._atomic.__enter__()
+
+    def commit(self) -> None:
+        """Commits the rows inserted since the last commit, if any."""
+
+        if self._atomic is None:
+            return
+
+        self._atomic.__exit__(None, None, None)
+        self._atomic = None
+        self.rows_since_commit = 0
+        if self.on_progress is not None:
+            self.on_progress(self.rows_loaded)
+
+    def load(self, rows: Iterable[Tuple[Any, ...]]) -> int:
+        """
+        Inserts the rows, committing whenever `commit_every` rows were inserted since the last commit.
+
+        Args:
+            rows (Iterable[Tuple[Any, ...]]): The rows to insert, each one with a value per field.
+
+        Returns:
+            loaded (int): The amount of inserted rows.
+        """
+
+        if not self._entered:
+            raise RuntimeError("BulkLoader must be used as a context manager")
+
+        rows = iter(rows)
+        loaded = 0
+        while True:
+            # Never go past the next commit
+            batch_size = min(
+                self.batch_rows, self.commit_every - self.rows_since_commit
+            )
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                break
+
+            if self._atomic is None:
+                self._begin()
+
+            self._execute(batch)
+            loaded += len(batch)
+            self.rows_loaded += len(batch)
+            self.rows_since_commit += len(batch)
+
+            if self.rows_since_commit >= self.commit_every:
+                self.commit()
+
+        return loaded
+
+    def _execute(self, batch: List[Tuple[Any, ...]]) -> None:
+        """Sends a batch of rows as full statements plus one statement for the remainder."""
+
+        step = self.rows_per_statement
+        full = len(batch) - len(batch) % step
+
+        with connections[self.using].cursor() as cursor:
+            if full:
+                cursor.executemany(
+                    self.insert_sql(step),
+                    (
+                        tuple(chain.from_iterable(batch[start : start + step]))
+                        for start in range(0, full, step)
+                    ),
+                )
+            if full < len(batch):
+                remainder = batch[full:]
+                cursor.execute(
+                    self.insert_sql(len(remainder)),
+                    tuple(chain.from_iterable(remainder)),
+                )
@@ -0,0 +1,198 @@
+import hashlib
+import json
+from typing import Dict, Optional, Tuple
+
+from django.core.files.uploadedfile import UploadedFile
+from django.db import transaction
+from django.db.models import F
+
+from ..models.file_alias_model import FileAlias
+from ..models.upload_digest_model import UploadDigest
+from ..storage.engines import delete_files
+from ..utils import generate_file_id, generate_sheet_file_ids
+
+
+def normalize_force_casting(force_casting: Dict[str, str]) -> Dict[str, str]:
+    """
+    The force casting options in a canonical form, sorted by column and without the
+    surrounding spaces of the values, so equivalent forms give the same digest.
+
+    Args:
+        force_casting (Dict[str, str]): The dictionary of force casting options.
+
+    Returns:
+        Dict[str, str]: The normalized options.
+    """
+
+    return {col: force_casting[col].strip() for col in sorted(force_casting)}
+
+
+def new_digest(extension: str, force_casting: Dict[str, str]) -> "hashlib._Hash":
+    """
+    Starts the digest of an upload with everything that changes how it is stored:
+    its extension and its normalized force casting options. The bytes of the upload follow.
+
+    Args:
+        extension (str): The already validated extension of the file.
+        force_casting (Dict[str, str]): The dictionary of force casting options.
+
+    Returns:
+        hashlib._Hash: The SHA-256 hash, to be updated with the bytes of the upload.
+    """
+
+    options = json.dumps(
+        [extension, normalize_force_casting(force_casting)], separators=(",", ":")
+    )
+    return hashlib.sha256(options.encode())
+
+
+def upload_digest(
+    file: UploadedFile, extension: str, force_casting: Dict[str, str]
+) -> str:
+    """
+    Hashes an upload, see `new_digest`. The file is read in chunks, so uploads
+    spooled to disk are not loaded into memory, and left at its start.
+
+    Args:
+        file (UploadedFile): The uploaded file.
+        extension (str): The already validated extension of the file.
+        force_casting (Dict[str, str]): The dictionary of force casting options.
+
+    Returns:
+        digest (str): The hexadecimal SHA-256 digest of the upload.
+    """
+
+    digest = new_digest(extension, force_casting)
+    for chunk in file.chunks():
+        digest.update(chunk)
+
+    file.seek(0)
+    return digest.hexdigest()
+
+
+def claim_duplicate(
+    digest: str, name: str, extension: str
+) -> Optional[Tuple[Dict[Optional[str], str], Dict[Optional[str], Dict[str, str]]]]:
+    """
+    Looks for an upload with the same digest whose files are all stored.
+    When there is one, the new upload gets its own `FileAlias` of every file and
+    a new reference to it, so the files survive the delete of the upload that stored them.
+
+    Args:
+        digest (str): The digest of the new upload.
+        name (str): The name of the uploaded file without its extension.
+        extension (str): The extension of the uploaded file.
+
+    Returns:
+        Optional[Tuple]: None if there is no identical upload, otherwise a tuple containing:
+            - file_ids (Dict[Optional[str], str]): The alias of each sheet by name,
+                or of the whole file under None, in sheet order.
+            - errors (Dict[Optional[str], Dict[str, str]]): The force casting errors, like `file_ids`.
+    """
+
+    with transaction.atomic():
+        stored = list(UploadDigest.objects.filter(digest=digest).order_by("id"))
+        if not stored or len(stored) != stored[0].sheets:
+            return None
+
+        if stored[0].sheet_name is None:
+            aliases = {None: generate_file_id(name, extension)}
+        else:
+            aliases = generate_sheet_file_ids(
+                name, extension, [file.sheet_name for file in stored]
+            )
+
+        UploadDigest.objects.filter(digest=digest).update(
+            references=F("references") + 1
+        )
+        FileAlias.objects.bulk_create(
+            FileAlias(alias=aliases[file.sheet_name], file_id=file.file_id)
+            for file in stored
+        )
+
+    return aliases, {file.sheet_name: file.errors for file in stored}
+
+
+def register_upload(
+    digest: str,
+    file_id: str,
+    errors: Dict[str, str],
+    sheet_name: Optional[str] = None,
+    sheets: int = 1,
+) -> None:
+    """
+    Records a stored file under the digest of its upload, so identical uploads reuse it,
+    and gives the upload its `FileAlias`. It must only be called once the file is
+    completely stored.
+
+    When an identical upload stored the same file meanwhile, like two background
+    jobs of the same file, the file is not recorded twice: the upload gets a reference
+    to the file already recorded and its own copy is deleted.
+
+    Args:
+        digest (str): The digest of the upload.
+        file_id (str): The id of the stored file.
+        errors (Dict[str, str]): The force casting errors of the file.
+        sheet_name (Optional[str]): The sheet the file was stored from, if it is a workbook.
+        sheets (int): The amount of sheets of the upload.
+    """
+
+    with transaction.atomic():
+        stored, created = UploadDigest.objects.get_or_create(
+            digest=digest,
+            sheet_name=sheet_name,
+            defaults={"file_id": file_id, "sheets": sheets, "errors": errors},
+        )
+        if not created:
+            UploadDigest.objects.filter(id=stored.id).update(
+                references=F("references") + 1
+            )
+
+        FileAlias.objects.create(alias=file_id, file_id=stored.file_id)
+
+    if stored.file_id != file_id:
+        delete_files([file_id])
+
+
+def release_file(file_id: str) -> bool:
+    """
+    Drops the reference of an upload to its stored file, deleting the data of the
+    file with the last one. Only the `FileAlias` the upload got is dropped, so an id
+    can not release the references of other uploads. Files without aliases, still
+    being ingested, are deleted right away.
+
+    Args:
+        file_id (str): The `file_id` the upload got.
+
+    Returns:
+        bool: Whether the upload still had its reference.
+    """
+
+    with transaction.atomic():
+        file_alias = FileAlias.objects.filter(alias=file_id).first()
+        if file_alias is None:
+            if FileAlias.objects.filter(file_id=file_id).exists():
+                # A shared file whose first upload already dropped its reference
+                return False
+
+            return delete_files([file_id]) > 0
+
+        file_alias.delete()
+        stored_id = file_alias.file_id
+        stored = UploadDigest.objects.filter(file_id=stored_id).first()
+
+        if FileAlias.objects.filter(file_id=stored_id).exists():
+            if stored is not None:
+                UploadDigest.objects.filter(id=stored.id).update(
+                    references=F("references") - 1
+                )
+            return True
+
+        if stored is not None:
+            stored.delete()
+            # The other sheets of the workbook stay, but it can no longer be reused whole
+            UploadDigest.objects.filter(digest=stored.digest).update(digest="")
+
+        delete_files([stored_id])
+
+    return True
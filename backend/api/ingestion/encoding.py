@@ -0,0 +1,177 @@
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+
+# The sign bit of a 64 bit sort key
+SIGN_BIT = np.uint64(1 << 63)
+
+
+def encode_strings(data: pd.Series) -> List[Any]:
+    """
+    Encodes a column the same way a `CharField` prepares its values,
+    `None` is kept as `NULL` and anything else becomes its `str`.
+
+    Args:
+        data (pd.Series): The column to encode.
+
+    Returns:
+        List[Any]: The `string_value` of every cell.
+    """
+
+    values = data.to_numpy(dtype=object)
+    strings = data.astype(str).to_numpy(dtype=object)
+    strings[values == None] = None  # noqa: E711 (elementwise comparison)
+    return strings.tolist()
+
+
+def encode_datetimes(data: pd.Series) -> List[Any]:
+    """
+    Encodes a naive datetime column as the UTC text the SQLite backend of `Django`
+    stores for a `DateTimeField`, that is `str(datetime)` without the time zone.
+
+    Args:
+        data (pd.Series): The column to encode.
+
+    Returns:
+        List[Any]: The `datetime_value` of every cell, `None` for `NaT`.
+    """
+
+    # `str(datetime)` only shows the microseconds when there are some
+    microseconds = data.dt.microsecond.fillna(0).astype(int)
+    fractions = ("." + microseconds.astype(str).str.zfill(6)).where(
+        microseconds != 0, ""
+    )
+    strings = data.dt.strftime("%Y-%m-%d %H:%M:%S") + fractions
+
+    return strings.astype(object).where(data.notna(), None).tolist()
+
+
+def sort_key_bytes(keys: np.ndarray, nulls: np.ndarray) -> List[Any]:
+    """
+    Packs unsigned 64 bit sort keys as 8 big endian bytes, which compare like the keys.
+
+    Args:
+        keys (np.ndarray): The `uint64` key of every cell.
+        nulls (np.ndarray): Whether each cell is null, its key is `None`.
+
+    Returns:
+        List[Any]: The `sort_key` of every cell.
+    """
+
+    packed = keys.astype(">u8").tobytes()
+    return [
+        None if null else packed[i * 8 : (i + 1) * 8] for i, null in enumerate(nulls)
+    ]
+
+
+def encode_sort_keys(data: pd.Series, dtype: str) -> List[Any]:
+    """
+    Encodes a whole column into the `sort_key` of its cells: bytes that compare,
+    byte by byte, in the same order as the values. Integers sort by their signed value,
+    complex numbers by their magnitude, datetimes by their epoch and timedeltas by
+    their nanoseconds, and texts by their UTF-8 bytes, the binary collation of the
+    database. Nulls have no key, so they sort first when ascending and last when descending.
+
+    Args:
+        data (pd.Series): The converted column to encode.
+        dtype (str): The `col_type` of the column.
+
+    Returns:
+        List[Any]: The `sort_key` of every cell.
+    """
+
+    if dtype in {"object", "category"}:
+        return [
+            None if string is None else string.encode()
+            for string in encode_strings(data)
+        ]
+
+    values = data.to_numpy()
+    nulls = data.isna().to_numpy()
+
+    if dtype.startswith("uint"):
+        return sort_key_bytes(values.astype(np.uint64), nulls)
+
+    if dtype.startswith("int") or dtype in {"datetime64[ns]", "timedelta64[ns]"}:
+        if dtype == "datetime64[ns]":
+            # The database keeps microseconds, equal datetimes there must be equal here
+            signed = values.view(np.int64) // 1000
+        elif dtype == "timedelta64[ns]":
+            signed = values.view(np.int64)
+        else:
+            signed = values.astype(np.int64)
+
+        # Flipping the sign bit puts the negative numbers before the positive ones
+        return sort_key_bytes(signed.view(np.uint64) ^ SIGN_BIT, nulls)
+
+    if dtype.startswith(("float", "complex")):
+        if dtype.startswith("complex"):
+            # The squared magnitude, which the magnitude is sorted by
+            values = values.real**2 + values.imag**2
+
+        # Adding zero turns -0.0 into 0.0, they are equal
+        bits = (values.astype(np.float64) + 0.0).view(np.uint64)
+
+        # Negative floats sort backwards, all their bits are flipped
+        negative = (bits & SIGN_BIT) != 0
+        keys = np.where(negative, ~bits, bits | SIGN_BIT)
+        return sort_key_bytes(keys, nulls)
+
+    if dtype == "bool":
+        return sort_key_bytes(values.astype(np.uint64), nulls)
+
+    return [None] * len(data)
+
+
+def encode_column(data: pd.Series, dtype: str) -> Dict[str, List[Any]]:
+    """
+    Encodes a whole column into the `GenericData` fields used by its dtype,
+    see `IMPORTANT_KEYS_BY_DTYPE`. Every conversion is done once per column with
+    `numpy` and `pandas` operations instead of once per cell.
+
+    Args:
+        data (pd.Series): The converted column to encode.
+        dtype (str): The `col_type` of the column.
+
+    Returns:
+        encoded (Dict[str, List[Any]]):
+            The python values of every cell for each used field.
+            The fields that are not used by the dtype are not present.
+    """
+
+    if dtype in {"object", "category"}:
+        return {"string_value": encode_strings(data)}
+
+    values = data.to_numpy()
+
+    if dtype.startswith("uint"):
+        return {"uint_value": values.tolist()}
+
+    if dtype.startswith("int"):
+        signed = values.astype(np.int64)
+        return {
+            "uint_value": np.abs(signed).tolist(),
+            "int_sign_value": np.where(signed >= 0, 1, -1).tolist(),
+        }
+
+    if dtype.startswith("float"):
+        return {"double_value": values.astype(np.float64).tolist()}
+
+    if dtype.startswith("complex"):
+        return {
+            "double_value": values.real.tolist(),
+            "double_imag_value": values.imag.tolist(),
+        }
+
+    if dtype == "datetime64[ns]":
+        return {"datetime_value": encode_datetimes(data)}
+
+    if dtype == "timedelta64[ns]":
+        # The same as `pd.Timedelta.value`, the nanoseconds of the timedelta
+        return {"uint_value": values.view(np.int64).tolist()}
+
+    if dtype == "bool":
+        return {"bool_value": values.tolist()}
+
+    return {}
@@ -0,0 +1,69 @@
+import hashlib
+import io
+import time
+from pathlib import Path
+
+from django.conf import settings
+
+from ..models.chunked_upload_model import ChunkedUpload
+
+
+class GrowingFile(io.RawIOBase):
+    """
+    Reads the spooled copy of a resumable upload while its chunks are still arriving.
+    At the end of the bytes written so far it waits for more, checking every
+    `UPLOAD_POLL_SECONDS`, and it only ends once the upload is finalized and
+    every byte was read. The bytes read are hashed on the way, see `new_digest`.
+
+    It is meant to be wrapped in an `io.BufferedReader` before being parsed.
+    """
+
+    def __init__(self, path: Path, upload_id: str, digest: "hashlib._Hash"):
+        """
+        Args:
+            path (Path): The spooled copy of the upload.
+            upload_id (str): The id of the `ChunkedUpload`.
+            digest (hashlib._Hash): The hash to update with every byte read.
+        """
+
+        super().__init__()
+        self.file = open(path, "rb")
+        self.upload_id = upload_id
+        self.digest = digest
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        idle_since = time.monotonic()
+        while True:
+            read = self.file.readinto(buffer)
+            if read:
+                self.digest.update(memoryview(buffer)[:read])
+                return read
+
+            upload = (
+                ChunkedUpload.objects.filter(upload_id=self.upload_id)
+                .values_list("size")
+                .first()
+            )
+            if upload is None:
+                # Deleted as abandoned, see `clean_uploads`
+                raise ValueError("The upload was abandoned before being finalized")
+
+            (size,) = upload
+            if size is not None and self.file.tell() >= size:
+                return 0
+
+            if time.monotonic() - idle_since > settings.UPLOAD_IDLE_TIMEOUT:
+                raise ValueError("The upload was abandoned before being finalized")
+
+            time.sleep(settings.UPLOAD_POLL_SECONDS)
+
+    def close(self) -> None:
+        self.file.close()
+        super().close()
+
+    def hexdigest(self) -> str:
+        """The digest of the upload, once it was read to the end."""
+        return self.digest.hexdigest()
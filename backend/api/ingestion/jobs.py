@@ -0,0 +1,268 @@
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from threading import Lock
+from datetime import datetime
+from typing import BinaryIO, Dict, List, Optional, Union
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import UploadedFile
+from django.db import connection
+from django.utils import timezone
+
+from ..models.ingest_job_model import IngestJob
+from ..storage.engines import delete_files
+from .dedup import new_digest, register_upload
+from .growing_file import GrowingFile
+from .streaming import read_chunks, stream_data
+
+# The pools of threads that run the jobs, each created on its first job
+_executors: Dict[str, ThreadPoolExecutor] = {}
+_executor_lock = Lock()
+
+
+def get_pool(name: str, max_workers: int) -> ThreadPoolExecutor:
+    """
+    The process wide pool of threads with a name, created the first time.
+
+    Args:
+        name (str): The name of the pool, the prefix of the names of its threads.
+        max_workers (int): The amount of threads of the pool.
+
+    Returns:
+        ThreadPoolExecutor: The pool.
+    """
+
+    with _executor_lock:
+        if name not in _executors:
+            _executors[name] = ThreadPoolExecutor(
+                max_workers=max_workers, thread_name_prefix=name
+            )
+
+        return _executors[name]
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """
+    The process wide pool that runs the ingestion jobs, with `INGEST_JOB_WORKERS` threads.
+
+    Returns:
+        ThreadPoolExecutor: The pool of job workers.
+    """
+
+    return get_pool("ingest-job", settings.INGEST_JOB_WORKERS)
+
+
+def get_upload_executor() -> ThreadPoolExecutor:
+    """
+    The process wide pool that parses resumable uploads while they arrive, with
+    `UPLOAD_PARSE_WORKERS` threads. Their jobs wait for the bytes of the client,
+    so they do not take the threads of the jobs of whole files.
+
+    Returns:
+        ThreadPoolExecutor: The pool of early parsing workers.
+    """
+
+    return get_pool("upload-parse", settings.UPLOAD_PARSE_WORKERS)
+
+
+def spool_upload(file: UploadedFile, name: str) -> Path:
+    """
+    Copies an upload into the spool directory, so it outlives the request that sent it.
+
+    Args:
+        file (UploadedFile): The uploaded file, either in memory or spooled to disk.
+        name (str): The name of the copy inside `INGEST_SPOOL_DIR`.
+
+    Returns:
+        path (Path): The path of the copy.
+    """
+
+    spool_dir = Path(settings.INGEST_SPOOL_DIR)
+    spool_dir.mkdir(parents=True, exist_ok=True)
+
+    path = spool_dir / name
+    with open(path, "wb") as spooled:
+        for chunk in file.chunks():
+            spooled.write(chunk)
+
+    return path
+
+
+def update_job(job_id: str, **fields) -> None:
+    """Updates the fields of a job, `update` does not refresh `updated_at` by itself."""
+    IngestJob.objects.filter(job_id=job_id).update(updated_at=timezone.now(), **fields)
+
+
+def fail_orphaned_jobs(idle_since: Optional[datetime] = None) -> List[IngestJob]:
+    """
+    Marks as failed the jobs left queued or running by a process that stopped, and
+    deletes their spooled upload and what they had stored of their file. A job left
+    behind is never picked up again, as the pools of threads only live in memory.
+
+    Args:
+        idle_since (Optional[datetime]): Only the jobs not updated since then are orphans,
+            as a running job updates itself on every chunk. Every queued or running job
+            is one when None, for when no process is running them.
+
+    Returns:
+        orphans (List[IngestJob]): The jobs marked as failed.
+    """
+
+    jobs = IngestJob.objects.filter(state__in=[IngestJob.QUEUED, IngestJob.RUNNING])
+    if idle_since is not None:
+        jobs = jobs.filter(updated_at__lt=idle_since)
+
+    orphans = []
+    for job in jobs:
+        # A job that moved on in the meantime is left alone
+        if not IngestJob.objects.filter(id=job.id, state=job.state).update(
+            state=IngestJob.FAILED,
+            failure="the ingestion was interrupted",
+            updated_at=timezone.now(),
+        ):
+            continue
+
+        # The upload of a whole file is spooled under the id of its job
+        for path in Path(settings.INGEST_SPOOL_DIR).glob(f"{job.job_id}.*"):
+            path.unlink(missing_ok=True)
+        delete_files([job.file_id])
+        orphans.append(job)
+
+    return orphans
+
+
+def start_jobs(
+    file: UploadedFile,
+    extension: str,
+    file_ids: Dict[Optional[str], str],
+    force_casting: Dict[str, str],
+    digest: Optional[str] = None,
+) -> Dict[Optional[str], IngestJob]:
+    """
+    Queues the ingestion of an uploaded file and returns without waiting for it.
+    Every sheet of a workbook gets its own job, so they run in parallel.
+
+    The upload is spooled once. Each job gets a hard link to it and removes its own,
+    so the copy is gone when the last job finishes.
+
+    Args:
+        file (UploadedFile): The uploaded file.
+        extension (str): The already validated extension of the file.
+        file_ids (Dict[Optional[str], str]): The pregenerated id of each sheet by name,
+            or of the whole file under None.
+        force_casting (Dict[str, str]): The dictionary of force casting options.
+        digest (Optional[str]): The digest of the upload, each file is registered under it once stored.
+
+    Returns:
+        jobs (Dict[Optional[str], IngestJob]): The queued job of each sheet, like `file_ids`.
+    """
+
+    jobs: Dict[Optional[str], IngestJob] = {}
+    paths: Dict[Optional[str], Path] = {}
+    spooled: Optional[Path] = None
+    for sheet_name, file_id in file_ids.items():
+        job = IngestJob.objects.create(job_id=uuid4().hex, file_id=file_id)
+        name = f"{job.job_id}.{extension}"
+        if spooled is None:
+            spooled = spool_upload(file, name)
+            paths[sheet_name] = spooled
+        else:
+            paths[sheet_name] = spooled.with_name(name)
+            os.link(spooled, paths[sheet_name])
+
+        jobs[sheet_name] = job
+
+    # Only queued once every link exists, as a finished job removes its own
+    for sheet_name, job in jobs.items():
+        get_executor().submit(
+            run_job,
+            job.job_id,
+            job.file_id,
+            paths[sheet_name],
+            extension,
+            force_casting,
+            sheet_name,
+            digest,
+            len(file_ids),
+        )
+
+    return jobs
+
+
+def run_job(
+    job_id: str,
+    file_id: str,
+    path: Path,
+    extension: str,
+    force_casting: Dict[str, str],
+    sheet_name: Optional[str] = None,
+    digest: Optional[str] = None,
+    sheets: int = 1,
+    upload_id: Optional[str] = None,
+) -> None:
+    """
+    Runs an ingestion job in a worker thread. It streams the spooled file into the
+    database, keeping the job state and ingested rows up to date, and finally
+    deletes the spooled file.
+
+    The file of a resumable upload is ingested while it arrives, committing every chunk
+    so no transaction is open while waiting for its next bytes. Its digest is computed
+    as it is read. The sheets of a workbook also commit every chunk, as the jobs of the
+    other sheets wait to write while one parses its next chunk.
+
+    Args:
+        job_id (str): The id of the job.
+        file_id (str): The pregenerated id of the file.
+        path (Path): The spooled copy of the upload.
+        extension (str): The extension of the file.
+        force_casting (Dict[str, str]): The dictionary of force casting options.
+        sheet_name (Optional[str]): The sheet to ingest when the file is a workbook.
+        digest (Optional[str]): The digest of the upload, to register the file under once stored.
+        sheets (int): The amount of sheets of the upload.
+        upload_id (Optional[str]): The resumable upload whose chunks are still arriving into `path`.
+    """
+
+    growing: Optional[GrowingFile] = None
+    try:
+        # A job failed as an orphan while it waited in the queue is not run
+        if not IngestJob.objects.filter(job_id=job_id, state=IngestJob.QUEUED).update(
+            state=IngestJob.RUNNING, updated_at=timezone.now()
+        ):
+            return
+
+        source: Union[Path, BinaryIO] = path
+        if upload_id is not None:
+            growing = GrowingFile(path, upload_id, new_digest(extension, force_casting))
+            source = io.BufferedReader(growing)
+
+        chunks = read_chunks(source, extension, settings.INGEST_CHUNK_ROWS, sheet_name)
+        errors = stream_data(
+            file_id,
+            chunks,
+            force_casting,
+            on_progress=lambda rows: update_job(job_id, rows_ingested=rows),
+            commit_each_chunk=growing is not None or sheets > 1,
+        )
+        if growing is not None:
+            digest = growing.hexdigest()
+        if digest is not None:
+            register_upload(digest, file_id, errors, sheet_name, sheets)
+        update_job(job_id, state=IngestJob.DONE, errors=errors)
+
+    except ValidationError as e:
+        update_job(job_id, state=IngestJob.FAILED, failure=e.message)
+
+    except Exception as e:
+        update_job(job_id, state=IngestJob.FAILED, failure=str(e))
+
+    finally:
+        if growing is not None:
+            growing.close()
+        path.unlink(missing_ok=True)
+
+        # Each worker thread has its own connection, it must not be left open
+        connection.close()
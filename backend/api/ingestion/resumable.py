@@ -0,0 +1,162 @@
+from pathlib import Path
+from typing import Dict
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import UploadedFile
+from django.db import transaction
+from django.utils import timezone
+
+from ..models.chunked_upload_model import ChunkedUpload
+from ..models.ingest_job_model import IngestJob
+from ..utils import generate_file_id
+from .jobs import get_upload_executor, run_job
+
+# The files that can be parsed from their first bytes, while the rest is uploaded
+EARLY_PARSING_EXTENSIONS = ["csv"]
+
+
+class OffsetMismatch(Exception):
+    """The chunk does not start where the bytes received so far end"""
+
+    def __init__(self, offset: int):
+        super().__init__(f"expected offset {offset}")
+        self.offset = offset
+
+
+class SpooledUpload(UploadedFile):
+    """A finalized resumable upload, handled like a file Django spooled to disk"""
+
+    def __init__(self, upload: ChunkedUpload):
+        path = spool_path(upload)
+        super().__init__(open(path, "rb"), upload.file_name, size=upload.size)
+        self.path = path
+
+    def temporary_file_path(self) -> str:
+        return str(self.path)
+
+
+def spool_path(upload: ChunkedUpload) -> Path:
+    """The file in `INGEST_SPOOL_DIR` where the chunks of an upload are appended."""
+    return Path(settings.INGEST_SPOOL_DIR) / f"{upload.upload_id}.{upload.extension}"
+
+
+def received_bytes(upload: ChunkedUpload) -> int:
+    """The amount of bytes of an upload received so far, the offset of its next chunk."""
+
+    path = spool_path(upload)
+    return path.stat().st_size if path.exists() else 0
+
+
+def start_upload(
+    file_name: str, name: str, extension: str, force_casting: Dict[str, str]
+) -> ChunkedUpload:
+    """
+    Starts a resumable upload with an empty spooled file. Files in
+    `EARLY_PARSING_EXTENSIONS` also get a background job right away, which
+    ingests their rows as the chunks arrive. Their digest is only known at the end,
+    so an identical file already stored is found when the job registers the upload,
+    which then deletes its copy and references the stored one, see `register_upload`.
+
+    Args:
+        file_name (str): The already validated name of the file.
+        name (str): The name of the file without its extension.
+        extension (str): The extension of the file.
+        force_casting (Dict[str, str]): The dictionary of force casting options.
+
+    Returns:
+        upload (ChunkedUpload): The started upload.
+    """
+
+    upload = ChunkedUpload.objects.create(
+        upload_id=uuid4().hex,
+        file_name=file_name,
+        extension=extension,
+        force_casting=force_casting,
+    )
+
+    path = spool_path(upload)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.touch()
+
+    if extension in EARLY_PARSING_EXTENSIONS:
+        upload.file_id = generate_file_id(name, extension)
+        upload.job_id = uuid4().hex
+        upload.save(update_fields=["file_id", "job_id"])
+
+        IngestJob.objects.create(job_id=upload.job_id, file_id=upload.file_id)
+        get_upload_executor().submit(
+            run_job,
+            upload.job_id,
+            upload.file_id,
+            path,
+            extension,
+            force_casting,
+            upload_id=upload.upload_id,
+        )
+
+    return upload
+
+
+def append_chunk(upload: ChunkedUpload, offset: int, chunk: UploadedFile) -> int:
+    """
+    Appends a chunk to the spooled file of an upload. A chunk is only accepted at the end
+    of the bytes received so far, so a client that lost a response resumes from `offset`.
+
+    Args:
+        upload (ChunkedUpload): The upload.
+        offset (int): The position of the chunk in the file.
+        chunk (UploadedFile): The bytes of the chunk.
+
+    Raises:
+        ValidationError: When the upload was already finalized.
+        OffsetMismatch: When the offset is not where the received bytes end.
+
+    Returns:
+        offset (int): The bytes received so far, the offset of the next chunk.
+    """
+
+    # Touching the upload serializes the appends of the same upload
+    with transaction.atomic():
+        ChunkedUpload.objects.filter(id=upload.id).update(updated_at=timezone.now())
+        upload.refresh_from_db(fields=["size"])
+        if upload.size is not None:
+            raise ValidationError("The upload is already finalized")
+
+        received = received_bytes(upload)
+        if offset != received:
+            raise OffsetMismatch(received)
+
+        with open(spool_path(upload), "ab") as spooled:
+            for data in chunk.chunks():
+                spooled.write(data)
+
+    return received_bytes(upload)
+
+
+def finalize_upload(upload: ChunkedUpload, size: int) -> None:
+    """
+    Marks an upload as complete, once every byte was received. A job parsing it
+    early then reaches the end of the file.
+
+    Args:
+        upload (ChunkedUpload): The upload.
+        size (int): The size of the whole file, as the client knows it.
+
+    Raises:
+        ValidationError: When the upload was already finalized or bytes are missing.
+    """
+
+    with transaction.atomic():
+        ChunkedUpload.objects.filter(id=upload.id).update(updated_at=timezone.now())
+        upload.refresh_from_db(fields=["size"])
+        if upload.size is not None:
+            raise ValidationError("The upload is already finalized")
+
+        received = received_bytes(upload)
+        if received != size:
+            raise ValidationError(f"Received {received} of {size} bytes")
+
+        upload.size = size
+        upload.save(update_fields=["size"])
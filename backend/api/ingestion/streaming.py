@@ -0,0 +1,352 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, Optional, Set, Union
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import UploadedFile
+from django.db import connection
+
+from ..models.table_col_model import TableCol
+from ..scripts.force_cast import force_cast
+from ..scripts.infer_data_types import infer_and_convert_data_types
+from ..scripts.type_inferences.categories import PERCENTAGE_TO_BE_CATEGORY
+from ..storage.base import StorageEngine, as_text
+from ..storage.column_cache import ColumnCacheWriter
+from ..storage.engines import delete_files, get_engine
+from ..storage.page_cache import invalidate_pages
+from ..storage.schema_registry import invalidate_schema
+from ..utils import create_table_cols, frame_bytes, save_file_meta, timer
+from .xlsx import WorkbookSource, read_sheet_chunks
+
+# The force casting names used to bring a later chunk to an already inferred dtype
+SCHEMA_CASTINGS = {
+    "datetime64[ns]": "datetime",
+    "timedelta64[ns]": "timedelta",
+}
+
+
+def read_chunks(
+    file: Union[UploadedFile, Path, bytes, BinaryIO],
+    extension: str,
+    chunk_rows: int,
+    sheet_name: Optional[str] = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    Reads the file as consecutive DataFrames of at most `chunk_rows` rows.
+
+    Args:
+        file (Union[UploadedFile, Path, bytes, BinaryIO]): The uploaded file, the path of a spooled copy,
+            a binary stream or, for workbooks, its content.
+        extension (str): The already validated extension of the file.
+        chunk_rows (int): The maximum amount of rows of each chunk.
+        sheet_name (Optional[str]): The sheet of a workbook to read, the first one when None.
+
+    Yields:
+        chunk (pd.DataFrame): The next rows of the file, indexed from 0.
+    """
+
+    if extension == "csv":
+        for chunk in pd.read_csv(file, chunksize=chunk_rows):
+            yield chunk.reset_index(drop=True)
+        return
+
+    yield from read_sheet_chunks(file, sheet_name, chunk_rows)
+
+
+def conform_numbers(data: pd.Series, dtype: str) -> pd.Series:
+    """
+    Converts the numbers of a later chunk to the column dtype, widening it when
+    the chunk does not fit. The widening follows `numpy` promotion rules, so an
+    `uint8` column that finds a negative number becomes `int16` and any integer
+    column that finds a fraction becomes a float.
+
+    Args:
+        data (pd.Series): The chunk data of the column.
+        dtype (str): The dtype of the column so far.
+
+    Raises:
+        ValueError: When the chunk has values that are not numbers.
+
+    Returns:
+        pd.Series: The converted data, with the column dtype or a wider one.
+    """
+
+    converted = pd.to_numeric(data, errors="coerce")
+    if (converted.isna() & data.notna()).any():
+        raise ValueError("found values that are not numbers")
+
+    # Find the smallest dtype of the chunk the same way `number_downcast` does
+    chunk_dtype = pd.to_numeric(converted, downcast="unsigned").dtype
+    if chunk_dtype.kind != "u":
+        chunk_dtype = pd.to_numeric(converted, downcast="integer").dtype
+    if chunk_dtype.kind not in "ui":
+        chunk_dtype = pd.to_numeric(converted, downcast="float").dtype
+
+    return converted.astype(np.promote_types(dtype, chunk_dtype))
+
+
+def fit_integers(data: pd.Series, engine: StorageEngine) -> pd.Series:
+    """
+    Widens an unsigned column with integers the engine can not store to the dtype
+    `numpy` promotes `uint64` and `int64` to, float64, which is also the dtype of such a
+    column once it finds a negative number.
+
+    Args:
+        data (pd.Series): The converted data of a column.
+        engine (StorageEngine): The storage engine of the file.
+
+    Returns:
+        pd.Series: The data, widened if needed.
+    """
+
+    if (
+        engine.max_integer is None
+        or data.dtype != "uint64"
+        or not len(data)
+        or data.max() <= engine.max_integer
+    ):
+        return data
+
+    return data.astype(np.promote_types(data.dtype, np.int64))
+
+
+def category_values(data: pd.Series) -> Set[Any]:
+    """The distinct values of a column, with None for its nulls, counted as one like `ColumnProfile.cardinality`."""
+    values: Set[Any] = set(data.dropna().unique())
+    if data.isna().any():
+        values.add(None)
+    return values
+
+
+def conform_chunk(
+    chunk: pd.DataFrame,
+    table_cols: List[TableCol],
+    castings: Dict[str, str],
+    engine: StorageEngine,
+    categories: Dict[str, Set[Any]],
+    row_offset: int,
+) -> None:
+    """
+    Converts a chunk that is not the first one to the dtypes inferred from the first chunk.
+    Numeric columns are widened when needed, re-encoding the cells already stored, to
+    complex numbers when the chunk has them. An inferred column that the chunk does not
+    fit, like a number column that finds a word, becomes a text column, as it is when the
+    whole file is inferred at once, and so does a category column once it has more distinct
+    values than `category_conversion` allows for the rows so far.
+
+    Args:
+        chunk (pd.DataFrame): The chunk to convert in place.
+        table_cols (List[TableCol]): The columns of the file, ordered as in the chunk.
+        castings (Dict[str, str]): The force casting options that succeeded on the first chunk.
+        engine (StorageEngine): The storage engine of the file, which widens the stored cells.
+        categories (Dict[str, Set[Any]]): The distinct values of each inferred category
+            column so far, see `category_values`, updated in place.
+        row_offset (int): The amount of rows of the previous chunks.
+
+    Raises:
+        ValidationError: When a force casted column of the chunk can not be converted.
+    """
+
+    for table_col in table_cols:
+        col = table_col.col_name
+        dtype: str = table_col.col_type
+        data = chunk[col]
+
+        try:
+            if col not in castings and dtype.startswith(("uint", "int", "float")):
+                try:
+                    converted = fit_integers(conform_numbers(data, dtype), engine)
+                except ValueError:
+                    # Numbers are complex numbers too, as `complex_conversion` finds
+                    converted = data.astype("complex128")
+            elif col in categories:
+                categories[col] |= category_values(data)
+                rows = row_offset + len(data)
+                if len(categories[col]) / rows > PERCENTAGE_TO_BE_CATEGORY:
+                    del categories[col]
+                    raise ValueError("found too many distinct values")
+                converted = data.astype("category")
+            elif dtype == "bool":
+                if data.dtype != "bool":
+                    raise ValueError("found values that are not booleans")
+                converted = data
+            else:
+                casting = castings.get(col, SCHEMA_CASTINGS.get(dtype, dtype))
+                if casting == "datetime" and table_col.datetime_format is not None:
+                    # Parse with the format of the first rows instead of guessing again
+                    casting = f"datetime({table_col.datetime_format})"
+                converted, error = force_cast(data, casting)
+                if error is not None:
+                    raise ValueError("found values that can not be converted")
+
+        except (ValueError, TypeError) as e:
+            if col in castings:
+                raise ValidationError(
+                    f"column '{col}' does not match the {TableCol.TYPES[dtype]} type of its first rows, {str(e)}"
+                )
+
+            converted = as_text(data)
+
+        if str(converted.dtype) != dtype:
+            engine.promote_column(table_col, str(converted.dtype))
+            invalidate_schema(table_col.file_id)
+
+        chunk[col] = converted
+
+
+@timer
+def stream_data(
+    file_id: str,
+    chunks: Iterator[pd.DataFrame],
+    force_casting: Dict[str, str],
+    on_progress: Optional[Callable[[int], None]] = None,
+    commit_each_chunk: bool = False,
+) -> Dict[str, str]:
+    """
+    Infers, converts and stores a file chunk by chunk, so memory depends
+    on the size of a chunk and not on the size of the file.
+
+    The first chunk decides the dtypes of the columns, exactly as
+    `infer_and_convert_data_types` does for a whole file. Every following chunk is
+    converted to those dtypes before being stored next to the previous ones.
+
+    Cells are stored by the `STORAGE_ENGINE` of new files. In the database they are
+    committed every `INGEST_COMMIT_ROWS` instead of in a single transaction,
+    so when anything fails all the already stored data of the file is deleted.
+    Every chunk is also appended to the column cache of the file, and the `FileMeta`
+    of the file is written once every chunk is stored.
+
+    Args:
+        file_id (str): The pregenerated id of the file.
+        chunks (Iterator[pd.DataFrame]): The consecutive chunks of the file.
+        force_casting (Dict[str, str]): The dictionary of force casting options.
+        on_progress (Optional[Callable[[int], None]]):
+            Called with the amount of committed rows after each commit and at the end.
+        commit_each_chunk (bool): Whether to commit after every chunk, so no transaction is
+            open while waiting for the next one of a file that is still arriving.
+
+    Raises:
+        ValidationError: When a chunk can not be converted or stored.
+
+    Returns:
+        errors (Dict[str, str]): The errors of the force casting process.
+    """
+
+    errors: Dict[str, str] = {}
+    table_cols: List[TableCol] = []
+    castings: Dict[str, str] = {}
+    categories: Dict[str, Set[Any]] = {}
+    row_offset = 0
+    byte_size = 0
+    engine = get_engine()
+
+    def report_cells(cells: int) -> None:
+        if on_progress is not None:
+            on_progress(cells // len(table_cols))
+
+    try:
+        with engine.writer(on_progress=report_cells) as writer, ColumnCacheWriter(
+            file_id
+        ) as cache:
+            for chunk in chunks:
+                if not table_cols:
+                    chunk, errors = infer_and_convert_data_types(chunk, force_casting)
+                    castings = {
+                        col: casting
+                        for col, casting in force_casting.items()
+                        if col in chunk.columns and col not in errors
+                    }
+                    for col in chunk.columns:
+                        if col not in castings:
+                            chunk[col] = fit_integers(chunk[col], engine)
+                            if chunk[col].dtype == "category":
+                                categories[col] = category_values(chunk[col])
+                    table_cols = create_table_cols(file_id, chunk, engine.name)
+                else:
+                    conform_chunk(
+                        chunk, table_cols, castings, engine, categories, row_offset
+                    )
+
+                writer.write(table_cols, chunk, row_offset)
+                cache.write(table_cols, chunk, row_offset)
+                row_offset += len(chunk)
+                byte_size += frame_bytes(chunk)
+                if commit_each_chunk:
+                    writer.commit()
+
+                # Pages served while the file arrives, or before a promotion, are stale
+                invalidate_pages(file_id)
+
+        if not table_cols:
+            raise ValidationError("The file has no columns")
+
+        save_file_meta(file_id, row_offset, len(table_cols), byte_size)
+        invalidate_pages(file_id)
+
+        if on_progress is not None:
+            on_progress(row_offset)
+
+    except Exception as e:
+        delete_files([file_id])
+
+        if isinstance(e, ValidationError):
+            raise
+        raise ValidationError(f"Failed to create data. {str(e)}")
+
+    return errors
+
+
+def stream_workbook(
+    source: WorkbookSource, file_ids: Dict[str, str], force_casting: Dict[str, str]
+) -> Dict[str, Dict[str, str]]:
+    """
+    Streams every sheet of a workbook as its own file, see `stream_data`.
+    Sheets are read and stored in parallel by up to `INGEST_SHEET_WORKERS` threads,
+    each one opening the workbook on its own.
+
+    Parsing a sheet is Python code that holds the GIL, so the threads mostly take turns,
+    and each one commits every chunk before parsing the next: SQLite has a single writer,
+    which would otherwise keep the other sheets waiting while it parses.
+
+    If any sheet fails, the data of all of them is deleted.
+
+    Args:
+        source (WorkbookSource): The path or content of the workbook, not an open file,
+            as it is read from many threads.
+        file_ids (Dict[str, str]): The pregenerated id of each sheet, by sheet name.
+        force_casting (Dict[str, str]): The dictionary of force casting options, shared by every sheet.
+
+    Raises:
+        ValidationError: When a sheet can not be converted or stored.
+
+    Returns:
+        errors (Dict[str, Dict[str, str]]): The errors of the force casting process of each sheet.
+    """
+
+    def stream_sheet(sheet_name: str) -> Dict[str, str]:
+        try:
+            chunks = read_chunks(source, "xlsx", settings.INGEST_CHUNK_ROWS, sheet_name)
+            return stream_data(
+                file_ids[sheet_name], chunks, force_casting, commit_each_chunk=True
+            )
+        finally:
+            # Each thread has its own connection, it must not be left open
+            connection.close()
+
+    workers = min(len(file_ids), settings.INGEST_SHEET_WORKERS)
+    with ThreadPoolExecutor(workers, thread_name_prefix="ingest-sheet") as executor:
+        futures = {sheet: executor.submit(stream_sheet, sheet) for sheet in file_ids}
+
+    errors: Dict[str, Dict[str, str]] = {}
+    for sheet_name, future in futures.items():
+        try:
+            errors[sheet_name] = future.result()
+        except Exception as e:
+            delete_files(file_ids.values())
+            message = e.message if isinstance(e, ValidationError) else str(e)
+            raise ValidationError(f"Sheet '{sheet_name}': {message}")
+
+    return errors
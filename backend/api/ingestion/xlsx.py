@@ -0,0 +1,183 @@
+from io import BytesIO
+from itertools import islice
+from pathlib import Path
+from typing import Any, Iterator, List, Optional, Sequence, Union
+
+import pandas as pd
+from django.core.files.uploadedfile import UploadedFile
+from openpyxl import load_workbook
+from openpyxl.workbook.workbook import Workbook
+
+# A workbook, either uploaded, spooled to disk or already read into memory
+WorkbookSource = Union[UploadedFile, Path, bytes]
+
+# The text `pd.read_excel` reads as missing by default, its default `na_values`
+NA_VALUES = frozenset(
+    {
+        "",
+        "#N/A",
+        "#N/A N/A",
+        "#NA",
+        "-1.#IND",
+        "-1.#QNAN",
+        "-NaN",
+        "-nan",
+        "1.#IND",
+        "1.#QNAN",
+        "<NA>",
+        "N/A",
+        "NA",
+        "NULL",
+        "NaN",
+        "None",
+        "n/a",
+        "nan",
+        "null",
+    }
+)
+
+
+def open_workbook(source: WorkbookSource) -> Workbook:
+    """
+    Opens a workbook in read only mode, where rows are parsed while they are iterated
+    instead of loading every cell of every sheet at once. Formulas are read as the
+    values Excel last computed for them.
+
+    Args:
+        source (WorkbookSource): The workbook to open.
+
+    Returns:
+        Workbook: The read only workbook, it must be closed once read.
+    """
+
+    if isinstance(source, bytes):
+        source = BytesIO(source)
+
+    return load_workbook(source, read_only=True, data_only=True)
+
+
+def list_sheets(source: WorkbookSource) -> List[str]:
+    """
+    The names of the sheets of a workbook that have any value, in their order.
+    Only their first rows are read.
+
+    Args:
+        source (WorkbookSource): The workbook.
+
+    Returns:
+        List[str]: The name of every sheet with data.
+    """
+
+    workbook = open_workbook(source)
+    try:
+        return [
+            sheet.title
+            for sheet in workbook.worksheets
+            if any(
+                any(value is not None for value in row)
+                for row in sheet.iter_rows(values_only=True)
+            )
+        ]
+    finally:
+        workbook.close()
+
+
+def header_names(header: Sequence[Any]) -> List[str]:
+    """
+    Names the columns from the first row of a sheet the way `pd.read_excel` does:
+    empty cells are `Unnamed: <index>` and repeated names get a `.<count>` suffix.
+
+    Args:
+        header (Sequence[Any]): The values of the first row.
+
+    Returns:
+        List[str]: The name of every column.
+    """
+
+    names: List[str] = []
+    for index, value in enumerate(header):
+        name = f"Unnamed: {index}" if value is None else str(value)
+        count = 1
+        base = name
+        while name in names:
+            name = f"{base}.{count}"
+            count += 1
+
+        names.append(name)
+
+    return names
+
+
+def rows_to_frame(rows: List[Sequence[Any]], columns: List[str]) -> pd.DataFrame:
+    """
+    Builds a chunk from the values of some rows. The columns take the dtype of the
+    native Excel values: numbers become `int64` or `float64`, dates `datetime64[ns]` and
+    booleans `bool`, so only text columns need to be inferred from strings.
+
+    Args:
+        rows (List[Sequence[Any]]): The values of the rows, as many as columns or less.
+        columns (List[str]): The names of the columns.
+
+    Returns:
+        pd.DataFrame: The chunk, indexed from 0.
+    """
+
+    width = len(columns)
+    rows = [tuple(row[:width]) + (None,) * (width - len(row)) for row in rows]
+    chunk = pd.DataFrame.from_records(rows, columns=columns)
+
+    # Text that `pd.read_excel` would read as missing, like "NA" or "null"
+    for col in chunk.columns:
+        if chunk[col].dtype == "object":
+            missing = chunk[col].isin(NA_VALUES)
+            if missing.any():
+                chunk[col] = chunk[col].mask(missing, None)
+
+    return chunk
+
+
+def read_sheet_chunks(
+    source: WorkbookSource, sheet_name: Optional[str], chunk_rows: int
+) -> Iterator[pd.DataFrame]:
+    """
+    Streams a sheet as consecutive DataFrames of at most `chunk_rows` rows, keeping
+    a single chunk of the sheet in memory. The first row names the columns and
+    empty rows are skipped, as `pd.read_excel` does.
+
+    Args:
+        source (WorkbookSource): The workbook.
+        sheet_name (Optional[str]): The sheet to read, the first one when None.
+        chunk_rows (int): The maximum amount of rows of each chunk.
+
+    Yields:
+        chunk (pd.DataFrame): The next rows of the sheet, indexed from 0.
+    """
+
+    workbook = open_workbook(source)
+    try:
+        sheet = workbook.worksheets[0] if sheet_name is None else workbook[sheet_name]
+        rows = (
+            row
+            for row in sheet.iter_rows(values_only=True)
+            if any(value is not None for value in row)
+        )
+
+        header = next(rows, None)
+        if header is None:
+            return
+
+        # Trailing empty header cells are formatting, not columns
+        width = max(
+            index + 1 for index, value in enumerate(header) if value is not None
+        )
+        columns = header_names(header[:width])
+
+        while True:
+            batch = list(islice(rows, chunk_rows))
+            if not batch:
+                return
+
+            yield rows_to_frame(batch, columns)
+
+    finally:
+        workbook.close()
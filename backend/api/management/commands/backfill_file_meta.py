@@ -0,0 +1,49 @@
+from typing import List
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from ...models.file_meta_model import FileMeta
+from ...models.table_col_model import TableCol
+from ...serializers.table_col_serializer import TableColSerializer
+from ...storage.engines import file_engine
+from ...utils import frame_bytes, save_file_meta
+
+
+class Command(BaseCommand):
+    help = (
+        "Writes the metadata of the stored files that do not have it, counting their rows "
+        "and reading them back to measure their size. The ingest time is the time of the backfill."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--file-id",
+            action="append",
+            dest="file_ids",
+            help="A file to backfill, every file when none is given. Can be repeated.",
+        )
+
+    def handle(self, *args, file_ids: List[str], **options):
+        table_cols = TableCol.objects.all()
+        if file_ids:
+            table_cols = table_cols.filter(file_id__in=file_ids)
+
+        with_meta = set(FileMeta.objects.values_list("file_id", flat=True))
+        for file_id in list(table_cols.values_list("file_id", flat=True).distinct()):
+            if file_id in with_meta:
+                continue
+
+            file_cols = list(
+                TableCol.objects.filter(file_id=file_id).order_by("col_index")
+            )
+            engine = file_engine(file_cols)
+            total_rows = engine.total_rows(file_id, TableColSerializer(file_cols).data)
+
+            byte_size = 0
+            for start in range(0, total_rows, settings.INGEST_CHUNK_ROWS):
+                stop = min(start + settings.INGEST_CHUNK_ROWS, total_rows)
+                byte_size += frame_bytes(engine.read_columns(file_cols, start, stop))
+
+            save_file_meta(file_id, total_rows, len(file_cols), byte_size)
+            self.stdout.write(f"{file_id}: {total_rows} rows, {byte_size} bytes")
@@ -0,0 +1,34 @@
+from typing import List
+
+from django.core.management.base import BaseCommand
+
+from ...models.table_col_model import TableCol
+from ...storage.column_cache import ColumnCache, build_cache
+from ...storage.engines import file_engine
+
+
+class Command(BaseCommand):
+    help = "Writes the column cache of the stored files that do not have one."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--file-id",
+            action="append",
+            dest="file_ids",
+            help="A file to cache, every file when none is given. Can be repeated.",
+        )
+
+    def handle(self, *args, file_ids: List[str], **options):
+        table_cols = TableCol.objects.all()
+        if file_ids:
+            table_cols = table_cols.filter(file_id__in=file_ids)
+
+        for file_id in list(table_cols.values_list("file_id", flat=True).distinct()):
+            if ColumnCache.open(file_id) is not None:
+                continue
+
+            file_cols = list(
+                TableCol.objects.filter(file_id=file_id).order_by("col_index")
+            )
+            total_rows = build_cache(file_id, file_cols, file_engine(file_cols))
+            self.stdout.write(f"{file_id}: {total_rows} rows cached")
@@ -0,0 +1,57 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from ...ingestion.jobs import fail_orphaned_jobs
+from ...ingestion.resumable import spool_path
+from ...models.chunked_upload_model import ChunkedUpload
+from ...models.ingest_job_model import IngestJob
+
+
+class Command(BaseCommand):
+    help = (
+        "Fails the ingestion jobs not updated for longer than INGEST_JOB_STALE_TIMEOUT, "
+        "left behind by a process that stopped, and deletes what they stored. Then deletes "
+        "the resumable uploads without a chunk for longer than UPLOAD_IDLE_TIMEOUT and the "
+        "spooled files of the ones never finalized. Uploads whose job is still parsing "
+        "them are kept."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--startup",
+            action="store_true",
+            help="Run before the server starts, when every queued or running job is an orphan.",
+        )
+
+    def handle(self, *args, **options):
+        stale_since = None
+        if not options["startup"]:
+            stale_since = timezone.now() - timedelta(
+                seconds=settings.INGEST_JOB_STALE_TIMEOUT
+            )
+        for job in fail_orphaned_jobs(stale_since):
+            self.stdout.write(f"{job.job_id}: orphaned job of {job.file_id} failed")
+
+            # A resumable upload parsed by the job is never ingested now
+            for upload in ChunkedUpload.objects.filter(job_id=job.job_id):
+                spool_path(upload).unlink(missing_ok=True)
+                upload.delete()
+
+        idle_since = timezone.now() - timedelta(seconds=settings.UPLOAD_IDLE_TIMEOUT)
+        parsing = IngestJob.objects.filter(
+            state__in=[IngestJob.QUEUED, IngestJob.RUNNING]
+        ).values("job_id")
+        uploads = ChunkedUpload.objects.filter(updated_at__lt=idle_since).exclude(
+            job_id__in=parsing
+        )
+
+        for upload in uploads:
+            if upload.size is None:
+                # A job parsing it stopped at its idle timeout, which has passed too
+                spool_path(upload).unlink(missing_ok=True)
+                self.stdout.write(f"{upload.upload_id}: abandoned upload deleted")
+
+            upload.delete()
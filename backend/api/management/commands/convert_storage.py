@@ -0,0 +1,84 @@
+from typing import List
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import F
+
+from ...models.file_meta_model import FileMeta
+from ...models.table_col_model import TableCol
+from ...serializers.table_col_serializer import TableColSerializer
+from ...storage.column_cache import delete_cache
+from ...storage.engines import STORAGE_ENGINES, file_engine
+from ...storage.page_cache import invalidate_pages
+from ...storage.schema_registry import invalidate_schema
+
+
+class Command(BaseCommand):
+    help = "Moves the cells of stored files to another storage engine."
+
+    def add_arguments(self, parser):
+        parser.add_argument("storage", choices=list(STORAGE_ENGINES))
+        parser.add_argument(
+            "--file-id",
+            action="append",
+            dest="file_ids",
+            help="A file to convert, every file when none is given. Can be repeated.",
+        )
+
+    def handle(self, *args, storage: str, file_ids: List[str], **options):
+        table_cols = TableCol.objects.exclude(storage=storage)
+        if file_ids:
+            table_cols = table_cols.filter(file_id__in=file_ids)
+
+        to_convert = table_cols.values_list("file_id", flat=True).distinct()
+        for file_id in list(to_convert):
+            total_rows = self.convert_file(file_id, storage)
+            self.stdout.write(f"{file_id}: {total_rows} rows moved to {storage}")
+
+    def convert_file(self, file_id: str, storage: str) -> int:
+        """
+        Copies the cells of a file to another engine chunk by chunk, then switches
+        its columns to it and deletes the old cells. The file can be read all along.
+        Its schema, cached pages and column cache are dropped once it is moved.
+
+        Args:
+            file_id (str): The id of the file.
+            storage (str): The name of the new storage engine.
+
+        Raises:
+            CommandError: When the cells can not be copied, the file is left as it was.
+
+        Returns:
+            total_rows (int): The amount of rows of the file.
+        """
+
+        table_cols = list(
+            TableCol.objects.filter(file_id=file_id).order_by("col_index")
+        )
+        source = file_engine(table_cols)
+        target = STORAGE_ENGINES[storage]
+
+        total_rows = source.total_rows(file_id, TableColSerializer(table_cols).data)
+        try:
+            with target.writer() as writer:
+                for start in range(0, total_rows, settings.INGEST_CHUNK_ROWS):
+                    stop = min(start + settings.INGEST_CHUNK_ROWS, total_rows)
+                    df = source.read_columns(table_cols, start, stop)
+                    writer.write(table_cols, df, start)
+        except Exception as e:
+            target.clear(table_cols)
+            raise CommandError(f"Failed to convert {file_id}. {str(e)}")
+
+        with transaction.atomic():
+            TableCol.objects.filter(file_id=file_id).update(storage=storage)
+            # The schemas other processes keep still read the old engine
+            FileMeta.objects.filter(file_id=file_id).update(version=F("version") + 1)
+        source.clear(table_cols)
+
+        # What this process kept of the file still reads the old engine
+        invalidate_schema(file_id)
+        invalidate_pages(file_id)
+        delete_cache(file_id)
+
+        return total_rows
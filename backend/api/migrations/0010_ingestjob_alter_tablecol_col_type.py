@@ -0,0 +1,35 @@
+# Generated by Django 5.1.2 on 2026-10-18 11:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_genericdata_double_imag_value_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IngestJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('job_id', models.CharField(max_length=32, unique=True)),
+                ('file_id', models.CharField(max_length=50)),
+                ('state', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='queued', max_length=10)),
+                ('rows_ingested', models.PositiveBigIntegerField(default=0)),
+                ('errors', models.JSONField(default=dict)),
+                ('failure', models.TextField(null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'api_ingest_job',
+            },
+        ),
+        migrations.AlterField(
+            model_name='tablecol',
+            name='col_type',
+            field=models.CharField(choices=[('object', 'Text'), ('datetime64[ns]', 'datetime'), ('category', 'Category'), ('uint8', 'Unsigned 8 bit Integer'), ('uint16', 'Unsigned 16 bit Integer'), ('uint32', 'Unsigned 32 bit Integer'), ('uint64', 'Unsigned 64 bit Integer'), ('int8', 'Signed 8 bit Integer'), ('int16', 'Signed 16 bit Integer'), ('int32', 'Signed 32 bit Integer'), ('int64', 'Signed 64 bit Integer'), ('float32', '32 bit Floating Number'), ('float64', 'Float64'), ('complex128', 'Complex128'), ('bool', 'Boolean'), ('timedelta64[ns]', 'timedelta')], max_length=20),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.2 on 2026-10-18 11:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0010_ingestjob_alter_tablecol_col_type"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="tablecol",
+            name="datetime_format",
+            field=models.CharField(blank=True, max_length=50, null=True),
+        ),
+    ]
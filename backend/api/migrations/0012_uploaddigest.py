@@ -0,0 +1,37 @@
+# Generated by Django 5.1.2 on 2026-10-18 11:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0011_tablecol_datetime_format"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="UploadDigest",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("digest", models.CharField(db_index=True, max_length=64)),
+                ("file_id", models.CharField(max_length=50, unique=True)),
+                ("sheet_name", models.CharField(max_length=31, null=True)),
+                ("sheets", models.PositiveIntegerField(default=1)),
+                ("errors", models.JSONField(default=dict)),
+                ("references", models.PositiveIntegerField(default=1)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "db_table": "api_upload_digest",
+            },
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.1.2 on 2026-10-18 11:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0012_uploaddigest"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ChunkedUpload",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("upload_id", models.CharField(max_length=32, unique=True)),
+                ("file_name", models.CharField(max_length=255)),
+                ("extension", models.CharField(max_length=10)),
+                ("force_casting", models.JSONField(default=dict)),
+                ("size", models.PositiveBigIntegerField(null=True)),
+                ("file_id", models.CharField(max_length=50, null=True)),
+                ("job_id", models.CharField(max_length=32, null=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "db_table": "api_chunked_upload",
+            },
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.1.2 on 2026-10-18 11:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0013_chunkedupload"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="tablecol",
+            name="storage",
+            field=models.CharField(
+                choices=[
+                    ("rows", "One database row per cell"),
+                    ("columnar", "Compressed column segments on disk"),
+                ],
+                default="rows",
+                max_length=10,
+            ),
+        ),
+    ]
@@ -0,0 +1,233 @@
+# Generated by Django 5.1.2 on 2026-10-18 11:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0014_tablecol_storage"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="tablecol",
+            name="storage",
+            field=models.CharField(
+                choices=[
+                    ("rows", "One database row per cell"),
+                    ("columnar", "Compressed column segments on disk"),
+                    ("typed", "One row per cell in the table of its type"),
+                ],
+                default="rows",
+                max_length=10,
+            ),
+        ),
+        migrations.CreateModel(
+            name="BoolCell",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("row", models.PositiveBigIntegerField()),
+                ("value", models.BooleanField(null=True)),
+                (
+                    "column",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, to="api.tablecol"
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "api_bool_cell",
+                "indexes": [
+                    models.Index(
+                        fields=["column", "row"], name="api_bool_ce_column__fa178d_idx"
+                    ),
+                    models.Index(
+                        fields=["column", "value"],
+                        name="api_bool_ce_column__2eaf00_idx",
+                    ),
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="ComplexCell",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("row", models.PositiveBigIntegerField()),
+                ("value", models.FloatField()),
+                ("real", models.FloatField()),
+                ("imag", models.FloatField()),
+                (
+                    "column",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, to="api.tablecol"
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "api_complex_cell",
+                "indexes": [
+                    models.Index(
+                        fields=["column", "row"], name="api_complex_column__a693d5_idx"
+                    ),
+                    models.Index(
+                        fields=["column", "value"],
+                        name="api_complex_column__6dedcc_idx",
+                    ),
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="DatetimeCell",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("row", models.PositiveBigIntegerField()),
+                ("value", models.DateTimeField(null=True)),
+                (
+                    "column",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, to="api.tablecol"
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "api_datetime_cell",
+                "indexes": [
+                    models.Index(
+                        fields=["column", "row"], name="api_datetim_column__c00401_idx"
+                    ),
+                    models.Index(
+                        fields=["column", "value"],
+                        name="api_datetim_column__53c056_idx",
+                    ),
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="FloatCell",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("row", models.PositiveBigIntegerField()),
+                ("value", models.FloatField(null=True)),
+                (
+                    "column",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, to="api.tablecol"
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "api_float_cell",
+                "indexes": [
+                    models.Index(
+                        fields=["column", "row"], name="api_float_c_column__37892f_idx"
+                    ),
+                    models.Index(
+                        fields=["column", "value"],
+                        name="api_float_c_column__c89648_idx",
+                    ),
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="IntegerCell",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("row", models.PositiveBigIntegerField()),
+                ("value", models.BigIntegerField()),
+                (
+                    "column",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, to="api.tablecol"
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "api_integer_cell",
+                "indexes": [
+                    models.Index(
+                        fields=["column", "row"], name="api_integer_column__82db61_idx"
+                    ),
+                    models.Index(
+                        fields=["column", "value"],
+                        name="api_integer_column__286380_idx",
+                    ),
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="StringCell",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("row", models.PositiveBigIntegerField()),
+                ("value", models.CharField(max_length=100, null=True)),
+                (
+                    "column",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, to="api.tablecol"
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "api_string_cell",
+                "indexes": [
+                    models.Index(
+                        fields=["column", "row"], name="api_string__column__eb393c_idx"
+                    ),
+                    models.Index(
+                        fields=["column", "value"],
+                        name="api_string__column__8c18a0_idx",
+                    ),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,119 @@
+# Generated by Django 5.1.2 on 2026-10-18 11:41
+
+import struct
+from datetime import datetime, timezone
+
+from django.db import migrations, models
+
+# The sort keys are encoded here as `encode_sort_keys` encoded them when this migration
+# was written, so later changes to the application do not change what it does
+
+# The cells updated at a time
+BATCH_CELLS = 50_000
+
+# The sign bit of a 64 bit sort key
+SIGN_BIT = 1 << 63
+
+# The epoch of the datetimes, which are keyed by their microseconds
+EPOCH = datetime(1970, 1, 1)
+
+
+def pack(key):
+    """An unsigned 64 bit sort key as 8 big endian bytes."""
+    return struct.pack(">Q", key)
+
+
+def float_key(value):
+    """The key of a float, negative floats sort backwards."""
+
+    # Adding zero turns -0.0 into 0.0, they are equal
+    (bits,) = struct.unpack(">Q", struct.pack(">d", value + 0.0))
+    if bits & SIGN_BIT:
+        return pack(~bits & (SIGN_BIT | (SIGN_BIT - 1)))
+    return pack(bits | SIGN_BIT)
+
+
+def sort_key(cell, dtype):
+    """The `sort_key` of a `GenericData`, `None` for nulls and unsortable types."""
+
+    if dtype in {"object", "category"}:
+        return None if cell.string_value is None else cell.string_value.encode()
+
+    if dtype.startswith("uint"):
+        return None if cell.uint_value is None else pack(cell.uint_value)
+
+    if dtype.startswith("int"):
+        if cell.uint_value is None:
+            return None
+        sign = 1 if cell.int_sign_value is None else cell.int_sign_value
+        # Flipping the sign bit puts the negative numbers before the positive ones
+        return pack(sign * cell.uint_value + SIGN_BIT)
+
+    if dtype.startswith("float"):
+        return None if cell.double_value is None else float_key(cell.double_value)
+
+    if dtype.startswith("complex"):
+        if cell.double_value is None or cell.double_imag_value is None:
+            return None
+        # The squared magnitude, which the magnitude is sorted by
+        return float_key(cell.double_value**2 + cell.double_imag_value**2)
+
+    if dtype == "datetime64[ns]":
+        value = cell.datetime_value
+        if value is None:
+            return None
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        delta = value - EPOCH
+        microseconds = (delta.days * 86_400 + delta.seconds) * 10**6
+        return pack(microseconds + delta.microseconds + SIGN_BIT)
+
+    if dtype == "timedelta64[ns]":
+        # The nanoseconds, with their sign
+        return None if cell.uint_value is None else pack(cell.uint_value + SIGN_BIT)
+
+    if dtype == "bool":
+        return None if cell.bool_value is None else pack(int(cell.bool_value))
+
+    return None
+
+
+def fill_sort_keys(apps, schema_editor):
+    """Computes the `sort_key` of the cells stored before it existed."""
+
+    TableCol = apps.get_model("api", "TableCol")
+    GenericData = apps.get_model("api", "GenericData")
+    for table_col in TableCol.objects.filter(storage="rows"):
+        cells = GenericData.objects.filter(column=table_col.id).order_by("id")
+        last_id = 0
+        while True:
+            batch = list(cells.filter(id__gt=last_id)[:BATCH_CELLS])
+            if not batch:
+                break
+
+            for cell in batch:
+                cell.sort_key = sort_key(cell, table_col.col_type)
+            GenericData.objects.bulk_update(batch, ["sort_key"])
+            last_id = batch[-1].id
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0015_alter_tablecol_storage_boolcell_complexcell_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="genericdata",
+            name="sort_key",
+            field=models.BinaryField(null=True),
+        ),
+        migrations.AddIndex(
+            model_name="genericdata",
+            index=models.Index(
+                fields=["column", "sort_key"], name="api_generic_column__7f8967_idx"
+            ),
+        ),
+        migrations.RunPython(fill_sort_keys, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.1.2 on 2026-10-18 12:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0016_genericdata_sort_key"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FileMeta",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("file_id", models.CharField(max_length=50, unique=True)),
+                ("rows", models.PositiveBigIntegerField()),
+                ("columns", models.PositiveIntegerField()),
+                ("byte_size", models.PositiveBigIntegerField()),
+                ("ingested_at", models.DateTimeField()),
+            ],
+            options={
+                "db_table": "api_file_meta",
+            },
+        ),
+    ]
@@ -0,0 +1,81 @@
+# Generated by Django 5.1.2 on 2026-10-18 12:21
+
+from django.db import migrations, models
+
+
+def alias_stored_files(apps, schema_editor):
+    """
+    Keeps one digest per stored file and sheet and gives every stored file an alias.
+    Duplicates of a digest stay stored but are no longer reused, like released workbooks.
+    Uploads that shared an id before aliases keep sharing it, as a single reference.
+    """
+
+    TableCol = apps.get_model("api", "TableCol")
+    UploadDigest = apps.get_model("api", "UploadDigest")
+    FileAlias = apps.get_model("api", "FileAlias")
+
+    kept = set()
+    for stored in UploadDigest.objects.exclude(digest="").order_by("id"):
+        if (stored.digest, stored.sheet_name) in kept:
+            stored.digest = ""
+        kept.add((stored.digest, stored.sheet_name))
+        stored.references = 1
+        stored.save(update_fields=["digest", "references"])
+
+    file_ids = TableCol.objects.values_list("file_id", flat=True).distinct()
+    FileAlias.objects.bulk_create(
+        FileAlias(alias=file_id, file_id=file_id) for file_id in file_ids
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0017_filemeta"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FileAlias",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("alias", models.CharField(max_length=50, unique=True)),
+                ("file_id", models.CharField(db_index=True, max_length=50)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "db_table": "api_file_alias",
+            },
+        ),
+        migrations.RunPython(alias_stored_files, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="uploaddigest",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(
+                    ("sheet_name__isnull", False),
+                    models.Q(("digest", ""), _negated=True),
+                ),
+                fields=("digest", "sheet_name"),
+                name="upload_digest_sheet_unique",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="uploaddigest",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(
+                    ("sheet_name__isnull", True),
+                    models.Q(("digest", ""), _negated=True),
+                ),
+                fields=("digest",),
+                name="upload_digest_file_unique",
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.2 on 2026-10-18 15:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0018_file_alias"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="filemeta",
+            name="version",
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,37 @@
+from django.db.models import (
+    CharField,
+    DateTimeField,
+    JSONField,
+    Model,
+    PositiveBigIntegerField,
+)
+
+
+class ChunkedUpload(Model):
+    """
+    The model for the `api_chunked_upload` table.
+    It stores the resumable uploads, whose bytes arrive in chunks into the spool directory.
+    """
+
+    upload_id = CharField(max_length=32, unique=True)
+    file_name = CharField(max_length=255)
+    extension = CharField(max_length=10)
+
+    # The force casting options sent when the upload was started
+    force_casting = JSONField(default=dict)
+
+    # The total amount of bytes, only known once the upload is finalized
+    size = PositiveBigIntegerField(null=True)
+
+    # The ingestion started with the first bytes, for the files that can be streamed
+    file_id = CharField(max_length=50, null=True)
+    job_id = CharField(max_length=32, null=True)
+
+    created_at = DateTimeField(auto_now_add=True)
+    updated_at = DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "api_chunked_upload"
+
+    def __str__(self) -> str:
+        return f"chunked_upload = {self.upload_id}: {self.file_name}, {self.size} bytes"
@@ -0,0 +1,50 @@
+from typing import Optional
+
+from django.db.models import CharField, DateTimeField, Model
+
+
+class FileAlias(Model):
+    """
+    The model for the `api_file_alias` table.
+    It maps the `file_id` every upload gets to the stored file it reads, so identical
+    uploads share a file while each one can only drop its own reference to it.
+    The first upload of a file gets the id of the file itself.
+    """
+
+    alias = CharField(max_length=50, unique=True)
+    file_id = CharField(max_length=50, db_index=True)
+
+    created_at = DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "api_file_alias"
+
+    def __str__(self) -> str:
+        return f"file_alias = {self.alias}: {self.file_id}"
+
+    @staticmethod
+    def resolve(alias: str) -> Optional[str]:
+        """
+        Finds the stored file of the `file_id` of an upload.
+
+        Args:
+            alias (str): The `file_id` the upload got.
+
+        Returns:
+            Optional[str]: The id of the stored file, `alias` itself for files without
+                aliases (still being ingested), or None when the upload deleted its reference.
+        """
+
+        file_id = (
+            FileAlias.objects.filter(alias=alias)
+            .values_list("file_id", flat=True)
+            .first()
+        )
+        if file_id is not None:
+            return file_id
+
+        # The id of a shared file whose first upload deleted it
+        if FileAlias.objects.filter(file_id=alias).exists():
+            return None
+
+        return alias
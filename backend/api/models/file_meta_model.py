@@ -0,0 +1,34 @@
+from django.db.models import (
+    CharField,
+    DateTimeField,
+    Model,
+    PositiveBigIntegerField,
+    PositiveIntegerField,
+)
+
+
+class FileMeta(Model):
+    """
+    The model for the `api_file_meta` table.
+    It stores the size of every stored file, written once the file is ingested,
+    so it is read instead of counted from the cells.
+    """
+
+    file_id = CharField(max_length=50, unique=True)
+    rows = PositiveBigIntegerField()
+    columns = PositiveIntegerField()
+
+    # The memory of the converted data of the file as it was ingested, as measured by `pandas`
+    byte_size = PositiveBigIntegerField()
+
+    ingested_at = DateTimeField()
+
+    # Bumped whenever the columns of the stored file change, when it is ingested again
+    # or moved to another storage engine, so processes that kept them know they are stale
+    version = PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = "api_file_meta"
+
+    def __str__(self) -> str:
+        return f"file_meta = {self.file_id}: {self.rows} rows, {self.columns} columns"
@@ -1,27 +1,36 @@
-from typing import Any, Dict, List, Set
+from typing import Any, Dict, Set
 
 from django.db.models import (
     CASCADE,
+    BinaryField,
     BooleanField,
     CharField,
     DateTimeField,
     F,
     FloatField,
     ForeignKey,
-    Func,
     Index,
     Manager,
     Model,
     PositiveBigIntegerField,
     SmallIntegerField,
+    Value,
 )
+from django.db.models.functions import Coalesce
 
 from .table_col_model import TableCol
 
-
-class AbsoluteValue(Func):
-    function = "ABS"
-    output_field = FloatField()
+# All the keys of the GenericData model to represent data.
+ALL_KEYS = {
+    "string_value",
+    "int_sign_value",
+    "uint_value",
+    "double_value",
+    "double_imag_value",
+    "datetime_value",
+    "time_zone_info_value",
+    "bool_value",
+}
 
 
 # The keys that must be not None for each dtype
@@ -38,13 +47,6 @@ IMPORTANT_KEYS_BY_DTYPE: Dict[str, Set[str]] = {
 }
 
 
-# The keys to sort by for each dtype
-SORTING_MAP: Dict[str, List[str]] = {
-    **{k: list(val) for k, val in IMPORTANT_KEYS_BY_DTYPE.items()},
-    "row_index": {"row"},
-}
-
-
 class GenericData(Model):
     """
     The model for the `api_generic_data` table.
@@ -53,7 +55,10 @@ class GenericData(Model):
 
     class Meta:
         db_table = "api_generic_data"
-        indexes = [Index(fields=["column", "row"])]
+        indexes = [
+            Index(fields=["column", "row"]),
+            Index(fields=["column", "sort_key"]),
+        ]
 
     # The column that this data belongs to
     # Notice the normalization, where a GenericData belongs to a column and a column belongs to a file
@@ -74,6 +79,37 @@ class GenericData(Model):
     time_zone_info_value = CharField(max_length=30, null=True)
     bool_value = BooleanField(null=True)
 
+    # The value as bytes that compare in the order of the values, see `encode_sort_keys`.
+    # With the `(column, sort_key)` index any column is sorted by a range scan
+    sort_key = BinaryField(null=True)
+
+    @staticmethod
+    def promote_column(table_col: TableCol, col_type: str) -> None:
+        """
+        Widens the numeric dtype of a column, re-encoding the cells it already has
+        so they follow the `IMPORTANT_KEYS_BY_DTYPE` of the new dtype.
+
+        Args:
+            table_col (TableCol): The column to widen. It is saved with the new `col_type`.
+            col_type (str): The new numeric dtype of the column.
+        """
+
+        cells = GenericData.objects.filter(column=table_col.id)
+        previous_type: str = table_col.col_type
+
+        if col_type.startswith("float") and not previous_type.startswith("float"):
+            # Integers become a signed double, unsigned integers do not have a sign yet
+            cells.update(
+                double_value=F("uint_value") * Coalesce("int_sign_value", Value(1)),
+                uint_value=None,
+                int_sign_value=None,
+            )
+        elif col_type.startswith("int") and previous_type.startswith("uint"):
+            cells.update(int_sign_value=1)
+
+        table_col.col_type = col_type
+        table_col.save(update_fields=["col_type"])
+
     @staticmethod
     def get_objects_by_columns(
         cols: Dict[str, Dict[str, Any]]
@@ -93,44 +129,6 @@ class GenericData(Model):
         col_ids = [col["id"] for col in cols.values()]
         return GenericData.objects.filter(column__in=col_ids)
 
-    @staticmethod
-    def slice_and_sort_by_row(
-        data: Manager["GenericData"],
-        num_of_cols: Dict[str, Dict[str, Any]],
-        request_query: Dict[str, Any],
-    ) -> Manager["GenericData"]:
-        """
-        A static method to first sort the data by row and then slice it generating
-        the correct pagination.
-
-        Args:
-            data (Manager["GenericData"]):
-                The data to sort and slice.
-            num_of_cols (int):
-                The number of columns in the data. This is used to calculate the pagination.
-            request_query (Dict[str, Any]):
-                The query parameters from the request.
-
-        Returns:
-            sorted_data_models (Manager["GenericData"]):
-                An ongoing query of the sorted and sliced data models.
-        """
-
-        # Get parameters from request_query
-        ascending: bool = request_query["asc"]
-        page_size: int = request_query["page_size"]
-        page: int = request_query["page"]
-
-        # Generate the order_by string adding '-' if it is descending
-        order_by = f"{'-' if not ascending else ''}row"
-
-        # Sort and slice
-        sorted_data_models = data.order_by(order_by)[
-            page * page_size * num_of_cols : (page + 1) * page_size * num_of_cols
-        ]
-
-        return sorted_data_models
-
     @staticmethod
     def slice_and_sort_by_col(
         data: Manager["GenericData"],
@@ -139,8 +137,8 @@ class GenericData(Model):
     ) -> Manager["GenericData"]:
         """
         A static method to first sort the data by the requested sort_by
-        and then slice. This method is different from `slice_and_sort_by_row` because
-        It returns the sorted data of just the sorting column, not all the columns.
+        and then slice. It returns the sorted data of just the sorting column, not all the columns.
+        Every dtype is sorted by the `sort_key` of its cells, with the `(column, sort_key)` index.
 
         Args:
             data (Manager["GenericData"]):
@@ -161,40 +159,13 @@ class GenericData(Model):
         sort_by = request_query["sort_by"]
         ascending: bool = request_query["asc"]
 
-        # Generate the order_by string
-        sorting_col = cols[sort_by]
-        col_type: str = sorting_col["col_type"]
-        order_by_list = SORTING_MAP[col_type]
-
         # Get data from the sorting column
-        only_sorting_col_data = data.filter(column=sorting_col["id"])
-
-        if len(order_by_list) == 1:
-            order_by = order_by_list[0]
-
-            # Add '-' if it is descending
-            order_by = f"{'-' if not ascending else ''}{order_by}"
-
-            # order and slice the data from the column
-            sorted_col_data_models = only_sorting_col_data.order_by(order_by)[
-                page * page_size : (page + 1) * page_size
-            ]
-        else:
-            if col_type.startswith("int"):
-                signed_value = F(order_by_list[0]) * F(order_by_list[1])
-                order_by = "signed_value"
-                order_by = f"{'-' if not ascending else ''}{order_by}"
-                sorted_col_data_models = only_sorting_col_data.annotate(
-                    signed_value=signed_value
-                ).order_by(order_by)[page * page_size : (page + 1) * page_size]
-            elif col_type.startswith("complex"):
-                abs_value = AbsoluteValue(
-                    F(order_by_list[0]) ** 2 + F(order_by_list[1]) ** 2
-                )
-                order_by = "abs_value"
-                order_by = f"{'-' if not ascending else ''}{order_by}"
-                sorted_col_data_models = only_sorting_col_data.annotate(
-                    abs_value=abs_value
-                ).order_by(order_by)[page * page_size : (page + 1) * page_size]
+        only_sorting_col_data = data.filter(column=cols[sort_by]["id"])
+
+        # Rows with the same value keep the row order both ways
+        order_by = f"{'-' if not ascending else ''}sort_key"
+        sorted_col_data_models = only_sorting_col_data.order_by(order_by, "row")[
+            page * page_size : (page + 1) * page_size
+        ]
 
         return sorted_col_data_models
@@ -0,0 +1,49 @@
+from django.db.models import (
+    CharField,
+    DateTimeField,
+    JSONField,
+    Model,
+    PositiveBigIntegerField,
+    TextField,
+)
+
+
+class IngestJob(Model):
+    """
+    The model for the `api_ingest_job` table.
+    It stores the state of the files being ingested in the background.
+    """
+
+    # The states a job goes through
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATES = {
+        QUEUED: "Queued",
+        RUNNING: "Running",
+        DONE: "Done",
+        FAILED: "Failed",
+    }
+
+    job_id = CharField(max_length=32, unique=True)
+    file_id = CharField(max_length=50, null=False, blank=False)
+    state = CharField(choices=STATES, max_length=10, default=QUEUED)
+
+    # The rows already stored, updated on each commit of the ingestion
+    rows_ingested = PositiveBigIntegerField(default=0)
+
+    # The force casting errors, as returned by `infer_and_convert_data_types`
+    errors = JSONField(default=dict)
+
+    # Why the ingestion failed, if it did
+    failure = TextField(null=True)
+
+    created_at = DateTimeField(auto_now_add=True)
+    updated_at = DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "api_ingest_job"
+
+    def __str__(self) -> str:
+        return f"ingest_job = {self.job_id}: {self.file_id}, {self.state}"
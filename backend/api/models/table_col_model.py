@@ -28,10 +28,21 @@ class TableCol(Model):
         "timedelta64[ns]": "timedelta",
     }
 
+    # The storage engines that can hold the cells of a column, see `api/storage/`
+    STORAGES = {
+        "rows": "One database row per cell",
+        "columnar": "Compressed column segments on disk",
+        "typed": "One row per cell in the table of its type",
+    }
+
     file_id = CharField(max_length=50, null=False, blank=False)
     col_index = PositiveIntegerField(null=False)
     col_name = CharField(max_length=30, null=False, blank=False)
     col_type = CharField(choices=TYPES, max_length=20)
+    # The format the datetimes of the column are parsed with, reused by every later chunk
+    datetime_format = CharField(max_length=50, null=True, blank=True)
+    # Where the cells of the column are stored, the same for every column of a file
+    storage = CharField(choices=STORAGES, max_length=10, default="rows")
 
     class Meta:
         db_table = "api_table_col"
@@ -0,0 +1,119 @@
+from typing import Dict, FrozenSet, Type
+
+from django.db.models import (
+    CASCADE,
+    BigIntegerField,
+    BooleanField,
+    CharField,
+    DateTimeField,
+    FloatField,
+    ForeignKey,
+    Index,
+    Model,
+    PositiveBigIntegerField,
+)
+
+from .generic_data_model import IMPORTANT_KEYS_BY_DTYPE
+from .table_col_model import TableCol
+
+
+class TypedCell(Model):
+    """
+    The common fields of the narrow cell tables of the `typed` storage engine.
+    Each table only has the value fields of its type, so no row carries unused `NULL`s,
+    and its `(column, value)` index sorts a column without sorting its cells.
+    """
+
+    column = ForeignKey(TableCol, on_delete=CASCADE)
+    row = PositiveBigIntegerField()
+
+    class Meta:
+        abstract = True
+
+
+class IntegerCell(TypedCell):
+    """The cells of the signed and unsigned integer columns, and the nanoseconds of timedeltas."""
+
+    value = BigIntegerField()
+
+    class Meta:
+        db_table = "api_integer_cell"
+        indexes = [Index(fields=["column", "row"]), Index(fields=["column", "value"])]
+
+
+class FloatCell(TypedCell):
+    """The cells of the float columns, `NaN` is stored as `NULL`."""
+
+    value = FloatField(null=True)
+
+    class Meta:
+        db_table = "api_float_cell"
+        indexes = [Index(fields=["column", "row"]), Index(fields=["column", "value"])]
+
+
+class ComplexCell(TypedCell):
+    """The cells of the complex columns. The value is the magnitude, complex numbers sort by it."""
+
+    value = FloatField()
+    real = FloatField()
+    imag = FloatField()
+
+    class Meta:
+        db_table = "api_complex_cell"
+        indexes = [Index(fields=["column", "row"]), Index(fields=["column", "value"])]
+
+
+class StringCell(TypedCell):
+    """The cells of the text and category columns."""
+
+    value = CharField(max_length=100, null=True)
+
+    class Meta:
+        db_table = "api_string_cell"
+        indexes = [Index(fields=["column", "row"]), Index(fields=["column", "value"])]
+
+
+class DatetimeCell(TypedCell):
+    """The cells of the datetime columns, `NaT` is stored as `NULL`."""
+
+    value = DateTimeField(null=True)
+
+    class Meta:
+        db_table = "api_datetime_cell"
+        indexes = [Index(fields=["column", "row"]), Index(fields=["column", "value"])]
+
+
+class BoolCell(TypedCell):
+    """The cells of the boolean columns."""
+
+    value = BooleanField(null=True)
+
+    class Meta:
+        db_table = "api_bool_cell"
+        indexes = [Index(fields=["column", "row"]), Index(fields=["column", "value"])]
+
+
+# The table of each set of `GenericData` keys a dtype uses
+TYPED_CELLS_BY_KEYS: Dict[FrozenSet[str], Type[TypedCell]] = {
+    frozenset({"uint_value"}): IntegerCell,
+    frozenset({"uint_value", "int_sign_value"}): IntegerCell,
+    frozenset({"double_value"}): FloatCell,
+    frozenset({"double_value", "double_imag_value"}): ComplexCell,
+    frozenset({"string_value"}): StringCell,
+    frozenset({"datetime_value"}): DatetimeCell,
+    frozenset({"bool_value"}): BoolCell,
+}
+
+
+def typed_cell_model(dtype: str) -> Type[TypedCell]:
+    """
+    The table that stores the cells of a dtype, chosen from its `IMPORTANT_KEYS_BY_DTYPE`.
+
+    Args:
+        dtype (str): The `col_type` of a column.
+
+    Returns:
+        Type[TypedCell]: The model of the cells of the column.
+    """
+
+    return TYPED_CELLS_BY_KEYS[frozenset(IMPORTANT_KEYS_BY_DTYPE[dtype])]
@@ -0,0 +1,53 @@
+from django.db.models import (
+    CharField,
+    DateTimeField,
+    JSONField,
+    Model,
+    PositiveIntegerField,
+    Q,
+    UniqueConstraint,
+)
+
+
+class UploadDigest(Model):
+    """
+    The model for the `api_upload_digest` table.
+    It maps the digest of an upload (its bytes and force casting options) to the files
+    it was stored as, so identical uploads reuse them instead of storing a copy.
+    A workbook has one row per sheet, all with the same digest.
+    """
+
+    digest = CharField(max_length=64, db_index=True)
+    file_id = CharField(max_length=50, unique=True)
+    sheet_name = CharField(max_length=31, null=True)
+
+    # The amount of sheets stored for the digest, an upload is reused once all of them are
+    sheets = PositiveIntegerField(default=1)
+
+    # The force casting errors of the first upload, returned again to the next ones
+    errors = JSONField(default=dict)
+
+    # The uploads that got this file, each with its `FileAlias`, it is only deleted
+    # when the last one deletes it
+    references = PositiveIntegerField(default=1)
+
+    created_at = DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "api_upload_digest"
+        # One stored file per digest and sheet, released workbooks have an empty digest
+        constraints = [
+            UniqueConstraint(
+                fields=["digest", "sheet_name"],
+                condition=Q(sheet_name__isnull=False) & ~Q(digest=""),
+                name="upload_digest_sheet_unique",
+            ),
+            UniqueConstraint(
+                fields=["digest"],
+                condition=Q(sheet_name__isnull=True) & ~Q(digest=""),
+                name="upload_digest_file_unique",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"upload_digest = {self.digest[:12]}: {self.file_id}, {self.references} references"
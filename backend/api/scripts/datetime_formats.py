@@ -0,0 +1,77 @@
+import warnings
+from typing import Dict, List, Optional
+
+import pandas as pd
+from pandas.tseries.api import guess_datetime_format
+
+from .sampling import sample_column
+
+# The key of `DataFrame.attrs` with the format each datetime column was parsed with
+DATETIME_FORMATS = "datetime_formats"
+
+
+def detect_datetime_format(data: pd.Series) -> Optional[str]:
+    """
+    Detects the format of a column of datetimes from a sample of it.
+    The candidates are the formats guessed from its first value reading it month first
+    (what `pd.to_datetime` does) and, unless it starts with the year, day first.
+    A first value both candidates parse, like `12/02/2000`, is ambiguous, and so is the
+    format. Otherwise only a candidate that parses the whole sample is kept.
+
+    Args:
+        data (pd.Series): The column to detect the format of.
+
+    Returns:
+        Optional[str]: The `strftime` format of the column. None when the first value is
+            ambiguous, or no candidate or more than one parses the sample.
+    """
+
+    sample = sample_column(data).dropna()
+    if len(sample) == 0 or not isinstance(sample.iloc[0], str):
+        return None
+
+    first = sample.iloc[0]
+    candidates: List[str] = []
+    with warnings.catch_warnings():
+        # Guessing month first warns about values that can only be day first
+        warnings.simplefilter("ignore", UserWarning)
+        for dayfirst in (False, True):
+            candidate = guess_datetime_format(first, dayfirst=dayfirst)
+            if candidate is not None and candidate not in candidates:
+                candidates.append(candidate)
+            # Year first values are always year, month and day, as in ISO 8601
+            if candidate is not None and candidate.startswith("%Y"):
+                break
+
+    parsing_first = [
+        candidate
+        for candidate in candidates
+        if pd.notna(pd.to_datetime(first, errors="coerce", format=candidate))
+    ]
+    if len(parsing_first) > 1:
+        return None
+
+    fitting = [
+        candidate
+        for candidate in candidates
+        if pd.to_datetime(sample, errors="coerce", format=candidate).notna().all()
+    ]
+    if len(fitting) != 1:
+        return None
+
+    return fitting[0]
+
+
+def get_datetime_formats(df: pd.DataFrame) -> Dict[str, str]:
+    """
+    The formats the datetime columns of the DataFrame were parsed with, by column name.
+    The dictionary lives in `df.attrs`, so it can be updated in place.
+
+    Args:
+        df (pd.DataFrame): The converted DataFrame.
+
+    Returns:
+        Dict[str, str]: The format of each datetime column that has a detected one.
+    """
+
+    return df.attrs.setdefault(DATETIME_FORMATS, {})
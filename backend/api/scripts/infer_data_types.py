@@ -1,14 +1,122 @@
-from typing import Dict, Tuple
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from threading import Lock
+from typing import Dict, Optional, Tuple
 
+import django
 import pandas as pd
+from django.conf import settings
 
+from .datetime_formats import detect_datetime_format, get_datetime_formats
 from .force_cast import force_cast
+from .profiler import ColumnProfile
+from .sampling import SAMPLE_HEAD_ROWS, SAMPLE_RANDOM_ROWS, rank_conversions
 from .type_inferences.categories import category_conversion
 from .type_inferences.complex import complex_conversion
 from .type_inferences.datetimes import date_time_conversion
 from .type_inferences.numbers import number_conversion, number_downcast
 from .type_inferences.time_delta import time_delta_conversion
 
+# Below this amount of cells the columns are inferred in the current process,
+# as sending them to the pool costs more than inferring them
+PARALLEL_MIN_CELLS = 200_000
+
+# The pool of processes that infer the columns, created on first use
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = Lock()
+
+
+def get_pool() -> ProcessPoolExecutor:
+    """
+    The process wide pool with `INFERENCE_PROCESSES` workers.
+    Workers are started from a fork server, so they do not inherit the threads
+    of the server, and set `Django` up before inferring anything.
+
+    Returns:
+        ProcessPoolExecutor: The pool of inference workers.
+    """
+
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=settings.INFERENCE_PROCESSES,
+                mp_context=multiprocessing.get_context("forkserver"),
+                initializer=django.setup,
+            )
+
+    return _pool
+
+
+def infer_and_convert_column(
+    data: pd.Series, casting: Optional[str]
+) -> Tuple[pd.Series, Optional[str], Optional[str]]:
+    """
+    Infers and converts a single column, see `infer_and_convert_data_types`.
+    It only depends on the column, so columns can be inferred in any process.
+
+    Args:
+        data (pd.Series): The column to infer and convert.
+        casting (Optional[str]): The force casting option of the column, if any.
+
+    Returns:
+        Tuple: A tuple containing the converted column and the force casting error if any.
+            - **data** (pd.Series): The column with the inferred and converted data type.
+            - **error** (Optional[str]): The error of the force casting.
+            - **datetime_format** (Optional[str]): The format a datetime column was parsed with, if known.
+    """
+
+    error = None
+    if casting is not None:
+        datetime_format = None
+        if casting == "datetime":
+            datetime_format = detect_datetime_format(data)
+        elif casting.startswith("datetime("):
+            datetime_format = casting[len("datetime(") : -1]
+
+        if datetime_format is not None:
+            casting = f"datetime({datetime_format})"
+
+        converted, error = force_cast(data, casting)
+        if error is None:
+            return converted, None, datetime_format
+
+    if data.dtype == "int64" or data.dtype == "float64":
+        # downcast the data
+        return number_downcast(data), error, None
+
+    # The conversions work over a DataFrame, so the column gets its own
+    col = data.name
+    df = data.to_frame()
+
+    # Try to do better than object
+    if data.dtype == "object":
+        # Attempt to convert to numeric first
+        conversions = [
+            number_conversion,
+            complex_conversion,
+            category_conversion,
+            time_delta_conversion,
+            date_time_conversion,
+        ]
+
+        # Only verify on the whole column the conversions that work on a sample
+        if (
+            settings.INFERENCE_SAMPLING
+            and len(data) > SAMPLE_HEAD_ROWS + SAMPLE_RANDOM_ROWS
+        ):
+            conversions = rank_conversions(data, conversions)
+
+        # Every conversion decides from the same profile, so the column is parsed once
+        profile = ColumnProfile(data)
+
+        # The first one that works on the whole column wins, otherwise fall back to the next
+        for conversion in conversions:
+            if conversion(df, col, profile=profile):
+                break
+
+    return df[col], error, get_datetime_formats(df).get(col)
+
 
 def infer_and_convert_data_types(
     df: pd.DataFrame, force_casting: Dict[str, str]
@@ -20,6 +128,13 @@ def infer_and_convert_data_types(
     infer the data type of the column and convert it to a more
     appropriate data type.
 
+    Each column is handled by `infer_and_convert_column`. When the DataFrame
+    is big enough and `INFERENCE_PROCESSES` is more than one, the columns
+    are handled in parallel by a pool of processes.
+
+    The formats the datetime columns were parsed with are kept in the
+    `get_datetime_formats` of the returned DataFrame.
+
     Args:
         df (pd.DataFrame): The dataframe to infer and convert
         force_casting (Dict[str, str]): The dictionary of force casting options.
@@ -32,41 +147,21 @@ def infer_and_convert_data_types(
 
     errors: Dict[str, str] = {}
 
-    for col in df.columns:
-        data = df[col]
-
-        if col in force_casting:
-            df[col], error = force_cast(data, force_casting[col])
-            if error is not None:
-                errors[col] = error
-            else:
-                continue
-
-        if data.dtype == "int64" or data.dtype == "float64":
-            # downcast the data
-            df[col] = number_downcast(data)
-            continue
-
-        if data.dtype == "bool":
-            # Nothing to do here
-            continue
-
-        # Try to do better than object
-        if data.dtype == "object":
-            # Attempt to convert to numeric first
-            if number_conversion(df, col):
-                continue
-
-            if complex_conversion(df, col):
-                continue
-
-            if category_conversion(df, col):
-                continue
-
-            if time_delta_conversion(df, col):
-                continue
-
-            if date_time_conversion(df, col):
-                continue
+    columns = [df[col] for col in df.columns]
+    castings = [force_casting.get(col) for col in df.columns]
+
+    # Columns are independent, so wide files are inferred across processes
+    if settings.INFERENCE_PROCESSES > 1 and df.size >= PARALLEL_MIN_CELLS:
+        results = get_pool().map(infer_and_convert_column, columns, castings)
+    else:
+        results = map(infer_and_convert_column, columns, castings)
+
+    datetime_formats = get_datetime_formats(df)
+    for col, (converted, error, datetime_format) in zip(df.columns, results):
+        df[col] = converted
+        if error is not None:
+            errors[col] = error
+        if datetime_format is not None:
+            datetime_formats[col] = datetime_format
 
     return df, errors
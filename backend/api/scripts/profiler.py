@@ -0,0 +1,175 @@
+import re
+from functools import cached_property
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+# Permissive patterns of the strings each parser could accept. They are supersets,
+# a string that does not match is never parsed by them, but a match does not ensure it.
+STRING_CLASSES: Dict[str, re.Pattern] = {
+    # `complex()` only accepts numbers, `_` between digits, `j`, parenthesis and the
+    # words inf, infinity and nan
+    "complex": re.compile(r"[\s()+\-._\deEjJinfatyINFATY]+$"),
+    # `pd.to_timedelta` needs at least one number
+    "timedelta": re.compile(r".*\d", re.DOTALL),
+    # `pd.to_datetime` needs a number or one of the words it understands
+    "datetime": re.compile(
+        r".*(?:\d|now|today|tomorrow|yesterday"
+        r"|jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec"
+        r"|mon|tue|wed|thu|fri|sat|sun)",
+        re.DOTALL | re.IGNORECASE,
+    ),
+}
+
+# Strings up to this length are classified as a matrix of code points with NumPy,
+# longer ones (rare in a column that could be parsed) go through the patterns.
+MAX_VECTORIZED_LENGTH = 64
+
+# The code points `complex()` accepts, the same as the "complex" pattern
+COMPLEX_CODE_POINTS = np.zeros(128, dtype=bool)
+COMPLEX_CODE_POINTS[0] = True  # The padding of the strings shorter than the matrix
+COMPLEX_CODE_POINTS[
+    [ord(char) for char in " \t\n\r\f\v()+-._0123456789eEjJinfatyINFATY"]
+] = True
+
+
+def classify_strings(strings: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Matches an array of strings against the `STRING_CLASSES` without a Python level
+    loop for the short ones: they are laid out as a matrix of code points and each
+    class becomes a check over its rows.
+
+    Args:
+        strings (np.ndarray): An object array with only strings.
+
+    Returns:
+        Dict[str, np.ndarray]: For each class, a boolean array of the strings that match it.
+    """
+
+    hits = {name: np.zeros(len(strings), dtype=bool) for name in STRING_CLASSES}
+    if len(strings) == 0:
+        return hits
+
+    lengths = np.fromiter(map(len, strings), dtype=np.int64, count=len(strings))
+    short = np.flatnonzero(lengths <= MAX_VECTORIZED_LENGTH)
+
+    # The padding of the matrix are zeros
+    points = np.array(strings[short], dtype=str).view(np.uint32)
+    points = points.reshape(len(short), -1) if len(short) else points.reshape(0, 0)
+    ascii_only = (points < 128).all(axis=1)
+    short, points = short[ascii_only], points[ascii_only]
+
+    digits = ((points >= ord("0")) & (points <= ord("9"))).any(axis=1)
+    hits["complex"][short] = COMPLEX_CODE_POINTS[points].all(axis=1) & (
+        lengths[short] > 0
+    )
+    hits["timedelta"][short] = digits
+    hits["datetime"][short] = digits
+
+    # Long or unicode strings are matched one by one, like the ascii ones whose
+    # only chance of being a datetime is a word
+    matched = np.ones(len(strings), dtype=bool)
+    matched[short] = False
+    for name, pattern in STRING_CLASSES.items():
+        positions = np.flatnonzero(matched)
+        if name == "datetime":
+            positions = np.union1d(positions, short[~digits])
+
+        hits[name][positions] = [
+            pattern.match(string) is not None for string in strings[positions]
+        ]
+
+    return hits
+
+
+class ColumnProfile:
+    """
+    The facts about a column that the type inferences need to decide its type.
+    Each group of facts is computed once, with a vectorized pass over the column,
+    the first time an inference asks for it.
+    """
+
+    def __init__(self, data: pd.Series):
+        """
+        Args:
+            data (pd.Series): The column to profile.
+        """
+
+        self.data = data
+        self.rows = len(data)
+
+    @cached_property
+    def null_count(self) -> int:
+        """The amount of null values in the column."""
+        return int(self.data.isna().sum())
+
+    @cached_property
+    def cardinality(self) -> int:
+        """The amount of distinct values in the column, counting null as one."""
+        return int(self.data.nunique(dropna=False))
+
+    @cached_property
+    def numeric(self) -> pd.Series:
+        """The column parsed as numbers, with NaN where a value is not a number."""
+        return pd.to_numeric(self.data, errors="coerce")
+
+    @cached_property
+    def numeric_nan_count(self) -> int:
+        """The amount of values that are not numbers, including the null ones."""
+        return int(self.numeric.isna().sum())
+
+    @cached_property
+    def numeric_min(self) -> float:
+        """The smallest number of the column, NaN if there are none."""
+        return self.numeric.min()
+
+    @cached_property
+    def numeric_max(self) -> float:
+        """The biggest number of the column, NaN if there are none."""
+        return self.numeric.max()
+
+    @cached_property
+    def has_fraction(self) -> bool:
+        """Whether any number of the column is not an integer."""
+        values = self.numeric.dropna().to_numpy()
+        if values.dtype.kind in "iu":
+            return False
+
+        return bool((values != np.floor(values)).any())
+
+    @cached_property
+    def string_class_rates(self) -> Dict[str, float]:
+        """
+        The rate of the not null values that could belong to each of the `STRING_CLASSES`.
+        Values that are not strings can not be judged by a pattern, so they count as hits.
+        """
+
+        not_null = self.data.dropna()
+        if len(not_null) == 0:
+            return {name: 1.0 for name in STRING_CLASSES}
+
+        values = not_null.to_numpy(dtype=object)
+        is_string = np.fromiter(
+            (type(value) is str for value in values), dtype=bool, count=len(values)
+        )
+        matches = classify_strings(values[is_string])
+
+        rates: Dict[str, float] = {}
+        for name in STRING_CLASSES:
+            hits = matches[name].sum() + (~is_string).sum()
+            rates[name] = float(hits / len(not_null))
+
+        return rates
+
+    @property
+    def complex_rate(self) -> float:
+        return self.string_class_rates["complex"]
+
+    @property
+    def timedelta_rate(self) -> float:
+        return self.string_class_rates["timedelta"]
+
+    @property
+    def datetime_rate(self) -> float:
+        return self.string_class_rates["datetime"]
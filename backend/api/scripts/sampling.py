@@ -0,0 +1,77 @@
+from typing import Callable, List
+
+import numpy as np
+import pandas as pd
+
+from .profiler import ColumnProfile
+from .type_inferences.categories import category_conversion
+
+# The rows of a column used to rank the conversions, its first rows plus random ones
+SAMPLE_HEAD_ROWS = 1000
+SAMPLE_RANDOM_ROWS = 1000
+SAMPLE_SEED = 0
+
+Conversion = Callable[..., bool]
+
+
+def sample_column(data: pd.Series) -> pd.Series:
+    """
+    Takes a bounded sample of the column: its first `SAMPLE_HEAD_ROWS` rows,
+    `SAMPLE_RANDOM_ROWS` random rows and its first non null value, which is the one
+    `pd.to_datetime` guesses the format from. The sample keeps the order of the column.
+
+    Args:
+        data (pd.Series): The column to sample.
+
+    Returns:
+        pd.Series: The sample of the column.
+    """
+
+    rng = np.random.default_rng(SAMPLE_SEED)
+    positions = np.concatenate(
+        [
+            np.arange(min(SAMPLE_HEAD_ROWS, len(data))),
+            rng.choice(
+                len(data), size=min(SAMPLE_RANDOM_ROWS, len(data)), replace=False
+            ),
+            np.flatnonzero(data.notna().to_numpy())[:1],
+        ]
+    )
+
+    return data.iloc[np.unique(positions)]
+
+
+def rank_conversions(
+    data: pd.Series, conversions: List[Conversion]
+) -> List[Conversion]:
+    """
+    Tries every conversion on a sample of the column and only keeps the ones that work,
+    in the same order. A conversion that fails on some rows also fails on the whole column,
+    so skipping them never changes the inferred type, it only avoids parsing the whole
+    column for types it clearly is not.
+
+    Args:
+        data (pd.Series): The column to infer.
+        conversions (List[Conversion]): The conversions to try, by priority.
+
+    Returns:
+        List[Conversion]: The conversions that worked on the sample, by priority.
+    """
+
+    sample = sample_column(data)
+    profile = ColumnProfile(sample)
+    col = data.name
+
+    ranked: List[Conversion] = []
+    for conversion in conversions:
+        df = sample.to_frame()
+        if conversion is category_conversion:
+            # Whether it is a category depends on the size of the whole column
+            works = category_conversion(df, col, total_rows=len(data), profile=profile)
+        else:
+            works = conversion(df, col, profile=profile)
+
+        if works:
+            ranked.append(conversion)
+
+    return ranked
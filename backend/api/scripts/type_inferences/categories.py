@@ -1,28 +1,36 @@
-from typing import Set
+from typing import Optional
 
 import pandas as pd
 
+from ..profiler import ColumnProfile
+
 PERCENTAGE_TO_BE_CATEGORY = 0.05
 
 
-def category_conversion(df: pd.DataFrame, col: str) -> bool:
+def category_conversion(
+    df: pd.DataFrame,
+    col: str,
+    total_rows: Optional[int] = None,
+    profile: Optional[ColumnProfile] = None,
+) -> bool:
     """
     Convert the column to a category if the percentage of unique values is less than 5%.
 
     Args:
         df (pd.DataFrame): The whole dataframe
         col (str): The column to convert
+        total_rows (Optional[int]): The amount of rows of the whole column, when `df` only has a sample of it.
+        profile (Optional[ColumnProfile]): The profile of the column, if already computed
 
     Returns:
         bool: Whether the column was converted to a category or not.
     """
 
     data = df[col]
-    string_set: Set[str] = set()
-    for value in data:
-        string_set.add(value)
-        if len(string_set) / len(data) > PERCENTAGE_TO_BE_CATEGORY:
-            return False
+    total_rows = total_rows or len(data)
+    profile = profile or ColumnProfile(data)
+    if total_rows and profile.cardinality / total_rows > PERCENTAGE_TO_BE_CATEGORY:
+        return False
 
     converted = pd.Categorical(data)
     df[col] = converted
@@ -1,19 +1,32 @@
+from typing import Optional
+
 import pandas as pd
 
+from ..profiler import ColumnProfile
+
 
-def complex_conversion(df: pd.DataFrame, col: str) -> bool:
+def complex_conversion(
+    df: pd.DataFrame, col: str, profile: Optional[ColumnProfile] = None
+) -> bool:
     """
     Convert the column to a complex number if possible.
 
     Args:
         df (pd.DataFrame): The whole dataframe
         col (str): The column to convert
+        profile (Optional[ColumnProfile]): The profile of the column, if already computed
 
     Returns:
         bool: Whether the column was converted to a complex number or not.
     """
 
     data = df[col]
+
+    # Values that can not be complex numbers make the whole conversion fail
+    profile = profile or ColumnProfile(data)
+    if profile.complex_rate < 1:
+        return False
+
     try:
         converted = data.astype("complex", errors="raise")
     except ValueError:
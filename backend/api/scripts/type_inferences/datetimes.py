@@ -1,21 +1,42 @@
+from typing import Optional
+
 import pandas as pd
 
+from ..datetime_formats import detect_datetime_format, get_datetime_formats
+from ..profiler import ColumnProfile
+
 
-def date_time_conversion(df: pd.DataFrame, col: str) -> bool:
+def date_time_conversion(
+    df: pd.DataFrame, col: str, profile: Optional[ColumnProfile] = None
+) -> bool:
     """
     Convert the column to a datetime if possible.
+    The whole column is parsed with the format detected from a sample of it, which is
+    recorded in the `get_datetime_formats` of the DataFrame. When the format is ambiguous
+    it is left to `pd.to_datetime` to guess.
 
     Args:
         df (pd.DataFrame): The whole dataframe
         col (str): The column to convert
+        profile (Optional[ColumnProfile]): The profile of the column, if already computed
 
     Returns:
         bool: Whether the column was converted to a datetime or not.
     """
     data = df[col]
-    converted = pd.to_datetime(data, errors="coerce")
+
+    # Null values and values that can not be datetimes would be NaT
+    profile = profile or ColumnProfile(data)
+    if profile.null_count > 0 or profile.datetime_rate < 1:
+        return False
+
+    datetime_format = detect_datetime_format(data)
+    converted = pd.to_datetime(data, errors="coerce", format=datetime_format)
     if not converted.notna().all():
         return False
 
     df[col] = converted
+    if datetime_format is not None:
+        get_datetime_formats(df)[col] = datetime_format
+
     return True
@@ -1,5 +1,9 @@
+from typing import Optional
+
 import pandas as pd
 
+from ..profiler import ColumnProfile
+
 
 class NotNumbers(Exception):
     """Just a custom Exception to identify a failure in number conversion"""
@@ -9,12 +13,16 @@ class NotNumbers(Exception):
 MAX_NAN = 2
 
 
-def number_downcast(data: pd.Series) -> pd.Series:
+def number_downcast(
+    data: pd.Series, profile: Optional[ColumnProfile] = None
+) -> pd.Series:
     """
     Downcast the numbers to the smallest possible type.
+    The column is parsed once by the profile, the downcasts then work over numbers.
 
     Args:
         data (pd.Series): The data to downcast
+        profile (Optional[ColumnProfile]): The profile of the data, if already computed
 
     Raises:
         NotNumbers: If the data is not numbers
@@ -22,42 +30,49 @@ def number_downcast(data: pd.Series) -> pd.Series:
     Returns:
         pd.Series: The downcasted data
     """
-    converted = pd.to_numeric(data, errors="coerce", downcast="unsigned")
-    num_of_exceptions = len(converted) - converted.count()
+    profile = profile or ColumnProfile(data)
+    numbers = profile.numeric
+
+    num_of_exceptions = profile.numeric_nan_count
     if num_of_exceptions > MAX_NAN:
         raise NotNumbers
     elif num_of_exceptions > 0:
         # As there will be NaN, we will be converting to float (32) ideally
-        return pd.to_numeric(data, errors="coerce", downcast="float")
+        return pd.to_numeric(numbers, downcast="float")
 
     # Check it it could be the smallest possible unsigned
-    if converted.dtype in [f"uint{base}" for base in [8, 16, 32, 64]]:
-        return converted
+    if not profile.has_fraction and not profile.numeric_min < 0:
+        converted = pd.to_numeric(numbers, downcast="unsigned")
+        if converted.dtype in [f"uint{base}" for base in [8, 16, 32, 64]]:
+            return converted
 
     # Check if it could be the smallest possible signed integer
-    converted = pd.to_numeric(data, errors="coerce", downcast="integer")
-
-    if converted.dtype in [f"int{base}" for base in [8, 16, 32, 64]]:
-        return converted
+    if not profile.has_fraction:
+        converted = pd.to_numeric(numbers, downcast="integer")
+        if converted.dtype in [f"int{base}" for base in [8, 16, 32, 64]]:
+            return converted
 
     # Only case possible is float so try to downcast it to the smallest (32)
-    return pd.to_numeric(data, errors="coerce", downcast="float")
+    return pd.to_numeric(numbers, downcast="float")
 
 
-def number_conversion(df: pd.DataFrame, col: str) -> bool:
+def number_conversion(
+    df: pd.DataFrame, col: str, profile: Optional[ColumnProfile] = None
+) -> bool:
     """
     Convert the column to a number if possible.
 
     Args:
         df (pd.DataFrame): The whole dataframe
         col (str): The column to convert
+        profile (Optional[ColumnProfile]): The profile of the column, if already computed
 
     Returns:
         bool: Whether the column was converted to a number or not.
     """
     data = df[col]
     try:
-        new_col = number_downcast(data)
+        new_col = number_downcast(data, profile)
         df[col] = new_col
         return True
     except NotNumbers:
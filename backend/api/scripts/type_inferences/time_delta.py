@@ -1,18 +1,31 @@
+from typing import Optional
+
 import pandas as pd
 
+from ..profiler import ColumnProfile
+
 
-def time_delta_conversion(df: pd.DataFrame, col: str) -> bool:
+def time_delta_conversion(
+    df: pd.DataFrame, col: str, profile: Optional[ColumnProfile] = None
+) -> bool:
     """
     Convert the column to a timedelta if possible.
 
     Args:
         df (pd.DataFrame): The whole dataframe
         col (str): The column to convert
+        profile (Optional[ColumnProfile]): The profile of the column, if already computed
 
     Returns:
         bool: Whether the column was converted to a timedelta or not.
     """
     data = df[col]
+
+    # Null values and values that can not be timedeltas would be NaT
+    profile = profile or ColumnProfile(data)
+    if profile.null_count > 0 or profile.timedelta_rate < 1:
+        return False
+
     converted = pd.to_timedelta(data, errors="coerce")
     if not converted.notna().all():
         return False
@@ -45,7 +45,7 @@ class GenericDataSerializer(ModelSerializer):
         """
 
         for key, value in attrs.items():
-            if key in {"row", "column"}:
+            if key in {"row", "column", "sort_key"}:
                 continue
 
             if key in important_keys:
@@ -163,6 +163,9 @@ class GenericDataSerializer(ModelSerializer):
             elif dtype == "category":
                 value = instance.string_value
 
+            elif dtype == "bool":
+                value = instance.bool_value
+
             elif dtype == "timedelta64[ns]":
                 time_delta_value = instance.uint_value
                 timedelta: pd.Timedelta = pd.to_timedelta(time_delta_value, "ns")
@@ -1,16 +1,83 @@
-from typing import Any, Dict
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+from typing import Any, Dict, Optional
 
-from api.models.table_col_model import TableCol
-from api.serializers.table_col_serializer import TableColSerializer
+from api.storage.schema_registry import get_schema
+from rest_framework.fields import empty
 from rest_framework.serializers import (
     BooleanField,
     CharField,
+    ChoiceField,
+    Field,
     IntegerField,
     Serializer,
     ValidationError,
 )
 
 
+class CursorField(Field):
+    """
+    An opaque keyset pagination cursor. It points to the row a page starts after,
+    or ends before, in a sorting: the `sort_by` and `asc` of the page, the `sort_key`
+    of the value of the row in the sorting column (see `encode_sort_keys`) and the row.
+
+    An empty cursor is the first page. Internally, a cursor is a dictionary with
+    the `sort_by`, `asc`, `key`, `row` and `before` keys, the first page only has
+    the last three, with `key` and `row` set to `None`.
+    """
+
+    @staticmethod
+    def encode(
+        sort_by: str, asc: bool, key: Optional[bytes], row: int, before: bool
+    ) -> str:
+        """
+        Encodes a cursor for a response.
+
+        Args:
+            sort_by (str): The column the pages are sorted by, or "row_index".
+            asc (bool): Whether the pages are sorted in ascending order.
+            key (Optional[bytes]): The `sort_key` of the row, `None` for nulls and row sorting.
+            row (int): The row index the page starts after, or ends before.
+            before (bool): Whether the page ends before the row.
+
+        Returns:
+            cursor (str): The opaque cursor.
+        """
+
+        payload = {
+            "s": sort_by,
+            "a": asc,
+            "k": None if key is None else key.hex(),
+            "r": row,
+            "b": before,
+        }
+        return urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+    def get_value(self, dictionary: Dict[str, Any]) -> Any:
+        # An empty cursor is the first page, not a missing cursor
+        return dictionary.get(self.field_name, empty)
+
+    def to_internal_value(self, data: str) -> Dict[str, Any]:
+        if data == "":
+            return {"key": None, "row": None, "before": False}
+
+        try:
+            payload = json.loads(urlsafe_b64decode(data.encode()))
+            return {
+                "sort_by": str(payload["s"]),
+                "asc": bool(payload["a"]),
+                "key": None if payload["k"] is None else bytes.fromhex(payload["k"]),
+                "row": int(payload["r"]),
+                "before": bool(payload["b"]),
+            }
+        except (BinasciiError, ValueError, TypeError, KeyError):
+            raise ValidationError("invalid cursor")
+
+    def to_representation(self, value: Dict[str, Any]) -> Dict[str, Any]:
+        return value
+
+
 class GetDataSerializer(Serializer):
     """
     The serializer for the `get-data` endpoint.
@@ -23,10 +90,18 @@ class GetDataSerializer(Serializer):
     sort_by = CharField(default="row_index")
     asc = BooleanField(default=True)
 
+    # Keyset pagination, it replaces `page` and the cursor sets `sort_by` and `asc`
+    cursor = CursorField(required=False)
+
+    # The shape of the page, a list of rows or a list per column, see `columnar_rows`
+    format = ChoiceField(choices=["rows", "columnar"], default="rows")
+
     def validate_file_id(self, value: str) -> str:
         """
         The overridden method to validate the `file_id` field.
-        It checks if the `file_id` exists in the database.
+        It resolves the `file_id` of the upload to its stored file (see `FileAlias`)
+        and checks that the file exists in the database, with the schema registry.
+        The schema of the file is kept in `schema`, for the view.
 
         Args:
             value (str): The value of the `file_id` field.
@@ -35,17 +110,20 @@ class GetDataSerializer(Serializer):
             ValidationError: If the `file_id` does not exist in the database.
 
         Returns:
-            value (str): The value of the `file_id` field.
+            file_id (str): The id of the stored file.
         """
 
-        if TableCol.objects.filter(file_id=value).count() == 0:
+        schema = get_schema(value)
+        if schema is None:
             raise ValidationError(f"file_id '{value}' does not exist on db")
 
-        return value
+        self.schema = schema
+        return schema.file_id
 
     def validate(self, attrs: Dict[str, Any]) -> Dict[str, Any]:
         """
         The overridden method to validate the serializer fields.
+        A `cursor` sets the sorting of its pages and the first `page`.
         It checks if the `sort_by` field is a valid column name or `row_index`.
 
         Args:
@@ -58,19 +136,25 @@ class GetDataSerializer(Serializer):
             attrs (Dict[str, Any]): The attributes of the serializer after validation.
         """
 
+        cursor = attrs.get("cursor")
+        if cursor is not None:
+            attrs["page"] = 0
+            if "sort_by" in cursor:
+                attrs["sort_by"] = cursor["sort_by"]
+                attrs["asc"] = cursor["asc"]
+
         sort_by = attrs["sort_by"]
 
         # if the sort_by field is "row_index" there is no need to check the columns
         if sort_by == "row_index":
             return attrs
 
-        # Get the columns of the file
+        # Get the columns of the file, already loaded and checked by `validate_file_id`
         file_id = attrs["file_id"]
-        table_col_models = TableCol.objects.filter(file_id=file_id)
-        cols = TableColSerializer(list(table_col_models)).data
+        schema = self.schema
 
         # Check if the sort_by field is a valid column name
-        if sort_by not in cols.keys():
+        if sort_by not in schema.serialized_cols:
             raise ValidationError(
                 f"cannot sort by {sort_by} because {file_id} does not have that column"
             )
@@ -0,0 +1,19 @@
+from api.models.ingest_job_model import IngestJob
+from rest_framework.serializers import ModelSerializer
+
+
+class IngestJobSerializer(ModelSerializer):
+    """The serializer for the `IngestJob` model."""
+
+    class Meta:
+        model = IngestJob
+        fields = [
+            "job_id",
+            "file_id",
+            "state",
+            "rows_ingested",
+            "errors",
+            "failure",
+            "created_at",
+            "updated_at",
+        ]
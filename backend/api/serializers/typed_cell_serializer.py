@@ -0,0 +1,102 @@
+from typing import Any, Dict, List, Union
+
+import numpy as np
+import pandas as pd
+from api.models.typed_cell_models import ComplexCell, TypedCell
+from humanize import precisedelta
+from rest_framework.serializers import Serializer, ValidationError
+
+
+class TypedCellSerializer(Serializer):
+    """
+    The serializer for the cells of the `typed` storage engine.
+    It represents them exactly as `GenericDataSerializer` represents a `GenericData`.
+    """
+
+    def __init__(self, *args, **kwargs):
+        """
+        We can pass `row_order` as a kwarg to the serializer, the rows of a list of
+        cells are represented in that order, and `col_order`, the order of the values
+        of each row, by column name.
+        """
+
+        self.row_order = kwargs.pop("row_order", None)
+        self.col_order = kwargs.pop("col_order", None)
+        super().__init__(*args, **kwargs)
+
+    @staticmethod
+    def represent_value(cell: TypedCell, dtype: str) -> Any:
+        """
+        Transforms the value of a cell according to the dtype of its column.
+
+        Args:
+            cell (TypedCell): The cell to represent.
+            dtype (str): The `col_type` of its column.
+
+        Raises:
+            ValidationError: When the dtype is not supported by the serializer.
+
+        Returns:
+            value (Any): The represented value.
+        """
+
+        if dtype in {"object", "category", "datetime64[ns]", "bool"}:
+            return cell.value
+
+        if dtype.startswith(("uint", "int", "float")):
+            return np.dtype(dtype).type(cell.value)
+
+        if isinstance(cell, ComplexCell):
+            return {"real": cell.real, "imag": cell.imag}
+
+        if dtype == "timedelta64[ns]":
+            timedelta: pd.Timedelta = pd.to_timedelta(cell.value, "ns")
+            return precisedelta(timedelta, minimum_unit="milliseconds")
+
+        raise ValidationError(f"DTYPE '{dtype}' NOT FOUND")
+
+    def to_representation(
+        self, instance: Union[TypedCell, List[TypedCell]]
+    ) -> Union[Dict[str, Any], Dict[str, List[Dict[str, Any]]]]:
+        """
+        The overwritten `to_representation` method of `Serializer`.
+        A single cell is represented with its `row_index`, `col_name` and `value`,
+        and a list of cells as rows, ordered by `row_order`.
+
+        Args:
+            instance (Union[TypedCell, List[TypedCell]]): The single cell or list of cells
+                to represent, with their `column` already loaded.
+
+        Returns:
+            return (Union[Dict[str, Any], Dict[str, List[Dict[str, Any]]]]):
+                Either the representation of a single cell or the rows of the cells.
+        """
+
+        if not isinstance(instance, list):
+            return {
+                "row_index": instance.row,
+                "col_name": instance.column.col_name,
+                "value": self.represent_value(instance, instance.column.col_type),
+            }
+
+        # The values of each row, by column name
+        values_by_row: Dict[int, Dict[str, Any]] = {}
+        for cell in instance:
+            values = values_by_row.setdefault(cell.row, {})
+            values[cell.column.col_name] = self.represent_value(
+                cell, cell.column.col_type
+            )
+
+        if self.col_order is not None:
+            # The cells come table by table, not column by column
+            values_by_row = {
+                row_index: {col_name: values[col_name] for col_name in self.col_order}
+                for row_index, values in values_by_row.items()
+            }
+
+        rows = [
+            {"row_index": row_index, "values": values_by_row[row_index]}
+            for row_index in self.row_order
+        ]
+
+        return {"rows": rows}
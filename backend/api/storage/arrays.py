@@ -0,0 +1,328 @@
+from datetime import timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from humanize import precisedelta
+
+
+def column_arrays(data: pd.Series, dtype: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Encodes a converted column as a typed `numpy` array of values and a mask of its nulls.
+    Texts become fixed width unicode arrays and datetimes and timedeltas their nanoseconds,
+    so no array has the `object` dtype and all of them can be saved without pickling.
+
+    Args:
+        data (pd.Series): The converted column to encode.
+        dtype (str): The `col_type` of the column.
+
+    Returns:
+        Tuple: A tuple containing:
+            - values (np.ndarray): The value of every cell, with a placeholder for the nulls.
+            - mask (np.ndarray): Whether each cell is null.
+    """
+
+    if dtype in {"object", "category"}:
+        # Only `None` is a null text, like in `encode_strings`, `NaN` becomes "nan"
+        mask = (
+            data.to_numpy(dtype=object) == None
+        )  # noqa: E711 (elementwise comparison)
+        values = data.astype(str).to_numpy(dtype=str)
+        values[mask] = ""
+        return values, mask
+
+    mask = data.isna().to_numpy()
+
+    if dtype in {"datetime64[ns]", "timedelta64[ns]"}:
+        return data.to_numpy().view(np.int64), mask
+
+    return data.to_numpy(dtype=dtype), mask
+
+
+def array_series(values: np.ndarray, mask: np.ndarray, dtype: str) -> pd.Series:
+    """
+    The inverse of `column_arrays`, it builds back the column with its dtype.
+
+    Args:
+        values (np.ndarray): The value of every cell.
+        mask (np.ndarray): Whether each cell is null.
+        dtype (str): The `col_type` of the column.
+
+    Returns:
+        pd.Series: The column, indexed from 0.
+    """
+
+    if dtype in {"object", "category"}:
+        objects = values.astype(object)
+        objects[mask] = None
+        return pd.Series(objects, dtype=dtype)
+
+    if dtype in {"datetime64[ns]", "timedelta64[ns]"}:
+        # `NaT` is the smallest int64, the placeholder the nulls already have
+        return pd.Series(values.astype(np.int64).view(dtype))
+
+    return pd.Series(values.astype(dtype))
+
+
+def decode_values(values: np.ndarray, mask: np.ndarray, dtype: str) -> List[Any]:
+    """
+    Decodes typed cells into the values `GenericDataSerializer` represents them with,
+    so a page looks the same whatever storage engine it comes from.
+
+    Args:
+        values (np.ndarray): The value of every cell.
+        mask (np.ndarray): Whether each cell is null.
+        dtype (str): The `col_type` of the column.
+
+    Returns:
+        List[Any]: The represented value of every cell.
+    """
+
+    if dtype in {"object", "category"}:
+        decoded = values.astype(object)
+        decoded[mask] = None
+        return decoded.tolist()
+
+    if dtype.startswith(("uint", "int", "float")):
+        # The scalars keep the numpy type of the column
+        scalar = np.dtype(dtype).type
+        return [scalar(value) for value in values.astype(dtype)]
+
+    if dtype.startswith("complex"):
+        return [
+            {"real": real, "imag": imag}
+            for real, imag in zip(values.real.tolist(), values.imag.tolist())
+        ]
+
+    if dtype == "datetime64[ns]":
+        # The database keeps microseconds, as `datetime` does
+        datetimes = pd.to_datetime(values.astype(np.int64)).floor("us")
+        if settings.USE_TZ:
+            datetimes = datetimes.tz_localize(timezone.utc)
+        return [
+            None if null else datetime
+            for datetime, null in zip(datetimes.to_pydatetime(), mask)
+        ]
+
+    if dtype == "timedelta64[ns]":
+        return [
+            precisedelta(pd.to_timedelta(value, "ns"), minimum_unit="milliseconds")
+            for value in values.tolist()
+        ]
+
+    if dtype == "bool":
+        return values.astype(bool).tolist()
+
+    raise ValueError(f"DTYPE '{dtype}' NOT FOUND")
+
+
+def sort_index(
+    values: np.ndarray, mask: np.ndarray, dtype: str
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Sorts the rows of a column the same way `GenericData.slice_and_sort_by_col` does
+    in the database: integers by their signed value, complex numbers by their magnitude,
+    nulls first. Rows with the same value keep the row order.
+
+    Args:
+        values (np.ndarray): The value of every cell.
+        mask (np.ndarray): Whether each cell is null.
+        dtype (str): The `col_type` of the column.
+
+    Returns:
+        Tuple: A tuple containing:
+            - order (np.ndarray): The row indexes in ascending order, the permutation.
+            - ranks (np.ndarray): The dense rank of the value of each row in `order`,
+                -1 for the nulls. It never decreases.
+            - positions (np.ndarray): The position of each row in `order`, its inverse.
+    """
+
+    keys = values
+    if dtype.startswith("complex"):
+        keys = values.real**2 + values.imag**2
+
+    # Dense ranks put the nulls, and `NaN`, before every value
+    ranks = np.full(len(keys), -1, dtype=np.int64)
+    _, ranks[~mask] = np.unique(keys[~mask], return_inverse=True)
+
+    order = np.argsort(ranks, kind="stable")
+    positions = np.empty_like(order)
+    positions[order] = np.arange(len(order))
+    return order, ranks[order], positions
+
+
+def sorted_position(
+    ranks: np.ndarray, positions: np.ndarray, row: int, ascending: bool
+) -> int:
+    """
+    The position of a row in a sorted column, the inverse of `sorted_page`.
+
+    Args:
+        ranks (np.ndarray): The rank of the value of each row in the ascending order.
+        positions (np.ndarray): The position of each row in the ascending order.
+        row (int): The row index.
+        ascending (bool): Whether the column is read in ascending order.
+
+    Returns:
+        position (int): The position of the row.
+    """
+
+    position = int(positions[row])
+    if ascending:
+        return position
+
+    # Mirrored inside the group of its rank, like in `sorted_page`
+    first = int(np.searchsorted(ranks, ranks[position], side="left"))
+    last = int(np.searchsorted(ranks, ranks[position], side="right")) - 1
+    return len(ranks) - 1 - (first + last - position)
+
+
+def page_range(
+    request_query: Dict[str, Any], position: Callable[[int], int]
+) -> Tuple[int, int]:
+    """
+    The range of positions of the requested page in its sorting, from the `page`,
+    or from the position of the row of the `cursor` (see `CursorField`).
+
+    Args:
+        request_query (Dict[str, Any]): The validated query parameters of the request.
+        position (Callable[[int], int]): The position of a row in the sorting.
+
+    Returns:
+        Tuple: The first position of the page and the one after the last.
+    """
+
+    page_size: int = request_query["page_size"]
+    cursor = request_query.get("cursor")
+    if cursor is None or cursor["row"] is None:
+        page: int = request_query["page"]
+        return page * page_size, (page + 1) * page_size
+
+    cursor_position = position(cursor["row"])
+    if cursor["before"]:
+        return max(cursor_position - page_size, 0), cursor_position
+
+    return cursor_position + 1, cursor_position + 1 + page_size
+
+
+def sorted_page(
+    order: np.ndarray, ranks: np.ndarray, start: int, stop: int, ascending: bool
+) -> np.ndarray:
+    """
+    The rows of a range of positions of a sorted column, see `sort_index`.
+    Ascending pages are a slice of `order`. Descending pages read it backwards, but
+    rows with the same value keep the row order, so each position is mirrored inside
+    the group of its rank. The groups are found with a binary search of `ranks`,
+    a page only reads its own positions of both arrays.
+
+    Args:
+        order (np.ndarray): The row indexes in ascending order.
+        ranks (np.ndarray): The rank of the value of each row in `order`.
+        start (int): The first position of the page.
+        stop (int): The position after the last one of the page.
+        ascending (bool): Whether to read the column in ascending order.
+
+    Returns:
+        rows (np.ndarray): The row indexes of the page, in order.
+    """
+
+    total_rows = len(order)
+    start, stop = min(start, total_rows), min(stop, total_rows)
+
+    if ascending:
+        return np.asarray(order[start:stop], dtype=np.int64)
+
+    # The positions of the page in the ascending order, read backwards
+    positions = np.arange(total_rows - 1 - start, total_rows - 1 - stop, -1)
+    page_ranks = np.asarray(ranks[total_rows - stop : total_rows - start])[::-1]
+
+    groups, group_of_position = np.unique(page_ranks, return_inverse=True)
+    first = np.searchsorted(ranks, groups, side="left")[group_of_position]
+    last = np.searchsorted(ranks, groups, side="right")[group_of_position] - 1
+
+    return np.asarray(order[first + last - positions], dtype=np.int64)
+
+
+# Reads the values and null mask of some rows of a serialized column, given as a
+# range of rows or as an array of row indexes in any order
+Take = Callable[
+    [Dict[str, Any], Union[slice, np.ndarray]], Tuple[np.ndarray, np.ndarray]
+]
+
+# Gets the `sort_index` of a serialized column
+SortIndex = Callable[[Dict[str, Any]], Tuple[np.ndarray, np.ndarray, np.ndarray]]
+
+
+def page_from_arrays(
+    cols: Dict[str, Dict[str, Any]],
+    request_query: Dict[str, Any],
+    total_rows: int,
+    take: Take,
+    index: Optional[SortIndex] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Builds a sorted page of rows from columns stored as arrays, see `get_data`.
+    Pages sorted by row only read a range of rows, descending pages read it
+    backwards. Pages sorted by a column read the rows of the page from the sort index
+    of the column, by default sorting the whole column. The rows of a cursor are
+    found in the sorting in constant time, the arrays are positional.
+
+    Args:
+        cols (Dict[str, Dict[str, Any]]): The serialized columns of the file, by name.
+        request_query (Dict[str, Any]): The validated query parameters of the request.
+        total_rows (int): The amount of rows of the file.
+        take (Take): Reads the cells of a column.
+        index (Optional[SortIndex]): Gets a sort index that is already computed.
+
+    Returns:
+        rows (List[Dict[str, Any]]): The rows of the page, each one with its
+            `row_index` and its `values` by column name.
+    """
+
+    sort_by: str = request_query["sort_by"]
+    ascending: bool = request_query["asc"]
+
+    if sort_by == "row_index":
+        start, stop = page_range(
+            request_query, lambda row: row if ascending else total_rows - 1 - row
+        )
+
+        # The range of rows of the page, in ascending order
+        start, stop = min(start, total_rows), min(stop, total_rows)
+        if not ascending:
+            start, stop = total_rows - stop, total_rows - start
+        step = 1 if ascending else -1
+
+        rows = np.arange(start, stop)[::step]
+        cells = {
+            col_name: tuple(array[::step] for array in take(col, slice(start, stop)))
+            for col_name, col in cols.items()
+        }
+    else:
+        col = cols[sort_by]
+        if index is not None:
+            order, ranks, positions = index(col)
+        else:
+            values, mask = take(col, slice(0, total_rows))
+            order, ranks, positions = sort_index(values, mask, col["col_type"])
+
+        start, stop = page_range(
+            request_query,
+            lambda row: sorted_position(ranks, positions, row, ascending),
+        )
+        rows = sorted_page(order, ranks, start, stop, ascending)
+        cells = {col_name: take(col, rows) for col_name, col in cols.items()}
+
+    decoded = {
+        col_name: decode_values(*cells[col_name], col["col_type"])
+        for col_name, col in cols.items()
+    }
+
+    return [
+        {
+            "row_index": int(row),
+            "values": {col_name: decoded[col_name][i] for col_name in cols},
+        }
+        for i, row in enumerate(rows)
+    ]
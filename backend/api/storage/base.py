@@ -0,0 +1,223 @@
+from typing import Any, Callable, Dict, List, Optional
+
+import pandas as pd
+from django.conf import settings
+
+from ..models.table_col_model import TableCol
+
+
+def as_text(data: pd.Series) -> pd.Series:
+    """
+    The values of a column as the text `pandas` reads them as when the column
+    is not numeric. The missing values become "nan", like the ones of a text column.
+
+    Args:
+        data (pd.Series): The converted column.
+
+    Returns:
+        pd.Series: The text of every value, with the `object` dtype.
+    """
+
+    return data.astype(str).astype(object)
+
+
+def is_rewritten(col_type: str) -> bool:
+    """
+    Whether a column promoted to a dtype has its cells written again, see
+    `StorageEngine.rewrite_column`, instead of widened where they are stored.
+    """
+    return col_type == "object" or col_type.startswith("complex")
+
+
+class ColumnWriter:
+    """
+    Stores the cells of a file chunk by chunk for a `StorageEngine`.
+    It is meant to be used as a context manager:
+
+        with engine.writer() as writer:
+            writer.write(table_cols, chunk, row_offset)
+    """
+
+    def __enter__(self) -> "ColumnWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> bool:
+        return False
+
+    def write(
+        self, table_cols: List[TableCol], df: pd.DataFrame, row_offset: int = 0
+    ) -> int:
+        """
+        Stores the cells of a DataFrame.
+
+        Args:
+            table_cols (List[TableCol]): The columns of the file, ordered as in the DataFrame.
+            df (DataFrame): The converted rows to store.
+            row_offset (int): The file row index of the first row in the DataFrame.
+
+        Returns:
+            created (int): The amount of stored cells.
+        """
+
+        raise NotImplementedError
+
+    def commit(self) -> None:
+        """Makes the cells written so far durable, if they are not already."""
+
+
+class StorageEngine:
+    """
+    The way the cells of a file are stored and read back. The columns of a file
+    are always `TableCol` rows, and their `storage` names the engine of their cells.
+    """
+
+    # The name stored in `TableCol.storage`
+    name: str
+
+    # The biggest integer the engine stores, None when every `uint64` fits
+    max_integer: Optional[int] = None
+
+    def writer(
+        self, on_progress: Optional[Callable[[int], None]] = None
+    ) -> ColumnWriter:
+        """
+        Opens a writer for the cells of new columns.
+
+        Args:
+            on_progress (Optional[Callable[[int], None]]):
+                Called with the total of stored cells every time they are committed.
+
+        Returns:
+            ColumnWriter: The writer, to be used as a context manager.
+        """
+
+        raise NotImplementedError
+
+    def promote_column(self, table_col: TableCol, col_type: str) -> None:
+        """
+        Widens the numeric dtype of a column, keeping the cells it already has.
+        Any column can also become an `object` column, and a numeric one a complex
+        column, see `rewrite_column`.
+
+        Args:
+            table_col (TableCol): The column to widen. It is saved with the new `col_type`.
+            col_type (str): The new numeric dtype of the column, or `object`.
+        """
+
+        raise NotImplementedError
+
+    def rewrite_column(self, table_col: TableCol, col_type: str) -> None:
+        """
+        Turns a column into a column of a dtype its cells are encoded differently in:
+        `object`, re-encoding the cells it already has as their text (see `as_text`),
+        or a complex dtype. The cells are read back `INGEST_CHUNK_ROWS` at a time and
+        written again by the writer of the engine, so they are stored as the cells of
+        a file whose column had the new dtype from the start.
+
+        Args:
+            table_col (TableCol): The column to widen. It is saved with the new `col_type`.
+            col_type (str): The new dtype of the column, see `is_rewritten`.
+        """
+
+        chunk_rows: int = settings.INGEST_CHUNK_ROWS
+        converted: List[pd.Series] = []
+        while True:
+            start = len(converted) * chunk_rows
+            data = self.read_columns([table_col], start, start + chunk_rows)[
+                table_col.col_name
+            ]
+            converted.append(
+                as_text(data) if col_type == "object" else data.astype(col_type)
+            )
+            if len(data) < chunk_rows:
+                break
+
+        self.clear([table_col])
+        table_col.col_type = col_type
+        table_col.save(update_fields=["col_type"])
+
+        with self.writer() as writer:
+            for index, data in enumerate(converted):
+                writer.write([table_col], data.to_frame(), index * chunk_rows)
+            writer.commit()
+
+    def clear(self, table_cols: List[TableCol]) -> None:
+        """
+        Deletes the stored cells of columns, the columns themselves are kept.
+
+        Args:
+            table_cols (List[TableCol]): The columns to clear.
+        """
+
+        raise NotImplementedError
+
+    def total_rows(self, file_id: str, cols: Dict[str, Dict[str, Any]]) -> int:
+        """
+        The amount of rows of a file.
+
+        Args:
+            file_id (str): The id of the file.
+            cols (Dict[str, Dict[str, Any]]): The serialized columns of the file, by name.
+
+        Returns:
+            int: The amount of rows.
+        """
+
+        raise NotImplementedError
+
+    def read_columns(
+        self, table_cols: List[TableCol], start: int, stop: int
+    ) -> pd.DataFrame:
+        """
+        Reads back a range of rows of some columns, with the dtypes of the columns.
+
+        Args:
+            table_cols (List[TableCol]): The columns to read.
+            start (int): The first row to read.
+            stop (int): The row after the last one to read.
+
+        Returns:
+            DataFrame: The rows, with a column per `TableCol` named after it.
+        """
+
+        raise NotImplementedError
+
+    def page(
+        self,
+        cols: Dict[str, Dict[str, Any]],
+        request_query: Dict[str, Any],
+        total_rows: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Reads a sorted page of rows of a file, see `get_data`. When the request has
+        a `cursor` with a row, the page is the one after, or before, that row.
+
+        Args:
+            cols (Dict[str, Dict[str, Any]]): The serialized columns of the file, by name.
+            request_query (Dict[str, Any]): The validated query parameters of the request.
+            total_rows (Optional[int]): The amount of rows of the file, from its `FileMeta`.
+                Found by the engine when it is not known, for files still being ingested.
+
+        Returns:
+            rows (List[Dict[str, Any]]): The rows of the page, each one with its
+                `row_index` and its `values` by column name.
+        """
+
+        raise NotImplementedError
+
+    def sort_keys(
+        self, file_id: str, col: Dict[str, Any], rows: List[int]
+    ) -> List[Optional[bytes]]:
+        """
+        The `sort_key` of the values of some rows of a column, for pagination cursors.
+
+        Args:
+            file_id (str): The id of the file.
+            col (Dict[str, Any]): The serialized column.
+            rows (List[int]): The row indexes.
+
+        Returns:
+            keys (List[Optional[bytes]]): The key of each row, `None` for nulls.
+        """
+
+        raise NotImplementedError
@@ -0,0 +1,477 @@
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+
+from ..ingestion.encoding import encode_sort_keys
+from ..models.table_col_model import TableCol
+from ..serializers.table_col_serializer import TableColSerializer
+from .arrays import array_series, column_arrays, page_from_arrays, sort_index
+from .base import StorageEngine, as_text
+
+# The file that describes a complete cache, written last
+CACHE_META = "meta.json"
+
+# The version of the layout of the files of a cache, the ones of other versions are not used
+CACHE_VERSION = 2
+
+# The `col_type` of the columns cached as text, see `encode_texts`
+TEXT_TYPES = {"object", "category"}
+
+# The suffixes of the files of the sort index of a column
+SORT_INDEX = ("order", "ranks", "positions")
+
+
+def cache_dir(file_id: str) -> Path:
+    """The directory in `COLUMN_CACHE_DIR` with the arrays of every column of a file."""
+    return Path(settings.COLUMN_CACHE_DIR) / file_id
+
+
+def delete_cache(file_id: str) -> None:
+    """Deletes the cached arrays of a file, if it has them."""
+    shutil.rmtree(cache_dir(file_id), ignore_errors=True)
+
+
+def encode_texts(data: pd.Series) -> Tuple[List[bytes], np.ndarray]:
+    """
+    Encodes a text column as the UTF-8 bytes of every cell and a mask of its nulls.
+
+    Args:
+        data (pd.Series): The converted column to encode.
+
+    Returns:
+        Tuple: The bytes of every cell, empty for the nulls, and whether each cell is null.
+    """
+
+    # Only `None` is a null text, like in `column_arrays`, `NaN` becomes "nan"
+    mask = data.to_numpy(dtype=object) == None  # noqa: E711 (elementwise comparison)
+    texts = data.astype(str).to_numpy(dtype=object)
+    texts[mask] = ""
+    return [text.encode() for text in texts], mask
+
+
+class ColumnCacheWriter:
+    """
+    Writes the cache of a file while it is ingested, next to its storage engine:
+    a raw `mask` file per column, and its values, to which every chunk is appended.
+    The values of a text column are the UTF-8 `text` of its cells one after the other
+    and the `offsets` where each cell ends. Other columns are raw `values` files
+    (see `column_arrays`), split in parts: when a chunk needs a wider dtype, like
+    a promoted number, it starts a new part and the previous ones are widened when
+    they are read. Only the cells of a column that became text are re-encoded.
+
+    The cache is only complete, and used, once `CACHE_META` is written when the
+    writer exits without errors. It is meant to be used as a context manager:
+
+        with ColumnCacheWriter(file_id) as cache:
+            cache.write(table_cols, chunk, row_offset)
+
+    Nothing is written when `COLUMN_CACHE` is disabled.
+    """
+
+    def __init__(self, file_id: str):
+        self.file_id = file_id
+        self.enabled = settings.COLUMN_CACHE
+        self.directory = cache_dir(file_id)
+        self.columns: Dict[int, Dict[str, Any]] = {}
+        self.total_rows = 0
+
+    def __enter__(self) -> "ColumnCacheWriter":
+        if self.enabled:
+            delete_cache(self.file_id)
+            self.directory.mkdir(parents=True)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> bool:
+        if not self.enabled:
+            return False
+
+        if exc_type is not None or not self.columns:
+            delete_cache(self.file_id)
+            return False
+
+        meta = {
+            "version": CACHE_VERSION,
+            "rows": self.total_rows,
+            "columns": {
+                str(col_index): column for col_index, column in self.columns.items()
+            },
+        }
+
+        # Renamed into place, so a cache is never seen half written
+        path = self.directory / CACHE_META
+        with open(path.with_suffix(".tmp"), "w") as meta_file:
+            json.dump(meta, meta_file)
+        os.replace(path.with_suffix(".tmp"), path)
+        return False
+
+    def write(
+        self, table_cols: List[TableCol], df: pd.DataFrame, row_offset: int = 0
+    ) -> None:
+        """
+        Appends the cells of a DataFrame to the files of its columns.
+
+        Args:
+            table_cols (List[TableCol]): The columns of the file, ordered as in the DataFrame,
+                with the dtypes of the DataFrame.
+            df (DataFrame): The converted rows, following the ones already written.
+            row_offset (int): The file row index of the first row in the DataFrame.
+        """
+
+        if not self.enabled:
+            return
+
+        for table_col, col in zip(table_cols, df.columns):
+            col_index: int = table_col.col_index
+            col_type: str = table_col.col_type
+
+            column = self.columns.get(col_index)
+            if column is not None and "parts" in column and col_type in TEXT_TYPES:
+                self.rewrite_as_text(col_index, row_offset)
+
+            if col_type in TEXT_TYPES:
+                self.append_texts(col_index, df[col])
+            else:
+                self.append_values(col_index, df[col], col_type, row_offset)
+
+            self.columns[col_index]["col_type"] = col_type
+
+        self.total_rows = row_offset + len(df)
+
+    def append_texts(self, col_index: int, data: pd.Series) -> None:
+        """Appends the cells of a chunk of a text column, see `encode_texts`."""
+
+        encoded, mask = encode_texts(data)
+        column = self.columns.setdefault(col_index, {"text_bytes": 0})
+        ends = np.cumsum([len(text) for text in encoded], dtype=np.int64)
+        ends += column["text_bytes"]
+
+        with open(self.directory / f"{col_index}.text", "ab") as text_file:
+            text_file.write(b"".join(encoded))
+        with open(self.directory / f"{col_index}.offsets", "ab") as offsets_file:
+            ends.tofile(offsets_file)
+        with open(self.directory / f"{col_index}.mask", "ab") as mask_file:
+            mask.tofile(mask_file)
+
+        if len(ends):
+            column["text_bytes"] = int(ends[-1])
+
+    def append_values(
+        self, col_index: int, data: pd.Series, col_type: str, row_offset: int
+    ) -> None:
+        """Appends the cells of a chunk of any other column to its last part."""
+
+        values, mask = column_arrays(data, col_type)
+        parts = self.columns.setdefault(col_index, {"parts": []})["parts"]
+
+        dtype = values.dtype
+        if parts:
+            dtype = np.promote_types(parts[-1]["dtype"], dtype)
+        if not parts or dtype != np.dtype(parts[-1]["dtype"]):
+            parts.append({"start": row_offset, "dtype": dtype.str})
+
+        values_path = self.directory / f"{col_index}.{len(parts) - 1}.values"
+        with open(values_path, "ab") as values_file:
+            values.astype(dtype).tofile(values_file)
+        with open(self.directory / f"{col_index}.mask", "ab") as mask_file:
+            mask.tofile(mask_file)
+
+    def rewrite_as_text(self, col_index: int, rows: int) -> None:
+        """Re-encodes the cells already written of a column that became text."""
+
+        column = self.columns[col_index]
+        values, mask = read_parts(
+            self.directory, col_index, column["parts"], rows, slice(0, rows)
+        )
+        written = array_series(values, mask, column["col_type"])
+
+        for part in range(len(column["parts"])):
+            (self.directory / f"{col_index}.{part}.values").unlink()
+        (self.directory / f"{col_index}.mask").unlink()
+
+        del self.columns[col_index]
+        self.append_texts(col_index, as_text(written))
+
+
+def read_parts(
+    directory: Path,
+    col_index: int,
+    parts: List[Dict[str, Any]],
+    total_rows: int,
+    rows: Union[slice, np.ndarray],
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Reads some cells of a cached column that is not text, see `ColumnCacheWriter`.
+    The cells of the parts before a promotion are widened to the dtype of the last one.
+
+    Args:
+        directory (Path): The directory of the cache of the file.
+        col_index (int): The index of the column in the file.
+        parts (List[Dict[str, Any]]): The first row and the dtype of every part of the column.
+        total_rows (int): The amount of rows of the column.
+        rows (Union[slice, np.ndarray]): A range of rows, or row indexes in any order.
+
+    Returns:
+        Tuple: The values and the null mask of the cells, in the order of `rows`.
+    """
+
+    dtype = np.dtype(parts[-1]["dtype"])
+    if total_rows == 0:
+        return np.empty(0, dtype=dtype), np.empty(0, dtype=bool)
+
+    mask = np.memmap(
+        directory / f"{col_index}.mask", dtype=bool, mode="r", shape=(total_rows,)
+    )
+    stops = [part["start"] for part in parts[1:]] + [total_rows]
+    maps = [
+        np.memmap(
+            directory / f"{col_index}.{index}.values",
+            dtype=np.dtype(part["dtype"]),
+            mode="r",
+            shape=(stop - part["start"],),
+        )
+        for index, (part, stop) in enumerate(zip(parts, stops))
+    ]
+
+    if len(maps) == 1:
+        return maps[0][rows], mask[rows]
+
+    if isinstance(rows, slice):
+        rows = np.arange(*rows.indices(total_rows))
+
+    values = np.empty(len(rows), dtype=dtype)
+    for part, stop, values_map in zip(parts, stops, maps):
+        inside = (rows >= part["start"]) & (rows < stop)
+        values[inside] = values_map[rows[inside] - part["start"]]
+
+    return values, mask[rows]
+
+
+def read_texts(
+    directory: Path,
+    col_index: int,
+    text_bytes: int,
+    total_rows: int,
+    rows: Union[slice, np.ndarray],
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Reads some cells of a cached text column, only decoding the ones read.
+
+    Args:
+        directory (Path): The directory of the cache of the file.
+        col_index (int): The index of the column in the file.
+        text_bytes (int): The size of the UTF-8 text of the whole column.
+        total_rows (int): The amount of rows of the column.
+        rows (Union[slice, np.ndarray]): A range of rows, or row indexes in any order.
+
+    Returns:
+        Tuple: The texts, as an `object` array, and the null mask of the cells, in the order of `rows`.
+    """
+
+    if total_rows == 0:
+        return np.empty(0, dtype=object), np.empty(0, dtype=bool)
+
+    mask = np.memmap(
+        directory / f"{col_index}.mask", dtype=bool, mode="r", shape=(total_rows,)
+    )
+    ends = np.memmap(
+        directory / f"{col_index}.offsets",
+        dtype=np.int64,
+        mode="r",
+        shape=(total_rows,),
+    )
+    text = (
+        np.memmap(directory / f"{col_index}.text", dtype=np.uint8, mode="r")
+        if text_bytes
+        else np.empty(0, dtype=np.uint8)
+    )
+
+    if isinstance(rows, slice):
+        # The bytes of a range of cells are read at once
+        start, stop, _ = rows.indices(total_rows)
+        stop = max(start, stop)
+        first = int(ends[start - 1]) if start > 0 else 0
+        cell_ends = (ends[start:stop] - first).tolist()
+        cell_starts = [0] + cell_ends[:-1]
+        buffer = text[first : first + (cell_ends[-1] if cell_ends else 0)].tobytes()
+        texts = [
+            buffer[begin:end].decode() for begin, end in zip(cell_starts, cell_ends)
+        ]
+    else:
+        cell_ends = ends[rows]
+        cell_starts = np.where(rows > 0, ends[np.maximum(rows - 1, 0)], 0)
+        texts = [
+            text[begin:end].tobytes().decode()
+            for begin, end in zip(cell_starts.tolist(), cell_ends.tolist())
+        ]
+
+    values = np.empty(len(texts), dtype=object)
+    values[:] = texts
+    return values, mask[rows]
+
+
+class ColumnCache:
+    """
+    The cached columns of a file, memory mapped with `np.memmap`. Pages are read
+    from slices of the maps, so only the rows they show are read from disk, and
+    every process serving the file shares the pages the OS keeps in memory.
+    """
+
+    def __init__(self, file_id: str, meta: Dict[str, Any]):
+        self.file_id = file_id
+        self.meta = meta
+
+    @staticmethod
+    def open(file_id: str) -> Optional["ColumnCache"]:
+        """
+        Opens the cache of a file.
+
+        Args:
+            file_id (str): The id of the file.
+
+        Returns:
+            Optional[ColumnCache]: The cache, or None when the file has no complete cache
+                or it was written with another `CACHE_VERSION`.
+        """
+
+        if not settings.COLUMN_CACHE:
+            return None
+
+        try:
+            with open(cache_dir(file_id) / CACHE_META) as meta_file:
+                meta = json.load(meta_file)
+        except FileNotFoundError:
+            return None
+
+        if meta.get("version") != CACHE_VERSION:
+            return None
+
+        return ColumnCache(file_id, meta)
+
+    def take(
+        self, col_index: int, rows: Union[slice, np.ndarray]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Reads some cells of a column.
+
+        Args:
+            col_index (int): The index of the column in the file.
+            rows (Union[slice, np.ndarray]): A range of rows, or row indexes in any order.
+
+        Returns:
+            Tuple: The values and the null mask of the cells, in the order of `rows`.
+        """
+
+        column = self.meta["columns"][str(col_index)]
+        directory = cache_dir(self.file_id)
+        if "parts" in column:
+            return read_parts(
+                directory, col_index, column["parts"], self.meta["rows"], rows
+            )
+
+        return read_texts(
+            directory, col_index, column["text_bytes"], self.meta["rows"], rows
+        )
+
+    def column(self, col_index: int) -> Tuple[np.ndarray, np.ndarray]:
+        """The values and null mask of a whole column, see `take`."""
+        return self.take(col_index, slice(0, self.meta["rows"]))
+
+    def sort_index(
+        self, col: Dict[str, Any]
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Maps the sort index of a column, see `arrays.sort_index`. Files never change
+        once stored, so it is computed the first time the column is sorted and saved
+        next to its arrays, as a raw `order`, `ranks` and `positions` file.
+
+        Args:
+            col (Dict[str, Any]): The serialized column.
+
+        Returns:
+            Tuple: The memory mapped `order`, `ranks` and `positions` of the column.
+        """
+
+        col_index = col["col_index"]
+        directory = cache_dir(self.file_id)
+        paths = [directory / f"{col_index}.{name}" for name in SORT_INDEX]
+
+        if not all(path.exists() for path in paths):
+            arrays = sort_index(*self.column(col_index), col["col_type"])
+
+            # Renamed into place, other workers may be sorting the same column
+            for path, array in zip(paths, arrays):
+                tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+                array.astype(np.int64).tofile(tmp_path)
+                os.replace(tmp_path, path)
+
+            return arrays
+
+        rows = self.meta["rows"]
+        if rows == 0:
+            return tuple(np.empty(0, dtype=np.int64) for _ in SORT_INDEX)
+
+        return tuple(
+            np.memmap(path, dtype=np.int64, mode="r", shape=(rows,)) for path in paths
+        )
+
+    def total_rows(self, file_id: str, cols: Dict[str, Dict[str, Any]]) -> int:
+        """The amount of rows of the file, see `StorageEngine.total_rows`."""
+        return self.meta["rows"]
+
+    def sort_keys(
+        self, file_id: str, col: Dict[str, Any], rows: List[int]
+    ) -> List[Optional[bytes]]:
+        """The keys of some rows of a column, see `StorageEngine.sort_keys`."""
+        values, mask = self.take(col["col_index"], np.array(rows, dtype=np.int64))
+        data = array_series(values, mask, col["col_type"])
+        return encode_sort_keys(data, col["col_type"])
+
+    def page(
+        self,
+        cols: Dict[str, Dict[str, Any]],
+        request_query: Dict[str, Any],
+        total_rows: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        A sorted page of rows of the file, see `StorageEngine.page`.
+        The amount of rows is always the one in its meta.
+        """
+
+        def take(
+            col: Dict[str, Any], rows: Union[slice, np.ndarray]
+        ) -> Tuple[np.ndarray, np.ndarray]:
+            return self.take(col["col_index"], rows)
+
+        return page_from_arrays(
+            cols, request_query, self.meta["rows"], take, self.sort_index
+        )
+
+
+def build_cache(file_id: str, table_cols: List[TableCol], engine: StorageEngine) -> int:
+    """
+    Writes the cache of an already stored file, reading it back from its engine
+    `INGEST_CHUNK_ROWS` rows at a time.
+
+    Args:
+        file_id (str): The id of the file.
+        table_cols (List[TableCol]): The columns of the file, ordered by `col_index`.
+        engine (StorageEngine): The storage engine of the file.
+
+    Returns:
+        total_rows (int): The amount of cached rows.
+    """
+
+    total_rows = engine.total_rows(file_id, TableColSerializer(table_cols).data)
+
+    with ColumnCacheWriter(file_id) as cache:
+        for start in range(0, total_rows, settings.INGEST_CHUNK_ROWS):
+            stop = min(start + settings.INGEST_CHUNK_ROWS, total_rows)
+            cache.write(table_cols, engine.read_columns(table_cols, start, stop), start)
+
+    return total_rows
@@ -0,0 +1,194 @@
+import shutil
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+
+from ..ingestion.encoding import encode_sort_keys
+from ..models.table_col_model import TableCol
+from .arrays import array_series, column_arrays, page_from_arrays
+from .base import ColumnWriter, StorageEngine, is_rewritten
+
+
+def file_dir(file_id: str) -> Path:
+    """The directory in `COLUMN_STORE_DIR` with the segments of every column of a file."""
+    return Path(settings.COLUMN_STORE_DIR) / file_id
+
+
+def column_dir(file_id: str, col_index: int) -> Path:
+    """The directory with the segments of a column, one per stored chunk."""
+    return file_dir(file_id) / str(col_index)
+
+
+def segments(file_id: str, col_index: int) -> List[Tuple[int, int, Path]]:
+    """
+    Lists the segments of a column. Each one is named after the rows it holds,
+    `<start>-<stop>.npz`, so finding the segments of a range does not open any file.
+
+    Args:
+        file_id (str): The id of the file.
+        col_index (int): The index of the column in the file.
+
+    Returns:
+        List[Tuple[int, int, Path]]: The first row, the row after the last one
+            and the path of every segment, in row order.
+    """
+
+    found = []
+    for path in column_dir(file_id, col_index).glob("*.npz"):
+        start, stop = path.stem.split("-")
+        found.append((int(start), int(stop), path))
+
+    return sorted(found)
+
+
+def take(
+    file_id: str, col_index: int, dtype: str, rows: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Reads some cells of a column, only decompressing the segments that hold them.
+
+    Args:
+        file_id (str): The id of the file.
+        col_index (int): The index of the column in the file.
+        dtype (str): The `col_type` of the column. Segments stored before a
+            promotion are widened to it.
+        rows (np.ndarray): The row indexes to read, in any order.
+
+    Returns:
+        Tuple: The values and the null mask of the cells, in the order of `rows`.
+    """
+
+    values_parts, mask_parts, positions = [], [], []
+    for start, stop, path in segments(file_id, col_index):
+        inside = np.flatnonzero((rows >= start) & (rows < stop))
+        if len(inside) == 0:
+            continue
+
+        with np.load(path) as segment:
+            values_parts.append(segment["values"][rows[inside] - start])
+            mask_parts.append(segment["mask"][rows[inside] - start])
+        positions.append(inside)
+
+    if not positions:
+        return column_arrays(pd.Series([], dtype=dtype), dtype)
+
+    # Put every cell back in the requested position
+    order = np.argsort(np.concatenate(positions), kind="stable")
+    values = np.concatenate(values_parts)[order]
+    if dtype not in {"object", "category", "datetime64[ns]", "timedelta64[ns]"}:
+        values = values.astype(dtype)
+
+    return values, np.concatenate(mask_parts)[order]
+
+
+class ColumnarWriter(ColumnWriter):
+    """Saves every chunk of every column as a compressed `.npz` segment."""
+
+    def __init__(self, on_progress: Optional[Callable[[int], None]] = None):
+        self.on_progress = on_progress
+        self.cells_written = 0
+
+    def write(
+        self, table_cols: List[TableCol], df: pd.DataFrame, row_offset: int = 0
+    ) -> int:
+        stop = row_offset + len(df)
+        for table_col, col in zip(table_cols, df.columns):
+            directory = column_dir(table_col.file_id, table_col.col_index)
+            directory.mkdir(parents=True, exist_ok=True)
+
+            values, mask = column_arrays(df[col], table_col.col_type)
+            np.savez_compressed(
+                directory / f"{row_offset}-{stop}.npz", values=values, mask=mask
+            )
+
+        created = len(df) * len(table_cols)
+        self.cells_written += created
+        return created
+
+    def commit(self) -> None:
+        # Segments are complete files as soon as they are written
+        if self.on_progress is not None:
+            self.on_progress(self.cells_written)
+
+
+class ColumnarEngine(StorageEngine):
+    """
+    Keeps each column as typed, compressed `numpy` segments in `COLUMN_STORE_DIR`,
+    one per stored chunk, instead of one database row per cell.
+    Pages are sorted with `numpy`, reading only the segments of the rows they show.
+    """
+
+    name = "columnar"
+
+    def writer(
+        self, on_progress: Optional[Callable[[int], None]] = None
+    ) -> ColumnWriter:
+        return ColumnarWriter(on_progress)
+
+    def promote_column(self, table_col: TableCol, col_type: str) -> None:
+        if is_rewritten(col_type):
+            self.rewrite_column(table_col, col_type)
+            return
+
+        # The stored segments are widened when they are read
+        table_col.col_type = col_type
+        table_col.save(update_fields=["col_type"])
+
+    def clear(self, table_cols: List[TableCol]) -> None:
+        file_ids = set()
+        for table_col in table_cols:
+            shutil.rmtree(
+                column_dir(table_col.file_id, table_col.col_index), ignore_errors=True
+            )
+            file_ids.add(table_col.file_id)
+
+        for file_id in file_ids:
+            if file_dir(file_id).exists() and not any(file_dir(file_id).iterdir()):
+                file_dir(file_id).rmdir()
+
+    def total_rows(self, file_id: str, cols: Dict[str, Dict[str, Any]]) -> int:
+        col = next(iter(cols.values()))
+        stored = segments(file_id, col["col_index"])
+        return stored[-1][1] if stored else 0
+
+    def read_columns(
+        self, table_cols: List[TableCol], start: int, stop: int
+    ) -> pd.DataFrame:
+        df = pd.DataFrame()
+        for table_col in table_cols:
+            rows = np.arange(start, stop)
+            values, mask = take(
+                table_col.file_id, table_col.col_index, table_col.col_type, rows
+            )
+            df[table_col.col_name] = array_series(values, mask, table_col.col_type)
+
+        return df
+
+    def sort_keys(
+        self, file_id: str, col: Dict[str, Any], rows: List[int]
+    ) -> List[Optional[bytes]]:
+        values, mask = take(file_id, col["col_index"], col["col_type"], np.array(rows))
+        data = array_series(values, mask, col["col_type"])
+        return encode_sort_keys(data, col["col_type"])
+
+    def page(
+        self,
+        cols: Dict[str, Dict[str, Any]],
+        request_query: Dict[str, Any],
+        total_rows: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        file_id: str = request_query["file_id"]
+
+        def take_cells(
+            col: Dict[str, Any], rows: Union[slice, np.ndarray]
+        ) -> Tuple[np.ndarray, np.ndarray]:
+            if isinstance(rows, slice):
+                rows = np.arange(rows.start, max(rows.start, rows.stop))
+            return take(file_id, col["col_index"], col["col_type"], rows)
+
+        if total_rows is None:
+            total_rows = self.total_rows(file_id, cols)
+        return page_from_arrays(cols, request_query, total_rows, take_cells)
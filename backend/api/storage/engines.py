@@ -0,0 +1,85 @@
+from collections import defaultdict
+from typing import Dict, Iterable, List
+
+from django.conf import settings
+from django.db import transaction
+
+from ..models.file_alias_model import FileAlias
+from ..models.file_meta_model import FileMeta
+from ..models.table_col_model import TableCol
+from .base import StorageEngine
+from .column_cache import delete_cache
+from .columnar import ColumnarEngine
+from .page_cache import invalidate_pages
+from .rows import RowsEngine
+from .schema_registry import invalidate_schema
+from .typed import TypedEngine
+
+# Every storage engine, by the name stored in `TableCol.storage`
+STORAGE_ENGINES: Dict[str, StorageEngine] = {
+    engine.name: engine for engine in [RowsEngine(), ColumnarEngine(), TypedEngine()]
+}
+
+
+def get_engine(name: str = None) -> StorageEngine:
+    """
+    Gets a storage engine by name.
+
+    Args:
+        name (str): The name of the engine. Defaults to `STORAGE_ENGINE`, the one of new files.
+
+    Returns:
+        StorageEngine: The engine.
+    """
+
+    return STORAGE_ENGINES[name or settings.STORAGE_ENGINE]
+
+
+def file_engine(table_cols: List[TableCol]) -> StorageEngine:
+    """
+    Gets the storage engine of a file from its columns, all of them share it.
+
+    Args:
+        table_cols (List[TableCol]): The columns of the file.
+
+    Returns:
+        StorageEngine: The engine of the file.
+    """
+
+    return STORAGE_ENGINES[table_cols[0].storage]
+
+
+def delete_files(file_ids: Iterable[str]) -> int:
+    """
+    Deletes files, their columns, metadata and aliases, the cells every engine stored for them,
+    their column cache, their cached pages and their schema.
+
+    Args:
+        file_ids (Iterable[str]): The ids of the files.
+
+    Returns:
+        deleted (int): The amount of deleted columns.
+    """
+
+    file_ids = list(file_ids)
+    table_cols = list(TableCol.objects.filter(file_id__in=file_ids))
+
+    by_storage: Dict[str, List[TableCol]] = defaultdict(list)
+    for table_col in table_cols:
+        by_storage[table_col.storage].append(table_col)
+
+    with transaction.atomic():
+        for storage, storage_cols in by_storage.items():
+            STORAGE_ENGINES[storage].clear(storage_cols)
+        TableCol.objects.filter(
+            id__in=[table_col.id for table_col in table_cols]
+        ).delete()
+        FileMeta.objects.filter(file_id__in=file_ids).delete()
+        FileAlias.objects.filter(file_id__in=file_ids).delete()
+
+    for file_id in file_ids:
+        delete_cache(file_id)
+        invalidate_pages(file_id)
+        invalidate_schema(file_id)
+
+    return len(table_cols)
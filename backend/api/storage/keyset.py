@@ -0,0 +1,128 @@
+from typing import Any, Dict, List, Optional
+
+from django.db.models import Q, QuerySet
+
+
+def row_range(request_query: Dict[str, Any], total_rows: int) -> range:
+    """
+    The row indexes of a page sorted by row. The rows of a file are dense, from 0
+    to `total_rows - 1`, so a page is a range of rows, read with a `BETWEEN` on the
+    `(column, row)` index, whatever the page number.
+
+    Args:
+        request_query (Dict[str, Any]): The validated query parameters of the request.
+        total_rows (int): The amount of rows of the file.
+
+    Returns:
+        row_order (range): The row indexes of the page, in order.
+    """
+
+    page_size: int = request_query["page_size"]
+    page: int = request_query["page"]
+    start = min(page * page_size, total_rows)
+    stop = min((page + 1) * page_size, total_rows)
+
+    if request_query["asc"]:
+        return range(start, stop)
+
+    # Descending pages count from the last row
+    return range(total_rows - 1 - start, total_rows - 1 - stop, -1)
+
+
+def rows_after(
+    field: Optional[str], key: Any, row: int, field_ascending: bool, row_ascending: bool
+) -> Q:
+    """
+    The seek predicate of the cells that come after a cell in a sorting, the keyset
+    alternative to an `OFFSET`. Like the database, the sorting puts the nulls first
+    when ascending and last when descending, and it breaks ties with the row.
+
+    Args:
+        field (Optional[str]): The field the cells are sorted by, `None` when sorted by row.
+        key (Any): The value of `field` of the cell, `None` for nulls.
+        row (int): The row of the cell.
+        field_ascending (bool): Whether `field` is sorted in ascending order.
+        row_ascending (bool): Whether ties, or the rows, are sorted in ascending order.
+
+    Returns:
+        Q: The filter of the cells after the cell.
+    """
+
+    after_row = Q(row__gt=row) if row_ascending else Q(row__lt=row)
+
+    if field is None:
+        return after_row
+
+    is_null = Q(**{f"{field}__isnull": True})
+    if key is None:
+        seek = is_null & after_row
+
+        # The nulls are first when ascending, every value comes after them
+        return seek | ~is_null if field_ascending else seek
+
+    after_key = Q(**{f"{field}__{'gt' if field_ascending else 'lt'}": key})
+    seek = after_key | Q(**{field: key}) & after_row
+
+    # The nulls are last when descending, they come after every value
+    return seek if field_ascending else seek | is_null
+
+
+def seek_query(
+    cells: QuerySet,
+    field: Optional[str],
+    key: Any,
+    request_query: Dict[str, Any],
+) -> QuerySet:
+    """
+    The query of the row indexes of a page of a cursor, see `CursorField`. The page
+    is read with a seek predicate from the cursor row, so deep pages cost the same
+    as the first. Pages that end before the cursor are read in the reversed order.
+
+    Args:
+        cells (QuerySet): The cells of the column the page is sorted by, one per row.
+        field (Optional[str]): The field the cells are sorted by, `None` when sorted by row.
+        key (Any): The value of `field` of the cursor row.
+        request_query (Dict[str, Any]): The validated query parameters of the request.
+
+    Returns:
+        QuerySet: The row indexes of the page, reversed when it ends before the cursor.
+    """
+
+    cursor: Dict[str, Any] = request_query["cursor"]
+    before: bool = cursor["before"]
+    field_ascending = request_query["asc"] != before
+    row_ascending = not before if field is not None else field_ascending
+
+    order_by = [f"{'' if row_ascending else '-'}row"]
+    if field is not None:
+        order_by.insert(0, f"{'' if field_ascending else '-'}{field}")
+
+    predicate = rows_after(field, key, cursor["row"], field_ascending, row_ascending)
+    return (
+        cells.filter(predicate)
+        .order_by(*order_by)
+        .values_list("row", flat=True)[: request_query["page_size"]]
+    )
+
+
+def seek_rows(
+    cells: QuerySet,
+    field: Optional[str],
+    key: Any,
+    request_query: Dict[str, Any],
+) -> List[int]:
+    """
+    Gets the row indexes of a page of a cursor, see `seek_query`.
+
+    Args:
+        cells (QuerySet): The cells of the column the page is sorted by, one per row.
+        field (Optional[str]): The field the cells are sorted by, `None` when sorted by row.
+        key (Any): The value of `field` of the cursor row.
+        request_query (Dict[str, Any]): The validated query parameters of the request.
+
+    Returns:
+        row_order (List[int]): The row indexes of the page, in order.
+    """
+
+    row_order = list(seek_query(cells, field, key, request_query))
+    return row_order[::-1] if request_query["cursor"]["before"] else row_order
@@ -0,0 +1,288 @@
+import json
+import pickle
+import sqlite3
+import time
+from collections import OrderedDict
+from threading import Lock, get_ident
+from typing import Any, Dict, Optional, Set
+
+from django.conf import settings
+
+# The query parameters that identify a page, the key of its response
+PAGE_KEY_FIELDS = ["file_id", "sort_by", "asc", "page", "page_size", "format"]
+
+
+def page_key(request_query: Dict[str, Any]) -> str:
+    """The key of the response of a page, from its validated query parameters."""
+    return json.dumps([request_query[field] for field in PAGE_KEY_FIELDS])
+
+
+class PageCache:
+    """
+    A cache of `get-data` responses, bounded by the bytes of the pickled responses
+    and evicting the least recently used ones. Files never change once stored, so a
+    response is valid until its file is deleted or its columns change type, when
+    every page of the file is invalidated.
+
+    The subclasses are the backends that keep the responses, and count their hits and
+    misses the same way.
+    """
+
+    name: str
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.counters = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+        self.counters_lock = Lock()
+
+    def count(self, counter: str, amount: int = 1) -> None:
+        """Adds to a counter, the cache may be used by several threads."""
+        with self.counters_lock:
+            self.counters[counter] += amount
+
+    def get(self, request_query: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Gets the cached response of a page.
+
+        Args:
+            request_query (Dict[str, Any]): The validated query parameters of the request.
+
+        Returns:
+            Optional[Dict[str, Any]]: The response data, or None when it is not cached.
+        """
+
+        value = self.load(page_key(request_query))
+        self.count("misses" if value is None else "hits")
+        return None if value is None else pickle.loads(value)
+
+    def set(self, request_query: Dict[str, Any], response: Dict[str, Any]) -> None:
+        """
+        Caches the response of a page. Responses bigger than the whole cache are not kept.
+
+        Args:
+            request_query (Dict[str, Any]): The validated query parameters of the request.
+            response (Dict[str, Any]): The response data, `numpy` scalars included.
+        """
+
+        value = pickle.dumps(response, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(value) > self.max_bytes:
+            return
+
+        self.count(
+            "evictions",
+            self.store(page_key(request_query), request_query["file_id"], value),
+        )
+        self.count("stores")
+
+    def stats(self) -> Dict[str, Any]:
+        """The counters of the cache, its backend and the bytes it keeps."""
+        with self.counters_lock:
+            counters = dict(self.counters)
+
+        return {
+            "backend": self.name,
+            **counters,
+            "bytes": self.size(),
+            "max_bytes": self.max_bytes,
+        }
+
+    def load(self, key: str) -> Optional[bytes]:
+        """The pickled response of a key, marked as the most recently used."""
+        raise NotImplementedError
+
+    def store(self, key: str, file_id: str, value: bytes) -> int:
+        """Keeps a pickled response and evicts the least recently used ones over the bound.
+
+        Returns:
+            evicted (int): The amount of evicted responses.
+        """
+        raise NotImplementedError
+
+    def invalidate(self, file_id: str) -> None:
+        """Forgets every cached page of a file."""
+        raise NotImplementedError
+
+    def size(self) -> int:
+        """The bytes of the cached responses."""
+        raise NotImplementedError
+
+
+class LocMemPageCache(PageCache):
+    """Keeps the responses in the memory of the process, every worker has its own cache."""
+
+    name = "locmem"
+
+    def __init__(self, max_bytes: int):
+        super().__init__(max_bytes)
+        self.values: "OrderedDict[str, bytes]" = OrderedDict()
+        self.keys_by_file: Dict[str, Set[str]] = {}
+        self.file_by_key: Dict[str, str] = {}
+        self.bytes = 0
+        self.lock = Lock()
+
+    def load(self, key: str) -> Optional[bytes]:
+        with self.lock:
+            value = self.values.get(key)
+            if value is not None:
+                self.values.move_to_end(key)
+            return value
+
+    def store(self, key: str, file_id: str, value: bytes) -> int:
+        with self.lock:
+            self.forget(key)
+            self.values[key] = value
+            self.keys_by_file.setdefault(file_id, set()).add(key)
+            self.file_by_key[key] = file_id
+            self.bytes += len(value)
+
+            evicted = 0
+            while self.bytes > self.max_bytes:
+                self.forget(next(iter(self.values)))
+                evicted += 1
+            return evicted
+
+    def invalidate(self, file_id: str) -> None:
+        with self.lock:
+            for key in list(self.keys_by_file.get(file_id, ())):
+                self.forget(key)
+
+    def size(self) -> int:
+        return self.bytes
+
+    def forget(self, key: str) -> None:
+        """Removes a response, the lock must be held."""
+
+        value = self.values.pop(key, None)
+        if value is None:
+            return
+
+        self.bytes -= len(value)
+        file_id = self.file_by_key.pop(key)
+        self.keys_by_file[file_id].discard(key)
+        if not self.keys_by_file[file_id]:
+            del self.keys_by_file[file_id]
+
+
+class SQLitePageCache(PageCache):
+    """
+    Keeps the responses in a SQLite file, `PAGE_CACHE_PATH`, shared by every worker
+    of the machine, so a page is computed once for all of them and an invalidation
+    reaches all of them. Each thread has its own connection. A hit only records its use
+    when the page was last used over `PAGE_CACHE_TOUCH_SECONDS` ago.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, max_bytes: int):
+        super().__init__(max_bytes)
+        self.path = str(settings.PAGE_CACHE_PATH)
+        self.connections: Dict[int, sqlite3.Connection] = {}
+        self.lock = Lock()
+
+        with self.connection() as connection:
+            connection.executescript("""
+                CREATE TABLE IF NOT EXISTS page (
+                    key TEXT PRIMARY KEY,
+                    file_id TEXT NOT NULL,
+                    value BLOB NOT NULL,
+                    used REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS page_file_id ON page (file_id);
+                CREATE INDEX IF NOT EXISTS page_used ON page (used);
+                """)
+
+    def connection(self) -> sqlite3.Connection:
+        """The connection of the current thread, opened the first time it is needed."""
+
+        with self.lock:
+            connection = self.connections.get(get_ident())
+            if connection is None:
+                connection = sqlite3.connect(self.path, timeout=30)
+                connection.execute("PRAGMA journal_mode=WAL")
+                self.connections[get_ident()] = connection
+            return connection
+
+    def load(self, key: str) -> Optional[bytes]:
+        with self.connection() as connection:
+            row = connection.execute(
+                "SELECT value, used FROM page WHERE key = ?", [key]
+            ).fetchone()
+            if row is None:
+                return None
+
+            # Writing every hit would serialize the readers of every worker on the file
+            value, used = row
+            now = time.time()
+            if now - used > settings.PAGE_CACHE_TOUCH_SECONDS:
+                connection.execute(
+                    "UPDATE page SET used = ? WHERE key = ? AND used = ?",
+                    [now, key, used],
+                )
+            return value
+
+    def store(self, key: str, file_id: str, value: bytes) -> int:
+        with self.connection() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO page (key, file_id, value, used) VALUES (?, ?, ?, ?)",
+                [key, file_id, value, time.time()],
+            )
+
+            # The least recently used responses over the bound
+            over = connection.execute(
+                """
+                SELECT key FROM (
+                    SELECT key, SUM(LENGTH(value)) OVER (ORDER BY used DESC) AS kept
+                    FROM page
+                ) WHERE kept > ?
+                """,
+                [self.max_bytes],
+            ).fetchall()
+            connection.executemany("DELETE FROM page WHERE key = ?", over)
+            return len(over)
+
+    def invalidate(self, file_id: str) -> None:
+        with self.connection() as connection:
+            connection.execute("DELETE FROM page WHERE file_id = ?", [file_id])
+
+    def size(self) -> int:
+        with self.connection() as connection:
+            return connection.execute(
+                "SELECT COALESCE(SUM(LENGTH(value)), 0) FROM page"
+            ).fetchone()[0]
+
+
+# Every page cache backend, by the name of `PAGE_CACHE`
+PAGE_CACHES = {cache.name: cache for cache in [LocMemPageCache, SQLitePageCache]}
+
+# The cache of the process, created the first time it is used
+_page_cache: Optional[PageCache] = None
+_page_cache_lock = Lock()
+
+
+def get_page_cache() -> Optional[PageCache]:
+    """
+    The process wide page cache, with the `PAGE_CACHE` backend.
+
+    Returns:
+        Optional[PageCache]: The cache, or None when `PAGE_CACHE` is "off".
+    """
+
+    global _page_cache
+    if settings.PAGE_CACHE == "off":
+        return None
+
+    with _page_cache_lock:
+        if _page_cache is None or _page_cache.name != settings.PAGE_CACHE:
+            _page_cache = PAGE_CACHES[settings.PAGE_CACHE](
+                settings.PAGE_CACHE_MAX_BYTES
+            )
+
+    return _page_cache
+
+
+def invalidate_pages(file_id: str) -> None:
+    """Forgets the cached pages of a file, if pages are cached."""
+
+    page_cache = get_page_cache()
+    if page_cache is not None:
+        page_cache.invalidate(file_id)
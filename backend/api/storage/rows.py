@@ -0,0 +1,385 @@
+from itertools import repeat
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.db import connection
+from django.db.models import Max, Model, OuterRef, QuerySet, Subquery
+from humanize import precisedelta
+from rest_framework.serializers import ValidationError
+
+from ..ingestion.bulk_loader import BulkLoader
+from ..ingestion.encoding import encode_column, encode_sort_keys
+from ..models.generic_data_model import ALL_KEYS, IMPORTANT_KEYS_BY_DTYPE, GenericData
+from ..models.table_col_model import TableCol
+from .base import ColumnWriter, StorageEngine, is_rewritten
+from .keyset import row_range, seek_query, seek_rows
+
+# The GenericData fields of each inserted cell, the value fields sorted for a stable order
+CELL_FIELDS = ["column", "row", *sorted(ALL_KEYS), "sort_key"]
+
+
+def create_cells(
+    table_cols: List[TableCol],
+    df: pd.DataFrame,
+    loader: BulkLoader,
+    row_offset: int = 0,
+) -> int:
+    """
+    Creates the `GenericData` of every cell in the DataFrame.
+    Each column is encoded at once with `encode_column` and its cells are loaded
+    as plain rows, so no `GenericData` instance is built per cell.
+
+    Args:
+        table_cols (List[TableCol]): The columns of the file, ordered as in the DataFrame.
+        df (DataFrame): The DataFrame to create the cells from.
+        loader (BulkLoader): An open loader of `GenericData` with the `CELL_FIELDS`.
+        row_offset (int): The file row index of the first row in the DataFrame.
+            It is only different from 0 when the file is stored chunk by chunk.
+
+    Returns:
+        created (int): The amount of created cells.
+    """
+
+    num_of_rows = len(df)
+    created = 0
+    for table_col, col in zip(table_cols, df.columns):
+        encoded = encode_column(df[col], table_col.col_type)
+        encoded["sort_key"] = encode_sort_keys(df[col], table_col.col_type)
+        values = [
+            encoded[key] if key in encoded else repeat(None, num_of_rows)
+            for key in CELL_FIELDS[2:]
+        ]
+
+        rows = zip(
+            repeat(table_col.id, num_of_rows),
+            range(row_offset, row_offset + num_of_rows),
+            *values,
+        )
+        created += loader.load(rows)
+
+    return created
+
+
+def cells_series(cells: List[tuple], dtype: str) -> pd.Series:
+    """
+    Builds a column back from the important fields of its cells, see `IMPORTANT_KEYS_BY_DTYPE`.
+
+    Args:
+        cells (List[tuple]): The sorted important fields of every cell, in row order.
+        dtype (str): The `col_type` of the column.
+
+    Returns:
+        pd.Series: The column, indexed from 0.
+    """
+
+    fields = list(zip(*cells)) or [()] * len(IMPORTANT_KEYS_BY_DTYPE[dtype])
+
+    if dtype in {"object", "category"}:
+        return pd.Series(list(fields[0]), dtype=dtype)
+
+    if dtype.startswith("uint"):
+        return pd.Series(np.array(fields[0], dtype=dtype))
+
+    if dtype.startswith("int"):
+        # The fields are sorted, the sign comes before the magnitude
+        signs, magnitudes = fields
+        signed = np.array(magnitudes, dtype=np.int64) * np.array(signs, dtype=np.int64)
+        return pd.Series(signed.astype(dtype))
+
+    if dtype.startswith("float"):
+        return pd.Series(np.array(fields[0], dtype=np.float64).astype(dtype))
+
+    if dtype.startswith("complex"):
+        imag, real = fields
+        return pd.Series(np.array(real, dtype=float) + 1j * np.array(imag, dtype=float))
+
+    if dtype == "datetime64[ns]":
+        datetimes = pd.to_datetime(list(fields[0]), utc=True).tz_convert(None)
+        return pd.Series(datetimes.astype(dtype))
+
+    if dtype == "timedelta64[ns]":
+        return pd.Series(pd.to_timedelta(np.array(fields[0], dtype=np.int64), "ns"))
+
+    return pd.Series(np.array(fields[0], dtype=dtype))
+
+
+def update_sort_keys(cells: QuerySet, dtype: str) -> int:
+    """
+    Computes again the `sort_key` of the cells of a column from their values,
+    `INGEST_CHUNK_ROWS` cells at a time. It is needed when the dtype of the column
+    changes.
+
+    Args:
+        cells (QuerySet): The `GenericData` of a column.
+        dtype (str): The `col_type` of the column.
+
+    Returns:
+        updated (int): The amount of updated cells.
+    """
+
+    model: Model = cells.model
+    fields = sorted(IMPORTANT_KEYS_BY_DTYPE[dtype])
+    quote = connection.ops.quote_name
+    sql = (
+        f"UPDATE {quote(model._meta.db_table)} SET {quote('sort_key')} = %s "
+        f"WHERE {quote('id')} = %s"
+    )
+
+    updated = 0
+    last_id = 0
+    while True:
+        batch = list(
+            cells.filter(id__gt=last_id)
+            .order_by("id")
+            .values_list("id", *fields)[: settings.INGEST_CHUNK_ROWS]
+        )
+        if not batch:
+            return updated
+
+        ids = [cell[0] for cell in batch]
+        keys = encode_sort_keys(
+            cells_series([cell[1:] for cell in batch], dtype), dtype
+        )
+        with connection.cursor() as cursor:
+            cursor.executemany(sql, list(zip(keys, ids)))
+
+        updated += len(batch)
+        last_id = ids[-1]
+
+
+# Decodes the sorted important fields of a cell into its represented value
+CellDecoder = Callable[[tuple], Any]
+
+
+def cell_decoder(dtype: str) -> CellDecoder:
+    """
+    Builds the decoder of the cells of a column once, with the numpy type of its dtype.
+    The values are the ones `GenericDataSerializer` represents the cells with.
+
+    Args:
+        dtype (str): The `col_type` of the column.
+
+    Raises:
+        ValidationError: When the dtype is not supported, like in `GenericDataSerializer`.
+
+    Returns:
+        decoder (CellDecoder): Decodes the sorted `IMPORTANT_KEYS_BY_DTYPE` of a cell.
+    """
+
+    if dtype in {"object", "category", "datetime64[ns]", "bool"}:
+        return lambda fields: fields[0]
+
+    if dtype.startswith("uint") or dtype.startswith("float"):
+        scalar = np.dtype(dtype).type
+        return lambda fields: scalar(fields[0])
+
+    if dtype.startswith("int"):
+        # The fields are sorted, the sign comes before the magnitude
+        scalar = np.dtype(dtype).type
+        return lambda fields: scalar(fields[1] * fields[0])
+
+    if dtype.startswith("complex"):
+        return lambda fields: {"real": fields[1], "imag": fields[0]}
+
+    if dtype == "timedelta64[ns]":
+        return lambda fields: precisedelta(
+            pd.to_timedelta(fields[0], "ns"), minimum_unit="milliseconds"
+        )
+
+    raise ValidationError(f"DTYPE '{dtype}' NOT FOUND")
+
+
+def decode_page(
+    cells: QuerySet,
+    cols: Dict[str, Dict[str, Any]],
+    row_order: Optional[List[int]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Reads the cells of a page with a single `values_list` query, and decodes them
+    with a decoder per column built from `cols`, instead of a serializer per cell.
+
+    Args:
+        cells (QuerySet): The `GenericData` of the rows of the page.
+        cols (Dict[str, Dict[str, Any]]): The serialized columns of the file, by name.
+        row_order (Optional[List[int]]): The row indexes of the page, in order.
+            Without it, the cells are already sorted and the rows keep their order.
+
+    Returns:
+        rows (List[Dict[str, Any]]): The rows of the page, each one with its
+            `row_index` and its `values` by column name.
+    """
+
+    fields = sorted(
+        set().union(
+            *(IMPORTANT_KEYS_BY_DTYPE[col["col_type"]] for col in cols.values())
+        )
+    )
+
+    # The positions of the fields of each column in the queried ones
+    decoders = {}
+    for col_name, col in cols.items():
+        positions = [
+            fields.index(key) + 2
+            for key in sorted(IMPORTANT_KEYS_BY_DTYPE[col["col_type"]])
+        ]
+        decoders[col["id"]] = (col_name, positions, cell_decoder(col["col_type"]))
+
+    if row_order is not None:
+        cells = cells.order_by("row", "column")
+
+    values_by_row: Dict[int, Dict[str, Any]] = {row: {} for row in row_order or []}
+    for cell in cells.values_list("row", "column", *fields):
+        col_name, positions, decoder = decoders[cell[1]]
+        values_by_row.setdefault(cell[0], {})[col_name] = decoder(
+            tuple(cell[position] for position in positions)
+        )
+
+    return [
+        {"row_index": row, "values": values} for row, values in values_by_row.items()
+    ]
+
+
+class RowsWriter(ColumnWriter):
+    """Inserts every cell as a `GenericData` row, with a `BulkLoader`."""
+
+    def __init__(self, on_progress: Optional[Callable[[int], None]] = None):
+        self.loader = BulkLoader(GenericData, CELL_FIELDS, on_progress=on_progress)
+
+    def __enter__(self) -> "RowsWriter":
+        self.loader.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> bool:
+        return self.loader.__exit__(exc_type, exc_value, traceback)
+
+    def write(
+        self, table_cols: List[TableCol], df: pd.DataFrame, row_offset: int = 0
+    ) -> int:
+        return create_cells(table_cols, df, self.loader, row_offset)
+
+    def commit(self) -> None:
+        self.loader.commit()
+
+
+class RowsEngine(StorageEngine):
+    """
+    The original storage, one `GenericData` row per cell.
+    Pages are sorted and sliced by the database.
+    """
+
+    name = "rows"
+
+    # `GenericData.uint_value` is a signed SQLite integer
+    max_integer = int(np.iinfo(np.int64).max)
+
+    def writer(
+        self, on_progress: Optional[Callable[[int], None]] = None
+    ) -> ColumnWriter:
+        return RowsWriter(on_progress)
+
+    def promote_column(self, table_col: TableCol, col_type: str) -> None:
+        if is_rewritten(col_type):
+            self.rewrite_column(table_col, col_type)
+            return
+
+        GenericData.promote_column(table_col, col_type)
+
+        # Integers and floats are encoded differently
+        update_sort_keys(GenericData.objects.filter(column=table_col.id), col_type)
+
+    def clear(self, table_cols: List[TableCol]) -> None:
+        GenericData.objects.filter(
+            column__in=[table_col.id for table_col in table_cols]
+        ).delete()
+
+    def first_col_cells(self, cols: Dict[str, Dict[str, Any]]) -> QuerySet:
+        """The cells of the first column of a file, which has a cell per row."""
+        return GenericData.objects.filter(column=next(iter(cols.values()))["id"])
+
+    def row_count(self, cols: Dict[str, Dict[str, Any]]) -> int:
+        """The amount of rows of a file, from the last row of its first column in the index."""
+        last_row = self.first_col_cells(cols).aggregate(Max("row"))["row__max"]
+        return 0 if last_row is None else last_row + 1
+
+    def total_rows(self, file_id: str, cols: Dict[str, Dict[str, Any]]) -> int:
+        return int(GenericData.get_objects_by_columns(cols).count() / len(cols))
+
+    def sort_keys(
+        self, file_id: str, col: Dict[str, Any], rows: List[int]
+    ) -> List[Optional[bytes]]:
+        keys = dict(
+            GenericData.objects.filter(column=col["id"], row__in=rows).values_list(
+                "row", "sort_key"
+            )
+        )
+        return [None if keys[row] is None else bytes(keys[row]) for row in rows]
+
+    def read_columns(
+        self, table_cols: List[TableCol], start: int, stop: int
+    ) -> pd.DataFrame:
+        df = pd.DataFrame()
+        for table_col in table_cols:
+            fields = sorted(IMPORTANT_KEYS_BY_DTYPE[table_col.col_type])
+            cells = GenericData.objects.filter(
+                column=table_col.id, row__gte=start, row__lt=stop
+            ).order_by("row")
+            df[table_col.col_name] = cells_series(
+                list(cells.values_list(*fields)), table_col.col_type
+            )
+
+        return df
+
+    def page(
+        self,
+        cols: Dict[str, Dict[str, Any]],
+        request_query: Dict[str, Any],
+        total_rows: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        # Get all data from those columns
+        filtered_data_models = GenericData.get_objects_by_columns(cols)
+        cursor = request_query.get("cursor")
+        seek = cursor is not None and cursor["row"] is not None
+
+        # Sort and slice the data
+        if request_query["sort_by"] == "row_index":
+            if seek:
+                row_order = seek_rows(
+                    self.first_col_cells(cols), None, None, request_query
+                )
+                return decode_page(
+                    filtered_data_models.filter(row__in=row_order), cols, row_order
+                )
+
+            if total_rows is None:
+                total_rows = self.row_count(cols)
+            row_order = row_range(request_query, total_rows)
+            sorted_data_models = filtered_data_models.filter(
+                row__range=(min(row_order, default=0), max(row_order, default=-1))
+            )
+            return decode_page(sorted_data_models, cols, row_order)
+
+        # The rows of the page, a sorted slice of the sorting column
+        sorting_col = cols[request_query["sort_by"]]
+        sorting_col_data = GenericData.objects.filter(column=sorting_col["id"])
+        if seek:
+            page_rows = seek_query(
+                sorting_col_data, "sort_key", cursor["key"], request_query
+            )
+        else:
+            page_rows = GenericData.slice_and_sort_by_col(
+                filtered_data_models, cols, request_query
+            ).values_list("row", flat=True)
+
+        # A single query gets the cells of those rows, sorted by the key of the
+        # row in the sorting column
+        row_key = sorting_col_data.filter(row=OuterRef("row")).values("sort_key")[:1]
+        order_by = f"{'-' if not request_query['asc'] else ''}row_key"
+        sorted_data_models = (
+            filtered_data_models.filter(row__in=page_rows)
+            .annotate(row_key=Subquery(row_key))
+            .order_by(order_by, "row", "column")
+        )
+
+        return decode_page(sorted_data_models, cols)
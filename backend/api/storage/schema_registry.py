@@ -0,0 +1,154 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, List, Optional
+
+from django.conf import settings
+from django.db.models import Exists, OuterRef, Q
+
+from ..models.file_alias_model import FileAlias
+from ..models.file_meta_model import FileMeta
+from ..models.table_col_model import TableCol
+from ..serializers.table_col_serializer import TableColSerializer
+
+
+class FileSchema:
+    """
+    The columns of a stored file, loaded once: their models, to find the storage
+    engine of the file, and their serialized representation, by name. Also the id of
+    the stored file and its `FileMeta`, which files still being ingested do not have yet.
+    """
+
+    def __init__(
+        self, file_id: str, table_cols: List[TableCol], file_meta: Optional[FileMeta]
+    ):
+        self.file_id = file_id
+        self.table_cols = table_cols
+        self.file_meta = file_meta
+        self.serialized_cols: Dict[str, Dict[str, Any]] = TableColSerializer(
+            table_cols
+        ).data
+
+    def cols(self) -> Dict[str, Dict[str, Any]]:
+        """A copy of the serialized columns, that the caller may change."""
+        return {col_name: dict(col) for col_name, col in self.serialized_cols.items()}
+
+
+class SchemaRegistry:
+    """
+    The schemas of the files served by the process, by the `file_id` they are requested
+    with, so the alias and the columns of a file are queried once instead of in every
+    request. It keeps up to `max_files` schemas and evicts the least recently used ones.
+    Only stored files are kept, the ones with a `FileMeta`, as the columns of a file still
+    being ingested may be promoted.
+
+    The columns of a stored file change when it is deleted, ingested again or moved to
+    another storage engine, which invalidates its schema in the process that does it and
+    bumps the `version` of its `FileMeta` (or deletes it). The other processes find out
+    with a single lookup, of the alias together with that version, see `is_current`.
+    """
+
+    def __init__(self, max_files: int):
+        self.max_files = max_files
+        self.schemas: "OrderedDict[str, FileSchema]" = OrderedDict()
+        self.lock = Lock()
+
+    @staticmethod
+    def is_current(alias: str, schema: FileSchema) -> bool:
+        """
+        Whether a kept schema is still the one of a `file_id`, in a single query:
+        the `file_id` still resolves to the same stored file (see `FileAlias.resolve`)
+        and its `FileMeta` has the same version.
+
+        Args:
+            alias (str): The `file_id` the schema was requested with.
+            schema (FileSchema): The kept schema.
+
+        Returns:
+            bool: Whether the schema can be used.
+        """
+
+        aliased = Exists(
+            FileAlias.objects.filter(alias=alias, file_id=OuterRef("file_id"))
+        )
+        # A file without aliases is requested by its own id
+        unaliased = Q(file_id=alias) & ~Exists(
+            FileAlias.objects.filter(Q(alias=alias) | Q(file_id=alias))
+        )
+        return (
+            FileMeta.objects.filter(
+                pk=schema.file_meta.pk, version=schema.file_meta.version
+            )
+            .filter(aliased | unaliased)
+            .exists()
+        )
+
+    def get(self, alias: str) -> Optional[FileSchema]:
+        """
+        Gets the schema of a file, loading it the first time.
+
+        Args:
+            alias (str): The `file_id` the file is requested with, see `FileAlias`.
+
+        Returns:
+            Optional[FileSchema]: The schema, or None when the `file_id` does not
+                resolve to a file with columns.
+        """
+
+        with self.lock:
+            schema = self.schemas.get(alias)
+            if schema is not None:
+                self.schemas.move_to_end(alias)
+
+        if schema is not None:
+            if self.is_current(alias, schema):
+                return schema
+
+            # Deleted or changed by another process
+            with self.lock:
+                self.schemas.pop(alias, None)
+
+        file_id = FileAlias.resolve(alias)
+        if file_id is None:
+            return None
+
+        table_cols = list(TableCol.objects.filter(file_id=file_id))
+        if not table_cols:
+            return None
+
+        schema = FileSchema(
+            file_id, table_cols, FileMeta.objects.filter(file_id=file_id).first()
+        )
+        if schema.file_meta is None:
+            # Not kept, the file is being ingested
+            return schema
+
+        with self.lock:
+            self.schemas[alias] = schema
+            while len(self.schemas) > self.max_files:
+                self.schemas.popitem(last=False)
+
+        return schema
+
+    def invalidate(self, file_id: str) -> None:
+        """Forgets the schema of a stored file, whatever `file_id` it was requested with."""
+        with self.lock:
+            for alias in [
+                alias
+                for alias, schema in self.schemas.items()
+                if schema.file_id == file_id
+            ]:
+                del self.schemas[alias]
+
+
+# The registry of the process
+schema_registry = SchemaRegistry(settings.SCHEMA_REGISTRY_MAX_FILES)
+
+
+def get_schema(file_id: str) -> Optional[FileSchema]:
+    """The schema of a file, see `SchemaRegistry.get`."""
+    return schema_registry.get(file_id)
+
+
+def invalidate_schema(file_id: str) -> None:
+    """Forgets the schema of a file, see `SchemaRegistry.invalidate`."""
+    schema_registry.invalidate(file_id)
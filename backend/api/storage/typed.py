@@ -0,0 +1,354 @@
+from itertools import repeat
+from typing import Any, Callable, Dict, List, Optional, Type
+
+import numpy as np
+import pandas as pd
+from django.db import connection, transaction
+from django.db.models import Max
+
+from ..ingestion.bulk_loader import BulkLoader
+from ..ingestion.encoding import encode_datetimes, encode_sort_keys, encode_strings
+from ..models.table_col_model import TableCol
+from ..models.typed_cell_models import (
+    ComplexCell,
+    FloatCell,
+    IntegerCell,
+    TypedCell,
+    typed_cell_model,
+)
+from ..serializers.typed_cell_serializer import TypedCellSerializer
+from .base import ColumnWriter, StorageEngine, is_rewritten
+from .keyset import row_range, seek_rows
+
+# The biggest integer `IntegerCell.value` stores
+INT64_MAX = np.iinfo(np.int64).max
+
+
+def encode_typed_column(data: pd.Series, dtype: str) -> Dict[str, List[Any]]:
+    """
+    Encodes a whole column into the value fields of its typed cell table.
+
+    Args:
+        data (pd.Series): The converted column to encode.
+        dtype (str): The `col_type` of the column.
+
+    Raises:
+        ValueError: When an `uint64` column has integers that do not fit the signed
+            64 bit `IntegerCell.value`.
+
+    Returns:
+        encoded (Dict[str, List[Any]]): The python values of every cell for each value field.
+    """
+
+    model = typed_cell_model(dtype)
+
+    if dtype in {"object", "category"}:
+        return {"value": encode_strings(data)}
+
+    if dtype == "datetime64[ns]":
+        return {"value": encode_datetimes(data)}
+
+    values = data.to_numpy()
+
+    if model is ComplexCell:
+        return {
+            "value": np.abs(values).tolist(),
+            "real": values.real.tolist(),
+            "imag": values.imag.tolist(),
+        }
+
+    if dtype == "timedelta64[ns]":
+        # The same as `pd.Timedelta.value`, the nanoseconds of the timedelta
+        return {"value": values.view(np.int64).tolist()}
+
+    if model is IntegerCell:
+        if dtype == "uint64" and len(values) and values.max() > INT64_MAX:
+            # `astype` would wrap them around to negative numbers
+            raise ValueError(
+                f"the typed engine stores integers up to {INT64_MAX}, "
+                f"found {values.max()}"
+            )
+        return {"value": values.astype(np.int64).tolist()}
+
+    return {"value": values.tolist()}
+
+
+def typed_series(cells: List[tuple], dtype: str) -> pd.Series:
+    """
+    Builds a column back from the value fields of its typed cells.
+
+    Args:
+        cells (List[tuple]): The `real` and `imag` of complex cells, the `value` of any other, in row order.
+        dtype (str): The `col_type` of the column.
+
+    Returns:
+        pd.Series: The column, indexed from 0.
+    """
+
+    if dtype.startswith("complex"):
+        real = np.array([cell[0] for cell in cells], dtype=float)
+        imag = np.array([cell[1] for cell in cells], dtype=float)
+        return pd.Series(real + 1j * imag)
+
+    values = [cell[0] for cell in cells]
+
+    if dtype in {"object", "category"}:
+        return pd.Series(values, dtype=dtype)
+
+    if dtype == "datetime64[ns]":
+        datetimes = pd.to_datetime(values, utc=True).tz_convert(None)
+        return pd.Series(datetimes.astype(dtype))
+
+    if dtype == "timedelta64[ns]":
+        return pd.Series(pd.to_timedelta(np.array(values, dtype=np.int64), "ns"))
+
+    if dtype.startswith("float"):
+        return pd.Series(np.array(values, dtype=np.float64).astype(dtype))
+
+    return pd.Series(np.array(values, dtype=dtype))
+
+
+def value_fields(model: Type[TypedCell]) -> List[str]:
+    """The fields of a typed cell table besides `column` and `row`."""
+    return ["value", "real", "imag"] if model is ComplexCell else ["value"]
+
+
+class TypedWriter(ColumnWriter):
+    """
+    Inserts every cell into the table of its type with a `BulkLoader` per column,
+    so each column is committed once it is loaded.
+    """
+
+    def __init__(self, on_progress: Optional[Callable[[int], None]] = None):
+        self.on_progress = on_progress
+        self.cells_written = 0
+
+    def write(
+        self, table_cols: List[TableCol], df: pd.DataFrame, row_offset: int = 0
+    ) -> int:
+        num_of_rows = len(df)
+        created = 0
+        for table_col, col in zip(table_cols, df.columns):
+            model = typed_cell_model(table_col.col_type)
+            fields = value_fields(model)
+            encoded = encode_typed_column(df[col], table_col.col_type)
+
+            rows = zip(
+                repeat(table_col.id, num_of_rows),
+                range(row_offset, row_offset + num_of_rows),
+                *(encoded[field] for field in fields),
+            )
+            with BulkLoader(model, ["column", "row", *fields]) as loader:
+                created += loader.load(rows)
+
+        self.cells_written += created
+        return created
+
+    def commit(self) -> None:
+        # Every column is already committed by its loader
+        if self.on_progress is not None:
+            self.on_progress(self.cells_written)
+
+
+class TypedEngine(StorageEngine):
+    """
+    Keeps the cells in narrow tables, one per type (see `typed_cell_models.py`).
+    Pages are sorted and sliced by the database, with the `(column, value)` index of the
+    table of the sorting column.
+    """
+
+    name = "typed"
+
+    max_integer = int(INT64_MAX)
+
+    def writer(
+        self, on_progress: Optional[Callable[[int], None]] = None
+    ) -> ColumnWriter:
+        return TypedWriter(on_progress)
+
+    def promote_column(self, table_col: TableCol, col_type: str) -> None:
+        if is_rewritten(col_type):
+            self.rewrite_column(table_col, col_type)
+            return
+
+        previous_model = typed_cell_model(table_col.col_type)
+        model = typed_cell_model(col_type)
+
+        if model is not previous_model:
+            # Integers become floats, moving them to the float table in the database
+            quote = connection.ops.quote_name
+            columns = f"{quote('column_id')}, {quote('row')}"
+            with transaction.atomic():
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        f"INSERT INTO {quote(FloatCell._meta.db_table)} "
+                        f"({columns}, {quote('value')}) "
+                        f"SELECT {columns}, CAST({quote('value')} AS REAL) "
+                        f"FROM {quote(previous_model._meta.db_table)} "
+                        f"WHERE {quote('column_id')} = %s",
+                        [table_col.id],
+                    )
+                previous_model.objects.filter(column=table_col.id).delete()
+
+        table_col.col_type = col_type
+        table_col.save(update_fields=["col_type"])
+
+    def clear(self, table_cols: List[TableCol]) -> None:
+        for table_col in table_cols:
+            typed_cell_model(table_col.col_type).objects.filter(
+                column=table_col.id
+            ).delete()
+
+    def first_col_cells(self, cols: Dict[str, Dict[str, Any]]):
+        """The cells of the first column of a file, which has a cell per row."""
+        col = next(iter(cols.values()))
+        return typed_cell_model(col["col_type"]).objects.filter(column=col["id"])
+
+    def total_rows(self, file_id: str, cols: Dict[str, Dict[str, Any]]) -> int:
+        return self.first_col_cells(cols).count()
+
+    def read_columns(
+        self, table_cols: List[TableCol], start: int, stop: int
+    ) -> pd.DataFrame:
+        df = pd.DataFrame()
+        for table_col in table_cols:
+            model = typed_cell_model(table_col.col_type)
+            fields = ["real", "imag"] if model is ComplexCell else ["value"]
+            cells = model.objects.filter(
+                column=table_col.id, row__gte=start, row__lt=stop
+            ).order_by("row")
+            df[table_col.col_name] = typed_series(
+                list(cells.values_list(*fields)), table_col.col_type
+            )
+
+        return df
+
+    def sort_keys(
+        self, file_id: str, col: Dict[str, Any], rows: List[int]
+    ) -> List[Optional[bytes]]:
+        model = typed_cell_model(col["col_type"])
+        fields = ["real", "imag"] if model is ComplexCell else ["value"]
+        cells = dict(
+            (cell[0], cell[1:])
+            for cell in model.objects.filter(
+                column=col["id"], row__in=rows
+            ).values_list("row", *fields)
+        )
+        data = typed_series([cells[row] for row in rows], col["col_type"])
+        return encode_sort_keys(data, col["col_type"])
+
+    def seek_rows(
+        self, cols: Dict[str, Dict[str, Any]], request_query: Dict[str, Any]
+    ) -> List[int]:
+        """
+        Gets the row indexes of the page of a cursor, see `keyset.seek_rows`.
+        The tables compare their own values, so the seek starts from the value
+        of the cursor row, found with the `(column, row)` index.
+
+        Args:
+            cols (Dict[str, Dict[str, Any]]): The serialized columns of the file, by name.
+            request_query (Dict[str, Any]): The query parameters from the request.
+
+        Returns:
+            row_order (List[int]): The row indexes of the page, in order.
+        """
+
+        if request_query["sort_by"] == "row_index":
+            return seek_rows(self.first_col_cells(cols), None, None, request_query)
+
+        sorting_col = cols[request_query["sort_by"]]
+        cells = typed_cell_model(sorting_col["col_type"]).objects.filter(
+            column=sorting_col["id"]
+        )
+        key = (
+            cells.filter(row=request_query["cursor"]["row"])
+            .values_list("value", flat=True)
+            .first()
+        )
+        return seek_rows(cells, "value", key, request_query)
+
+    def slice_and_sort_by_row(
+        self,
+        cols: Dict[str, Dict[str, Any]],
+        request_query: Dict[str, Any],
+        total_rows: Optional[int],
+    ) -> List[int]:
+        """
+        Gets the row indexes of a page sorted by row, see `keyset.row_range`.
+        When the amount of rows is not known, it is the last row of the first column,
+        found in its index.
+
+        Args:
+            cols (Dict[str, Dict[str, Any]]): The serialized columns of the file, by name.
+            request_query (Dict[str, Any]): The query parameters from the request.
+            total_rows (Optional[int]): The amount of rows of the file, if known.
+
+        Returns:
+            row_order (List[int]): The row indexes of the page, in order.
+        """
+
+        if total_rows is None:
+            last_row = self.first_col_cells(cols).aggregate(Max("row"))["row__max"]
+            total_rows = 0 if last_row is None else last_row + 1
+        return list(row_range(request_query, total_rows))
+
+    def slice_and_sort_by_col(
+        self, cols: Dict[str, Dict[str, Any]], request_query: Dict[str, Any]
+    ) -> List[int]:
+        """
+        Gets the row indexes of a page sorted by the `sort_by` column, from the cells
+        of its table. Complex numbers are sorted by their magnitude, their `value`.
+
+        Args:
+            cols (Dict[str, Dict[str, Any]]): The serialized columns of the file, by name.
+            request_query (Dict[str, Any]): The query parameters from the request.
+
+        Returns:
+            row_order (List[int]): The row indexes of the page, in order.
+        """
+
+        page_size: int = request_query["page_size"]
+        page: int = request_query["page"]
+        sorting_col = cols[request_query["sort_by"]]
+        order_by = f"{'-' if not request_query['asc'] else ''}value"
+
+        # Rows with the same value keep the row order both ways, which the index
+        # gives back with a partial sort of each group of equal values
+        cells = typed_cell_model(sorting_col["col_type"]).objects.filter(
+            column=sorting_col["id"]
+        )
+        return list(
+            cells.order_by(order_by, "row").values_list("row", flat=True)[
+                page * page_size : (page + 1) * page_size
+            ]
+        )
+
+    def page(
+        self,
+        cols: Dict[str, Dict[str, Any]],
+        request_query: Dict[str, Any],
+        total_rows: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        cursor = request_query.get("cursor")
+        if cursor is not None and cursor["row"] is not None:
+            row_order = self.seek_rows(cols, request_query)
+        elif request_query["sort_by"] == "row_index":
+            row_order = self.slice_and_sort_by_row(cols, request_query, total_rows)
+        else:
+            row_order = self.slice_and_sort_by_col(cols, request_query)
+
+        # The cells of the page, one query per table
+        col_ids_by_model: Dict[Type[TypedCell], List[int]] = {}
+        for col in cols.values():
+            model = typed_cell_model(col["col_type"])
+            col_ids_by_model.setdefault(model, []).append(col["id"])
+
+        cells: List[TypedCell] = []
+        for model, col_ids in col_ids_by_model.items():
+            cells += model.objects.filter(
+                column__in=col_ids, row__in=row_order
+            ).select_related("column")
+
+        return TypedCellSerializer(
+            cells, row_order=row_order, col_order=list(cols)
+        ).data["rows"]
@@ -1,3 +1,1267 @@
-from django.test import TestCase
+from datetime import timedelta
+import json
+from importlib.util import find_spec
+from io import BytesIO, StringIO
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import Any, Dict, List, Optional
+from unittest import mock, skipUnless
 
-# Create your tests here.
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import F
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from .ingestion.jobs import run_job
+from .ingestion.streaming import read_chunks, stream_data, stream_workbook
+from .models.file_alias_model import FileAlias
+from .models.file_meta_model import FileMeta
+from .models.ingest_job_model import IngestJob
+from .models.table_col_model import TableCol
+from .models.generic_data_model import GenericData
+from .models.typed_cell_models import (
+    BoolCell,
+    ComplexCell,
+    DatetimeCell,
+    FloatCell,
+    IntegerCell,
+    StringCell,
+)
+from .models.upload_digest_model import UploadDigest
+from .scripts import infer_data_types
+from .scripts.datetime_formats import detect_datetime_format, get_datetime_formats
+from .scripts.profiler import classify_strings
+from .scripts.type_inferences.complex import complex_conversion
+from .storage.column_cache import ColumnCache, cache_dir
+from .storage.engines import STORAGE_ENGINES
+from .storage.page_cache import PAGE_CACHES, get_page_cache
+from .storage.schema_registry import SchemaRegistry, get_schema
+from .renderers import NumpyJSONRenderer
+from .storage.arrays import sort_index, sorted_page, sorted_position
+from .storage.keyset import rows_after
+from .storage.typed import encode_typed_column
+
+# The tests run without the column and page caches, so nothing is written next to the project
+TEST_SETTINGS = {"COLUMN_CACHE": False, "PAGE_CACHE": "off"}
+
+
+def expected_order(
+    cells: List[Optional[float]], field_ascending: bool, row_ascending: bool
+) -> List[int]:
+    """
+    The rows of some cells in the order of the database: nulls first when ascending
+    and last when descending, ties broken by the row.
+    """
+
+    def sort_key(row: int):
+        value = cells[row]
+        tie = row if row_ascending else -row
+        if value is None:
+            return (0 if field_ascending else 1, 0, tie)
+        return (1 if field_ascending else 0, value if field_ascending else -value, tie)
+
+    return sorted(range(len(cells)), key=sort_key)
+
+
+class RowsAfterTests(TestCase):
+    """The seek predicate of `keyset.rows_after`, over the cells of a float column."""
+
+    cells = [3.0, None, 1.0, 3.0, None, 2.0, 1.0, 3.0]
+
+    def setUp(self):
+        self.table_col = TableCol.objects.create(
+            file_id="keyset.csv", col_index=0, col_name="x", col_type="float64"
+        )
+        FloatCell.objects.bulk_create(
+            FloatCell(column=self.table_col, row=row, value=value)
+            for row, value in enumerate(self.cells)
+        )
+
+    def after(
+        self, field: Optional[str], row: int, field_ascending: bool, row_ascending: bool
+    ) -> List[int]:
+        """The rows after a row by `rows_after`, in the expected order."""
+
+        key = self.cells[row] if field is not None else None
+        predicate = rows_after(field, key, row, field_ascending, row_ascending)
+        found = set(
+            FloatCell.objects.filter(column=self.table_col)
+            .filter(predicate)
+            .values_list("row", flat=True)
+        )
+        order = expected_order(self.cells, field_ascending, row_ascending)
+        return [cell_row for cell_row in order if cell_row in found]
+
+    def test_sorted_by_value(self):
+        for field_ascending in (True, False):
+            for row_ascending in (True, False):
+                order = expected_order(self.cells, field_ascending, row_ascending)
+                for position, row in enumerate(order):
+                    with self.subTest(
+                        row=row, field_asc=field_ascending, row_asc=row_ascending
+                    ):
+                        self.assertEqual(
+                            self.after("value", row, field_ascending, row_ascending),
+                            order[position + 1 :],
+                        )
+
+    def test_sorted_by_row(self):
+        for ascending in (True, False):
+            for row in range(len(self.cells)):
+                expected = (
+                    list(range(row + 1, len(self.cells)))
+                    if ascending
+                    else list(range(row - 1, -1, -1))
+                )
+                after = self.after(None, row, ascending, ascending)
+                self.assertEqual(sorted(after), sorted(expected))
+
+
+class SortedPageTests(TestCase):
+    """The sort index of the arrays of a column, with ties and nulls."""
+
+    values = np.array([2, 1, 2, 0, 1, 2, 0, 9], dtype=np.int64)
+    mask = np.array([False, False, False, True, False, False, False, True])
+
+    def expected(self, ascending: bool) -> List[int]:
+        cells: List[Optional[float]] = [
+            None if null else float(value)
+            for value, null in zip(self.values, self.mask)
+        ]
+        # Ties keep the row order in both directions
+        return expected_order(cells, ascending, True)
+
+    def test_whole_column(self):
+        order, ranks, _ = sort_index(self.values, self.mask, "int64")
+        for ascending in (True, False):
+            with self.subTest(ascending=ascending):
+                rows = sorted_page(order, ranks, 0, len(order), ascending)
+                self.assertEqual(rows.tolist(), self.expected(ascending))
+
+    def test_pages(self):
+        order, ranks, _ = sort_index(self.values, self.mask, "int64")
+        for ascending in (True, False):
+            for page_size in (1, 2, 3):
+                with self.subTest(ascending=ascending, page_size=page_size):
+                    rows = []
+                    for start in range(0, len(order), page_size):
+                        rows += sorted_page(
+                            order, ranks, start, start + page_size, ascending
+                        ).tolist()
+                    self.assertEqual(rows, self.expected(ascending))
+
+    def test_positions(self):
+        _, ranks, positions = sort_index(self.values, self.mask, "int64")
+        for ascending in (True, False):
+            expected = self.expected(ascending)
+            for row in range(len(self.values)):
+                with self.subTest(ascending=ascending, row=row):
+                    self.assertEqual(
+                        sorted_position(ranks, positions, row, ascending),
+                        expected.index(row),
+                    )
+
+
+@override_settings(**TEST_SETTINGS)
+class CursorTests(TestCase):
+    """The `next_cursor` and `prev_cursor` of `get-data` walk the same pages as `page`."""
+
+    def setUp(self):
+        self.client = APIClient()
+        rows = ["i,f"] + [f"{i % 4},{(7 * i) % 5}.5" for i in range(23)]
+        response = self.client.post(
+            "/api/process-file",
+            {"file": SimpleUploadedFile("cursor.csv", "\n".join(rows).encode())},
+            format="multipart",
+        )
+        self.file_id = response.json()["file_id"]
+
+    def get(self, **query) -> Dict[str, Any]:
+        response = self.client.get(
+            "/api/get-data", {"file_id": self.file_id, "page_size": 5, **query}
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_next_and_prev(self):
+        for sort_by in ("row_index", "i", "f"):
+            for asc in ("true", "false"):
+                with self.subTest(sort_by=sort_by, asc=asc):
+                    pages = [
+                        self.get(sort_by=sort_by, asc=asc, page=page)["rows"]
+                        for page in range(5)
+                    ]
+
+                    walked = [self.get(sort_by=sort_by, asc=asc, cursor="")]
+                    while walked[-1]["next_cursor"] is not None:
+                        walked.append(self.get(cursor=walked[-1]["next_cursor"]))
+                    self.assertEqual([page["rows"] for page in walked], pages)
+
+                    back = [walked[-1]]
+                    while back[-1]["prev_cursor"] is not None:
+                        page = self.get(cursor=back[-1]["prev_cursor"])
+                        if not page["rows"]:
+                            # A full first page can not know there is nothing before it
+                            break
+                        back.append(page)
+                    self.assertEqual([page["rows"] for page in back[::-1]], pages)
+
+
+@override_settings(**TEST_SETTINGS)
+class DedupTests(TestCase):
+    """Identical uploads share a stored file, each one holding its own reference."""
+
+    data = b"a,b\n1,x\n2,y\n3,z\n"
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def upload(self) -> str:
+        response = self.client.post(
+            "/api/process-file",
+            {"file": SimpleUploadedFile("dedup.csv", self.data)},
+            format="multipart",
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.json()["file_id"]
+
+    def get_status(self, file_id: str) -> int:
+        return self.client.get(
+            "/api/get-data", {"file_id": file_id, "page_size": 5}
+        ).status_code
+
+    def delete_status(self, file_id: str) -> int:
+        return self.client.delete(f"/api/delete-file?file_id={file_id}").status_code
+
+    def test_references(self):
+        file_ids = [self.upload() for _ in range(3)]
+
+        self.assertEqual(len(set(file_ids)), 3)
+        self.assertEqual(UploadDigest.objects.get().references, 3)
+        self.assertEqual(TableCol.objects.values("file_id").distinct().count(), 1)
+
+        # Each upload only drops its own reference
+        self.assertEqual(self.delete_status(file_ids[1]), 204)
+        self.assertEqual(self.delete_status(file_ids[1]), 400)
+        self.assertEqual(self.get_status(file_ids[1]), 400)
+        self.assertEqual(UploadDigest.objects.get().references, 2)
+        self.assertEqual(self.get_status(file_ids[0]), 200)
+        self.assertEqual(self.get_status(file_ids[2]), 200)
+
+        self.assertEqual(self.delete_status(file_ids[0]), 204)
+        self.assertEqual(self.get_status(file_ids[2]), 200)
+
+        # The last reference deletes the data
+        self.assertEqual(self.delete_status(file_ids[2]), 204)
+        self.assertFalse(UploadDigest.objects.exists())
+        self.assertFalse(TableCol.objects.exists())
+        self.assertFalse(FileAlias.objects.exists())
+
+    def test_upload_after_delete(self):
+        file_id = self.upload()
+        self.assertEqual(self.delete_status(file_id), 204)
+
+        self.assertEqual(self.get_status(self.upload()), 200)
+        self.assertEqual(UploadDigest.objects.get().references, 1)
+
+
+class DatetimeFormatTests(TestCase):
+    """The format of a datetime column is detected from a sample of it, when certain."""
+
+    def detect(self, *values: Optional[str]) -> Optional[str]:
+        return detect_datetime_format(pd.Series(values, dtype=object))
+
+    def test_iso(self):
+        self.assertEqual(self.detect("2000-02-12", "2001-12-31"), "%Y-%m-%d")
+        self.assertEqual(
+            self.detect("2000-02-12 10:30:00", None, "2000-02-13 11:00:00"),
+            "%Y-%m-%d %H:%M:%S",
+        )
+
+    def test_day_first(self):
+        self.assertEqual(self.detect("25/02/2000", "12/03/2000"), "%d/%m/%Y")
+
+    def test_month_first(self):
+        self.assertEqual(self.detect("02/25/2000", "03/12/2000"), "%m/%d/%Y")
+
+    def test_ambiguous(self):
+        # Day or month first, even if a later value is not
+        self.assertIsNone(self.detect("12/02/2000", "25/02/2000"))
+
+    def test_no_format(self):
+        self.assertIsNone(self.detect("25/02/2000", "2000-02-25"))
+        self.assertIsNone(self.detect("not a date", "25/02/2000"))
+        self.assertIsNone(detect_datetime_format(pd.Series([1, 2])))
+
+
+class ParallelInferenceTests(TestCase):
+    """Columns inferred on the pool of processes are the ones inferred in the process."""
+
+    def infer(self, processes: int) -> Any:
+        df = pd.DataFrame(
+            {
+                "n": [str(i) for i in range(40)],
+                "f": [f"{i / 4}" for i in range(40)],
+                "day": [f"{13 + i % 16}/03/2001" for i in range(40)],
+                "word": [f"w{i % 3}" for i in range(40)],
+                "forced": [str(i % 7) for i in range(40)],
+                "bad": ["x"] * 40,
+            }
+        )
+        with override_settings(INFERENCE_PROCESSES=processes), mock.patch.object(
+            infer_data_types, "PARALLEL_MIN_CELLS", 0
+        ):
+            df, errors = infer_data_types.infer_and_convert_data_types(
+                df, {"forced": "float", "bad": "int"}
+            )
+        return df, errors, get_datetime_formats(df)
+
+    def test_same_columns(self):
+        df, errors, formats = self.infer(1)
+        parallel_df, parallel_errors, parallel_formats = self.infer(2)
+        self.assertIsNotNone(infer_data_types._pool)
+
+        pd.testing.assert_frame_equal(parallel_df, df)
+        self.assertEqual(parallel_errors, errors)
+        self.assertEqual(list(errors), ["bad"])
+        self.assertEqual(parallel_formats, formats)
+        self.assertEqual(formats, {"day": "%d/%m/%Y"})
+
+
+class ComplexInferenceTests(TestCase):
+    """The strings `complex()` accepts are inferred as complex numbers."""
+
+    def test_digit_separators(self):
+        # Long strings are matched by the pattern, short ones by the code points
+        strings = np.array(["1_000", "2_5+1_0j", " 1_000 ".center(80)], dtype=object)
+        self.assertTrue(classify_strings(strings)["complex"].all())
+
+        df = pd.DataFrame({"x": strings})
+        self.assertTrue(complex_conversion(df, "x"))
+        self.assertEqual(df["x"].tolist(), [1000, 25 + 10j, 1000])
+
+
+@override_settings(**TEST_SETTINGS)
+class StreamedInferenceTests(TestCase):
+    """A file streamed in chunks is stored as the same file inferred at once."""
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def store(self, file_id: str, data: bytes, chunk_rows: int) -> None:
+        stream_data(file_id, read_chunks(BytesIO(data), "csv", chunk_rows), {})
+
+    def pages(self, file_id: str, sort_by: str) -> List[Dict[str, Any]]:
+        return [
+            self.client.get(
+                "/api/get-data",
+                {"file_id": file_id, "page_size": 7, "page": page, "sort_by": sort_by},
+            ).json()
+            for page in range(4)
+        ]
+
+    def assert_same_file(self, data: bytes, chunk_rows: int) -> None:
+        self.store("whole.csv", data, 1_000)
+        self.store("streamed.csv", data, chunk_rows)
+
+        whole = TableCol.objects.filter(file_id="whole.csv").order_by("col_index")
+        streamed = TableCol.objects.filter(file_id="streamed.csv").order_by("col_index")
+        self.assertEqual(
+            [table_col.col_type for table_col in streamed],
+            [table_col.col_type for table_col in whole],
+        )
+        for table_col in whole:
+            self.assertEqual(
+                self.pages("streamed.csv", table_col.col_name),
+                self.pages("whole.csv", table_col.col_name),
+            )
+
+    def test_widened_numbers(self):
+        rows = ["small,fraction"]
+        rows += [f"{i},{i}" for i in range(10)]
+        rows += [f"{-1000 * i},{i / 4}" for i in range(10)]
+        self.assert_same_file("\n".join(rows).encode(), 5)
+
+    def test_words_in_numbers(self):
+        # More words than the numbers inference tolerates, each one different
+        rows = ["n,f"]
+        rows += [f"{i},{i / 2}" for i in range(12)]
+        rows += [f"word{i},text{i}" for i in range(12)]
+        self.assert_same_file("\n".join(rows).encode(), 6)
+
+    def test_categories(self):
+        # Few distinct values in the first chunk, too many in the whole file
+        rows = ["widened,kept"]
+        rows += [f"{'ab'[i % 2]},{'xyz'[i % 3]}" for i in range(100)]
+        rows += [f"word{i},{'xyz'[i % 3]}" for i in range(100)]
+        self.assert_same_file("\n".join(rows).encode(), 100)
+
+    def test_complex_after_numbers(self):
+        rows = ["c"] + [str(i) for i in range(6)] + [f"{i}+1j" for i in range(6)]
+        self.assert_same_file("\n".join(rows).encode(), 6)
+
+    def test_negative_after_big_integers(self):
+        rows = ["u"] + [str(2**63 + 4096 * i) for i in range(6)] + ["-1"] * 6
+        data = "\n".join(rows).encode()
+        self.store("whole.csv", data, 1_000)
+        self.store("streamed.csv", data, 6)
+
+        pages = [
+            self.pages(file_id, "u")[0] for file_id in ("whole.csv", "streamed.csv")
+        ]
+        self.assertEqual(
+            [page["cols"]["u"]["col_type"] for page in pages], ["float64", "float64"]
+        )
+        # `read_csv` parses the numbers of the whole file as floats, less precisely
+        for whole, streamed in zip(*[page["rows"] for page in pages]):
+            self.assertEqual(whole["row_index"], streamed["row_index"])
+            self.assertAlmostEqual(
+                whole["values"]["u"] / streamed["values"]["u"], 1, places=12
+            )
+
+
+@override_settings(**{**TEST_SETTINGS, "PAGE_CACHE": "locmem"})
+class PageCacheTests(TestCase):
+    """The `get-data` pages kept by the page cache, and when they are forgotten."""
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def get(self, file_id: str, **query) -> Dict[str, Any]:
+        response = self.client.get(
+            "/api/get-data", {"file_id": file_id, "page_size": 10, **query}
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def counter(self, name: str) -> int:
+        return get_page_cache().stats()[name]
+
+    def test_file_being_ingested(self):
+        pages = []
+
+        def chunks():
+            yield pd.DataFrame({"a": [1, 2, 3]})
+            pages.append(self.get("ingest.csv"))
+            yield pd.DataFrame({"a": [4, 5]})
+
+        stores = self.counter("stores")
+        stream_data("ingest.csv", chunks(), {})
+
+        # The page of the first chunk is served but not kept
+        self.assertEqual(pages[0]["total_rows"], 3)
+        self.assertEqual(len(pages[0]["rows"]), 3)
+        self.assertEqual(self.counter("stores"), stores)
+
+        page = self.get("ingest.csv")
+        self.assertEqual(page["total_rows"], 5)
+        self.assertEqual(len(page["rows"]), 5)
+        self.assertEqual(self.counter("stores"), stores + 1)
+
+    def test_hits(self):
+        stream_data("hits.csv", iter([pd.DataFrame({"a": [3, 1, 2]})]), {})
+        hits, misses = self.counter("hits"), self.counter("misses")
+
+        page = self.get("hits.csv", sort_by="a")
+        self.assertEqual(self.get("hits.csv", sort_by="a"), page)
+        self.assertEqual(self.counter("hits"), hits + 1)
+        self.assertEqual(self.counter("misses"), misses + 1)
+
+        # Another sort is another page
+        self.get("hits.csv", sort_by="a", asc="false")
+        self.assertEqual(self.counter("misses"), misses + 2)
+
+    def test_deleted_file(self):
+        stream_data("deleted.csv", iter([pd.DataFrame({"a": [1, 2]})]), {})
+        self.get("deleted.csv")
+        self.client.delete("/api/delete-file?file_id=deleted.csv")
+
+        # A file stored again under the id is not served from its old pages
+        stream_data("deleted.csv", iter([pd.DataFrame({"a": [7, 8, 9]})]), {})
+        page = self.get("deleted.csv")
+        self.assertEqual([row["values"]["a"] for row in page["rows"]], [7, 8, 9])
+
+    def test_backends(self):
+        directory = TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        query = {
+            "file_id": "f.csv",
+            "sort_by": "row_index",
+            "asc": True,
+            "page": 0,
+            "page_size": 10,
+            "format": "rows",
+        }
+        other_page = {**query, "page": 1}
+        other_file = {**query, "file_id": "g.csv"}
+        response = {"rows": [{"row_index": np.int64(0), "values": {"a": 1.5}}]}
+
+        path = f"{directory.name}/pages.sqlite3"
+        for name, backend in PAGE_CACHES.items():
+            with self.subTest(backend=name), override_settings(PAGE_CACHE_PATH=path):
+                cache = backend(max_bytes=10_000)
+                self.assertIsNone(cache.get(query))
+                for page_query in [query, other_page, other_file]:
+                    cache.set(page_query, response)
+                self.assertEqual(cache.get(query), response)
+
+                cache.invalidate("f.csv")
+                self.assertIsNone(cache.get(query))
+                self.assertIsNone(cache.get(other_page))
+                self.assertEqual(cache.get(other_file), response)
+
+                # Bounded by the size of the pickled responses
+                size = cache.size()
+                cache.invalidate("g.csv")
+                small = backend(max_bytes=size * 2)
+                for page in range(3):
+                    small.set({**query, "page": page}, response)
+                self.assertIsNone(small.get(query))
+                self.assertEqual(small.get({**query, "page": 2}), response)
+                self.assertEqual(small.stats()["evictions"], 1)
+
+
+@override_settings(**TEST_SETTINGS)
+class SchemaRegistryTests(TestCase):
+    """The schemas kept by the registry, and how they find out they are stale."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.alias = self.upload()
+        self.file_id = get_schema(self.alias).file_id
+
+    def upload(self) -> str:
+        response = self.client.post(
+            "/api/process-file",
+            {"file": SimpleUploadedFile("schema.csv", b"a,b\n1,x\n2,y\n3,z\n")},
+            format="multipart",
+        )
+        return response.json()["file_id"]
+
+    def test_kept_schema(self):
+        schema = get_schema(self.alias)
+
+        # The alias and the version of the file, in a single lookup
+        with self.assertNumQueries(1):
+            self.assertIs(get_schema(self.alias), schema)
+
+    def test_warm_get_data(self):
+        query = {"file_id": self.alias, "page_size": 5, "sort_by": "b"}
+        page = self.client.get("/api/get-data", query).json()
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.get("/api/get-data", query).json(), page)
+        # Only the lookup of `is_current`, the columns are not read again
+        schema_queries = [
+            query["sql"]
+            for query in queries
+            if any(
+                table in query["sql"]
+                for table in ["api_table_col", "api_file_alias", "api_file_meta"]
+            )
+        ]
+        self.assertEqual(len(schema_queries), 1)
+        self.assertNotIn("api_table_col", schema_queries[0])
+
+    def test_bounded(self):
+        registry = SchemaRegistry(max_files=1)
+        other = self.client.post(
+            "/api/process-file",
+            {"file": SimpleUploadedFile("other.csv", b"c\n3\n")},
+            format="multipart",
+        ).json()["file_id"]
+
+        registry.get(self.alias)
+        registry.get(other)
+        self.assertEqual(list(registry.schemas), [other])
+
+    def test_file_being_ingested(self):
+        FileMeta.objects.filter(file_id=self.file_id).delete()
+        registry = SchemaRegistry(max_files=10)
+
+        self.assertEqual(registry.get(self.alias).file_id, self.file_id)
+        self.assertEqual(list(registry.schemas), [])
+
+    def test_changed_by_another_process(self):
+        schema = get_schema(self.alias)
+
+        # Moved to another engine without invalidating the schema of this process
+        TableCol.objects.filter(file_id=self.file_id).update(storage="typed")
+        FileMeta.objects.filter(file_id=self.file_id).update(version=F("version") + 1)
+
+        reloaded = get_schema(self.alias)
+        self.assertIsNot(reloaded, schema)
+        self.assertEqual(
+            {table_col.storage for table_col in reloaded.table_cols}, {"typed"}
+        )
+
+    def test_alias_deleted_by_another_process(self):
+        # A second upload of the same file, sharing it
+        alias = self.upload()
+        self.assertEqual(get_schema(alias).file_id, self.file_id)
+
+        FileAlias.objects.filter(alias=alias).delete()
+        self.assertIsNone(get_schema(alias))
+        self.assertIsNotNone(get_schema(self.alias))
+
+    def test_file_deleted_by_another_process(self):
+        self.assertIsNotNone(get_schema(self.alias))
+
+        FileMeta.objects.filter(file_id=self.file_id).delete()
+        TableCol.objects.filter(file_id=self.file_id).delete()
+        self.assertIsNone(get_schema(self.alias))
+
+
+@override_settings(**{**TEST_SETTINGS, "PAGE_CACHE": "locmem"})
+class ConvertStorageTests(TestCase):
+    """A file moved to another engine by `convert_storage` reads the same."""
+
+    def setUp(self):
+        self.client = APIClient()
+        rows = ["n,f,s"] + [f"{i % 7},{i / 4},word{i % 3}" for i in range(30)]
+        response = self.client.post(
+            "/api/process-file",
+            {"file": SimpleUploadedFile("convert.csv", "\n".join(rows).encode())},
+            format="multipart",
+        )
+        self.file_id = response.json()["file_id"]
+
+    def pages(self) -> List[Dict[str, Any]]:
+        return [
+            self.client.get(
+                "/api/get-data",
+                {
+                    "file_id": self.file_id,
+                    "page_size": 8,
+                    "page": 1,
+                    "sort_by": sort_by,
+                },
+            ).json()
+            for sort_by in ("row_index", "n", "f", "s")
+        ]
+
+    def test_convert(self):
+        pages = self.pages()
+        for storage in ("typed", "columnar", "rows"):
+            with self.subTest(storage=storage):
+                call_command(
+                    "convert_storage",
+                    storage,
+                    "--file-id",
+                    self.file_id,
+                    stdout=StringIO(),
+                )
+                self.assertEqual(
+                    set(
+                        TableCol.objects.filter(file_id=self.file_id).values_list(
+                            "storage", flat=True
+                        )
+                    ),
+                    {storage},
+                )
+
+                # The pages of the old engine are forgotten
+                hits = get_page_cache().stats()["hits"]
+                self.assertEqual(self.pages(), pages)
+                self.assertEqual(get_page_cache().stats()["hits"], hits)
+
+
+# The sheets are stored by other threads, which can not write to the in memory test
+# database while a `TestCase` holds it in a transaction, nor at the same time
+@override_settings(**TEST_SETTINGS, INGEST_CHUNK_ROWS=3, INGEST_SHEET_WORKERS=1)
+class WorkbookTests(TransactionTestCase):
+    """Every sheet of a workbook is streamed as its own file."""
+
+    def test_sheets(self):
+        workbook = Workbook()
+        first = workbook.active
+        first.title = "first"
+        words = ["a", "NA", "b", "c", "null", "d"]
+        for row in [("n", "word"), *enumerate(words)]:
+            first.append(row)
+        second = workbook.create_sheet("second")
+        for row in [("x",), (0.5,), (1.5,), (2.5,)]:
+            second.append(row)
+        content = BytesIO()
+        workbook.save(content)
+
+        file_ids = {"first": "book-first.xlsx", "second": "book-second.xlsx"}
+        stream_workbook(content.getvalue(), file_ids, {})
+
+        self.assertEqual(FileMeta.objects.get(file_id="book-first.xlsx").rows, 6)
+        self.assertEqual(FileMeta.objects.get(file_id="book-second.xlsx").rows, 3)
+        page = APIClient().get(
+            "/api/get-data", {"file_id": "book-first.xlsx", "page_size": 6}
+        )
+        words = [row["values"]["word"] for row in page.json()["rows"]]
+        self.assertEqual(words, ["a", None, "b", "c", None, "d"])
+
+
+@override_settings(**TEST_SETTINGS)
+class FileMetaTests(TestCase):
+    """The row count of a stored file is kept in its `FileMeta`, not counted."""
+
+    def setUp(self):
+        self.client = APIClient()
+        chunks = [pd.DataFrame({"x": [1, 2, 3], "y": ["a", "b", "c"]})] * 3
+        stream_data("meta.csv", iter(chunks), {})
+
+    def total_rows(self) -> int:
+        with CaptureQueriesContext(connection) as queries:
+            page = self.client.get(
+                "/api/get-data", {"file_id": "meta.csv", "page_size": 5}
+            ).json()
+        self.counted = any("COUNT(" in query["sql"].upper() for query in queries)
+        return page["total_rows"]
+
+    def test_stored_file(self):
+        file_meta = FileMeta.objects.get(file_id="meta.csv")
+        self.assertEqual((file_meta.rows, file_meta.columns), (9, 2))
+        self.assertGreater(file_meta.byte_size, 0)
+
+        self.assertEqual(self.total_rows(), 9)
+        self.assertFalse(self.counted)
+
+    def test_backfill(self):
+        expected = FileMeta.objects.get(file_id="meta.csv")
+        FileMeta.objects.all().delete()
+
+        # Files stored before `FileMeta` existed are counted, until backfilled
+        self.assertEqual(self.total_rows(), 9)
+        self.assertTrue(self.counted)
+
+        call_command("backfill_file_meta", stdout=StringIO())
+        file_meta = FileMeta.objects.get(file_id="meta.csv")
+        self.assertEqual(
+            (file_meta.rows, file_meta.columns, file_meta.byte_size),
+            (expected.rows, expected.columns, expected.byte_size),
+        )
+        self.assertEqual(self.total_rows(), 9)
+        self.assertFalse(self.counted)
+
+
+@override_settings(**TEST_SETTINGS)
+class RowCountTests(TestCase):
+    """Pages sorted by row read the amount of rows of stored files from their meta."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.df = pd.DataFrame({"x": [5, 3, 8, 1, 9], "y": list("abcde")})
+
+    def row_index_page(self, file_id: str) -> Dict[str, Any]:
+        """The last page of a file sorted by row, with the queries it ran."""
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                "/api/get-data",
+                {"file_id": file_id, "page_size": 2, "page": 2, "sort_by": "row_index"},
+            )
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json(), [query["sql"] for query in queries]
+
+    def test_stored_file(self):
+        for storage in ["rows", "typed"]:
+            with self.subTest(storage=storage):
+                file_id = f"{storage}.csv"
+                with override_settings(STORAGE_ENGINE=storage):
+                    stream_data(file_id, iter([self.df.copy()]), {})
+
+                page, queries = self.row_index_page(file_id)
+                self.assertEqual(page["total_rows"], 5)
+                self.assertEqual([row["values"]["x"] for row in page["rows"]], [9])
+                self.assertFalse([sql for sql in queries if "MAX(" in sql.upper()])
+
+    def test_file_being_ingested(self):
+        for storage in ["rows", "typed"]:
+            with self.subTest(storage=storage):
+                file_id = f"{storage}-ingesting.csv"
+                with override_settings(STORAGE_ENGINE=storage):
+                    stream_data(file_id, iter([self.df.copy()]), {})
+                FileMeta.objects.filter(file_id=file_id).delete()
+
+                page, queries = self.row_index_page(file_id)
+                self.assertEqual([row["values"]["x"] for row in page["rows"]], [9])
+                self.assertTrue([sql for sql in queries if "MAX(" in sql.upper()])
+
+
+@override_settings(**TEST_SETTINGS)
+class ResumableUploadTests(TestCase):
+    """A file sent in chunks, only accepted where the received bytes end."""
+
+    content = b"n,word\n" + b"".join(f"{i},w{i % 4}\n".encode() for i in range(30))
+
+    def setUp(self):
+        self.client = APIClient()
+        self.spool = TemporaryDirectory()
+        self.addCleanup(self.spool.cleanup)
+        self.settings_override = override_settings(INGEST_SPOOL_DIR=self.spool.name)
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+
+        # The job parsing the upload is run in the test, once the file is complete,
+        # as other threads can not write to the in memory test database
+        executor = mock.patch("api.ingestion.resumable.get_upload_executor")
+        self.submit = executor.start().return_value.submit
+        self.addCleanup(executor.stop)
+
+    def append(self, upload_id: str, offset: int, chunk: bytes) -> Any:
+        return self.client.post(
+            "/api/upload-append",
+            {
+                "upload_id": upload_id,
+                "offset": offset,
+                "chunk": SimpleUploadedFile("chunk", chunk),
+            },
+            format="multipart",
+        )
+
+    def status(self, upload_id: str) -> Dict[str, Any]:
+        return self.client.get("/api/upload-status", {"upload_id": upload_id}).json()
+
+    def test_upload(self):
+        response = self.client.post("/api/upload-init", {"file_name": "chunks.csv"})
+        self.assertEqual(response.status_code, 201)
+        upload = response.json()
+        upload_id = upload["upload_id"]
+        self.assertEqual(upload["offset"], 0)
+
+        first, second = self.content[:50], self.content[50:]
+        response = self.append(upload_id, 0, first)
+        self.assertEqual(response.json()["offset"], len(first))
+
+        # A chunk sent again, or past the end, is not appended
+        for offset in [0, len(self.content)]:
+            response = self.append(upload_id, offset, second)
+            self.assertEqual(response.status_code, 409)
+            self.assertEqual(response.json()["offset"], len(first))
+        self.assertEqual(
+            self.status(upload_id),
+            {"upload_id": upload_id, "offset": len(first), "finalized": False},
+        )
+
+        response = self.append(upload_id, len(first), second)
+        self.assertEqual(response.json()["offset"], len(self.content))
+
+        finalize = {"upload_id": upload_id, "size": len(self.content) + 1}
+        response = self.client.post("/api/upload-finalize", finalize)
+        self.assertEqual(response.status_code, 400)
+
+        finalize["size"] = len(self.content)
+        response = self.client.post("/api/upload-finalize", finalize)
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(
+            response.json(), {"file_id": upload["file_id"], "job_id": upload["job_id"]}
+        )
+        self.assertTrue(self.status(upload_id)["finalized"])
+
+        # Append is refused once finalized
+        response = self.append(upload_id, len(self.content), b"31,w3\n")
+        self.assertEqual(response.status_code, 400)
+
+        run, *job_args = self.submit.call_args.args
+        run(*job_args, **self.submit.call_args.kwargs)
+        job = self.client.get("/api/job-status", {"job_id": upload["job_id"]}).json()
+        self.assertEqual((job["state"], job["rows_ingested"]), (IngestJob.DONE, 30))
+
+        page = self.client.get(
+            "/api/get-data", {"file_id": upload["file_id"], "page_size": 2, "page": 1}
+        ).json()
+        self.assertEqual(page["total_rows"], 30)
+        self.assertEqual(
+            [row["values"] for row in page["rows"]],
+            [{"n": 2, "word": "w2"}, {"n": 3, "word": "w3"}],
+        )
+
+
+@override_settings(**TEST_SETTINGS)
+class OrphanedJobTests(TestCase):
+    """The jobs left behind by a stopped process are failed by `clean_uploads`."""
+
+    def setUp(self):
+        self.spool = TemporaryDirectory()
+        self.addCleanup(self.spool.cleanup)
+        self.settings_override = override_settings(INGEST_SPOOL_DIR=self.spool.name)
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+
+    def job(self, job_id: str, state: str, hours_ago: int) -> Path:
+        """A job with a partly stored file and its spooled upload, returning the upload."""
+
+        file_id = f"{job_id}.csv"
+        stream_data(file_id, iter([pd.DataFrame({"x": [1, 2, 3]})]), {})
+        job = IngestJob.objects.create(job_id=job_id, file_id=file_id, state=state)
+        IngestJob.objects.filter(id=job.id).update(
+            updated_at=timezone.now() - timedelta(hours=hours_ago)
+        )
+
+        path = Path(self.spool.name) / file_id
+        path.write_bytes(b"x\n1\n2\n3\n4\n")
+        return path
+
+    def clean(self, *args: str) -> None:
+        call_command("clean_uploads", *args, stdout=StringIO())
+
+    def assert_failed(self, job_id: str, path: Path) -> None:
+        self.assertEqual(IngestJob.objects.get(job_id=job_id).state, IngestJob.FAILED)
+        self.assertFalse(path.exists())
+        self.assertFalse(TableCol.objects.filter(file_id=f"{job_id}.csv").exists())
+
+    def test_stale_jobs(self):
+        queued = self.job("queued", IngestJob.QUEUED, 5)
+        running = self.job("running", IngestJob.RUNNING, 5)
+        recent = self.job("recent", IngestJob.RUNNING, 0)
+        done = self.job("done", IngestJob.DONE, 5)
+        self.clean()
+
+        self.assert_failed("queued", queued)
+        self.assert_failed("running", running)
+        for job_id, path in [("recent", recent), ("done", done)]:
+            self.assertNotEqual(
+                IngestJob.objects.get(job_id=job_id).state, IngestJob.FAILED
+            )
+            self.assertTrue(path.exists())
+            self.assertTrue(TableCol.objects.filter(file_id=f"{job_id}.csv").exists())
+
+    def test_startup(self):
+        recent = self.job("recent", IngestJob.RUNNING, 0)
+        self.clean("--startup")
+        self.assert_failed("recent", recent)
+
+    def test_failed_while_queued(self):
+        # A job still in the queue of a running process when it was failed
+        path = self.job("late", IngestJob.QUEUED, 0)
+        self.clean("--startup")
+        run_job("late", "late.csv", path, "csv", {})
+
+        job = IngestJob.objects.get(job_id="late")
+        self.assertEqual(job.state, IngestJob.FAILED)
+        self.assertEqual(job.failure, "the ingestion was interrupted")
+        self.assertFalse(TableCol.objects.filter(file_id="late.csv").exists())
+
+
+@override_settings(**TEST_SETTINGS, STORAGE_ENGINE="typed")
+class TypedEngineTests(TestCase):
+    """The typed engine keeps each column in the narrow table of its dtype."""
+
+    def test_tables(self):
+        df = pd.DataFrame(
+            {
+                "flag": [True, False, True],
+                "count": np.array([3, 1, 2], dtype=np.int16),
+                "ratio": np.array([0.5, -1.25, 3.0], dtype=np.float32),
+                "name": ["b", "a", "c"],
+                "wave": np.array([1 + 2j, -3j, 0j]),
+                "day": pd.to_datetime(["2000-01-02", "1999-12-31", "2021-05-05"]),
+                "wait": pd.to_timedelta(["-1 day", "2 s", "5 min"]),
+            }
+        )
+        stream_data("typed.csv", iter([df.copy()]), {})
+
+        table_cols = list(TableCol.objects.filter(file_id="typed.csv"))
+        self.assertEqual({table_col.storage for table_col in table_cols}, {"typed"})
+        self.assertFalse(GenericData.objects.exists())
+
+        tables = {
+            BoolCell: ["flag"],
+            IntegerCell: ["count", "wait"],
+            FloatCell: ["ratio"],
+            StringCell: ["name"],
+            ComplexCell: ["wave"],
+            DatetimeCell: ["day"],
+        }
+        for model, col_names in tables.items():
+            stored = model.objects.values_list("column__col_name", flat=True)
+            self.assertEqual(sorted(stored), sorted(col_names * 3))
+
+        table_cols.sort(key=lambda table_col: table_col.col_index)
+        stored = STORAGE_ENGINES["typed"].read_columns(table_cols, 0, 3)
+        pd.testing.assert_frame_equal(stored, df)
+
+    def test_integers_past_int64(self):
+        with self.assertRaises(ValueError):
+            encode_typed_column(pd.Series([2**63], dtype=np.uint64), "uint64")
+
+        fitting = pd.Series([2**63 - 1], dtype=np.uint64)
+        self.assertEqual(encode_typed_column(fitting, "uint64"), {"value": [2**63 - 1]})
+
+
+@override_settings(**TEST_SETTINGS)
+class ColumnCacheTests(TestCase):
+    """Pages of cached files are read from the memory mapped columns."""
+
+    content = b"n,word,ratio\n" + b"".join(
+        f"{i},w{i % 5}x{i},{i / 8}\n".encode() for i in range(25)
+    )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.directory = TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.settings_override = override_settings(
+            COLUMN_CACHE=True, COLUMN_CACHE_DIR=self.directory.name
+        )
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+
+    def store(self, file_id: str) -> None:
+        stream_data(file_id, read_chunks(BytesIO(self.content), "csv", 10), {})
+
+    def page(self, file_id: str, sort_by: str) -> Dict[str, Any]:
+        with CaptureQueriesContext(connection) as queries:
+            page = self.client.get(
+                "/api/get-data",
+                {"file_id": file_id, "page_size": 4, "page": 2, "sort_by": sort_by},
+            ).json()
+        self.cell_queries = [
+            query["sql"] for query in queries if "api_generic_data" in query["sql"]
+        ]
+        return page
+
+    def test_cached_pages(self):
+        self.store("cached.csv")
+        cache = ColumnCache.open("cached.csv")
+        self.assertEqual(cache.meta["rows"], 25)
+        values, nulls = cache.take(0, np.array([24, 3, 10]))
+        self.assertEqual(values.tolist(), [24, 3, 10])
+        self.assertFalse(nulls.any())
+
+        cached = {}
+        for sort_by in ["row_index", "n", "word", "ratio"]:
+            cached[sort_by] = self.page("cached.csv", sort_by)
+            self.assertEqual(self.cell_queries, [])
+
+        # The same pages from the cells, before the cache is built again
+        with override_settings(COLUMN_CACHE=False):
+            for sort_by, page in cached.items():
+                self.assertEqual(self.page("cached.csv", sort_by), page)
+
+        self.client.delete("/api/delete-file?file_id=cached.csv")
+        self.assertFalse(cache_dir("cached.csv").exists())
+
+    def test_build(self):
+        with override_settings(COLUMN_CACHE=False):
+            self.store("built.csv")
+        self.assertIsNone(ColumnCache.open("built.csv"))
+        expected = self.page("built.csv", "word")
+        self.assertTrue(self.cell_queries)
+
+        call_command("build_column_cache", stdout=StringIO())
+        self.assertEqual(ColumnCache.open("built.csv").meta["rows"], 25)
+        self.assertEqual(self.page("built.csv", "word"), expected)
+        self.assertEqual(self.cell_queries, [])
+
+
+class EngineParityTests(TestCase):
+    """Every storage engine, and the column cache, return the same pages of a file."""
+
+    engines = ["rows", "typed", "columnar"]
+
+    def setUp(self):
+        self.client = APIClient()
+        # The columnar engine and the column cache write files, kept out of the project
+        self.directory = TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.settings_override = override_settings(
+            COLUMN_STORE_DIR=f"{self.directory.name}/store",
+            COLUMN_CACHE_DIR=f"{self.directory.name}/cache",
+            PAGE_CACHE="off",
+        )
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+
+        self.df = pd.DataFrame(
+            {
+                "flag": [True, False, True, True, False, False, True],
+                "count": np.array([3, 1, 2, 3, 0, 7, 1], dtype=np.uint8),
+                "delta": np.array([-5, 4, 0, 9, -5, 2, 1], dtype=np.int64),
+                "ratio": [0.5, -1.25, 3.0, 0.0, 2.0, 0.5, -7.5],
+                "name": ["b", "a", "c", "a", "d", "e", "f"],
+                "wave": np.array([1 + 2j, -3j, 0j, 2.5, 1j, 4, -1], dtype=complex),
+                "day": pd.to_datetime(
+                    ["2000-01-02", "1999-12-31", "2021-05-05", "2000-01-01"] * 2
+                )[:7],
+                "wait": pd.to_timedelta(["1 day", "2 s", "5 min", "0 s"] * 2)[:7],
+            }
+        )
+
+    def store(self, storage: str, column_cache: bool) -> str:
+        file_id = f"{storage}-{column_cache}.csv"
+        with override_settings(STORAGE_ENGINE=storage, COLUMN_CACHE=column_cache):
+            stream_data(file_id, iter([self.df.copy()]), {})
+        return file_id
+
+    def pages(self, file_id: str) -> List[Dict[str, Any]]:
+        pages = []
+        for sort_by in ["row_index", *self.df.columns]:
+            for asc in ("true", "false"):
+                response = self.client.get(
+                    "/api/get-data",
+                    {
+                        "file_id": file_id,
+                        "page_size": 4,
+                        "page": 1,
+                        "sort_by": sort_by,
+                        "asc": asc,
+                    },
+                )
+                self.assertEqual(response.status_code, 200, response.content)
+                page = response.json()
+                for col in page["cols"].values():
+                    # Each engine stores its columns in its own tables
+                    col.pop("storage", None)
+                pages.append(page)
+        return pages
+
+    def test_same_pages(self):
+        expected = self.pages(self.store("rows", False))
+        for storage in self.engines:
+            for column_cache in (False, True):
+                with self.subTest(storage=storage, column_cache=column_cache):
+                    file_id = self.store(storage, column_cache)
+                    self.assertEqual(self.pages(file_id), expected)
+
+
+@override_settings(**TEST_SETTINGS)
+class NumpyJSONRendererTests(TestCase):
+    """`NumpyJSONRenderer` renders the same bytes as `JSONRenderer`."""
+
+    def assert_same_bytes(self, data: Any) -> None:
+        self.assertEqual(
+            NumpyJSONRenderer().render(data), JSONRenderer().render(data), data
+        )
+
+    def test_pages(self):
+        day = pd.Timestamp("2000-01-02 03:04:05.123456").to_pydatetime()
+        aware = pd.Timestamp("2000-01-02 03:04:05", tz="UTC").to_pydatetime()
+        values = {
+            "uint": [np.uint8(3), np.uint8(250)],
+            "int": [np.int64(-5), np.int64(2**62)],
+            "float": [np.float32(0.1), np.float64(1e300)],
+            "bool": [np.True_, np.False_],
+            "mixed": [np.int16(1), None],
+            "text": ["a", None],
+            "day": [day, None],
+            "aware": [aware, day],
+        }
+        cols = {name: {"col_type": "object"} for name in values}
+        row_index = [np.int64(0), np.int64(1)]
+        rows = [
+            {
+                "row_index": row,
+                "values": {name: column[row] for name, column in values.items()},
+            }
+            for row in range(2)
+        ]
+
+        self.assert_same_bytes({"cols": cols, "rows": rows, "total_rows": 2})
+        self.assert_same_bytes({"cols": cols, "rows": [], "total_rows": 0})
+        self.assert_same_bytes(
+            {"cols": cols, "row_index": row_index, "values": values, "total_rows": 2}
+        )
+        self.assert_same_bytes(
+            {
+                "row_index": np.arange(2),
+                "values": {"x": np.array([0.5, 1.5])},
+                "total_rows": 2,
+            }
+        )
+        self.assert_same_bytes({"error": "file not found"})
+
+    def test_not_a_number(self):
+        page = {"rows": [{"row_index": 0, "values": {"x": np.float64("nan")}}]}
+        for renderer in [JSONRenderer(), NumpyJSONRenderer()]:
+            with self.assertRaises(ValueError):
+                renderer.render(page)
+
+    def test_get_data(self):
+        df = pd.DataFrame(
+            {
+                "n": np.array([3, 1, 2], dtype=np.uint16),
+                "ratio": [0.5, -1.25, 3.0],
+                "day": pd.to_datetime(["2000-01-02", "1999-12-31", "2021-05-05"]),
+            }
+        )
+        # The columnar engine reads pages as `numpy` arrays
+        directory = TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings_override = override_settings(
+            STORAGE_ENGINE="columnar", COLUMN_STORE_DIR=directory.name
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        stream_data("numpy.csv", iter([df]), {})
+        client = APIClient()
+        for data_format in ["rows", "columnar"]:
+            query = {"file_id": "numpy.csv", "page_size": 3, "format": data_format}
+            fast = client.get(
+                "/api/get-data", query, HTTP_ACCEPT=NumpyJSONRenderer.media_type
+            )
+            self.assertEqual(fast["Content-Type"], NumpyJSONRenderer.media_type)
+            self.assertEqual(fast.content, client.get("/api/get-data", query).content)
+
+
+@override_settings(**TEST_SETTINGS)
+class BinaryRendererTests(TestCase):
+    """The binary renderers send the same page as the JSON of `get-data`."""
+
+    def setUp(self):
+        self.client = APIClient()
+        df = pd.DataFrame(
+            {
+                "flag": [True, False, True],
+                "count": np.array([3, 1, 2], dtype=np.uint8),
+                "ratio": [0.5, -1.25, 3.0],
+                "name": ["b", "a", "c"],
+                "day": pd.to_datetime(["2000-01-02", "1999-12-31", "2021-05-05"]),
+            }
+        )
+        stream_data("binary.csv", iter([df]), {})
+
+    def get(self, **headers: str) -> Any:
+        response = self.client.get(
+            "/api/get-data",
+            {"file_id": "binary.csv", "page_size": 3, "sort_by": "ratio"},
+            **headers,
+        )
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    @skipUnless(find_spec("msgpack"), "msgpack is not installed")
+    def test_msgpack(self):
+        import msgpack
+
+        response = self.get(HTTP_ACCEPT="application/msgpack")
+        self.assertEqual(response["Content-Type"], "application/msgpack")
+        self.assertEqual(msgpack.unpackb(response.content), self.get().json())
+
+    @skipUnless(find_spec("pyarrow"), "pyarrow is not installed")
+    def test_arrow(self):
+        import pyarrow as pa
+
+        response = self.get(HTTP_ACCEPT="application/vnd.apache.arrow.stream")
+        batch = pa.ipc.open_stream(response.content).read_next_batch()
+        expected = self.get().json()
+
+        rows = expected.pop("rows")
+        self.assertEqual(json.loads(batch.schema.metadata[b"response"]), expected)
+        self.assertEqual(
+            batch.column("row_index").to_pylist(), [row["row_index"] for row in rows]
+        )
+        for col_name in ["flag", "count", "ratio", "name"]:
+            self.assertEqual(
+                batch.column(col_name).to_pylist(),
+                [row["values"][col_name] for row in rows],
+            )
+        self.assertEqual(
+            [day.isoformat() for day in batch.column("day").to_pylist()],
+            [row["values"]["day"].replace("Z", "+00:00") for row in rows],
+        )
@@ -2,7 +2,17 @@ from django.urls import path
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 
-from .views import get_data, process_file
+from .views import (
+    delete_file,
+    get_data,
+    job_status,
+    page_cache_stats,
+    process_file,
+    upload_append,
+    upload_finalize,
+    upload_init,
+    upload_status,
+)
 
 
 @api_view(["GET"])
@@ -12,6 +22,13 @@ def hello(req):
 
 urlpatterns = [
     path("process-file", process_file, name="Process File"),
+    path("job-status", job_status, name="Job Status"),
+    path("upload-init", upload_init, name="Upload Init"),
+    path("upload-append", upload_append, name="Upload Append"),
+    path("upload-status", upload_status, name="Upload Status"),
+    path("upload-finalize", upload_finalize, name="Upload Finalize"),
     path("get-data", get_data, name="Get Data"),
+    path("delete-file", delete_file, name="Delete File"),
+    path("page-cache", page_cache_stats, name="Page Cache"),
     path("", hello, name="hello"),
 ]
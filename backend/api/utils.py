@@ -1,29 +1,103 @@
 import time
-from typing import Dict, List, Tuple
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import uuid4
 
 import pandas as pd
 from django.core.exceptions import ValidationError
 from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.request import Request
 from rest_framework.response import Response
 
-from .models.generic_data_model import GenericData
+from .models.file_meta_model import FileMeta
 from .models.table_col_model import TableCol
+from .scripts.datetime_formats import get_datetime_formats
 from .serializers.generic_data_serializer import GenericDataSerializer
+from .serializers.get_data_serializer import CursorField
 from .serializers.table_col_serializer import TableColSerializer
+from .storage.base import StorageEngine
+from .storage.column_cache import ColumnCacheWriter
+from .storage.engines import get_engine
+from .storage.page_cache import invalidate_pages
+from .storage.schema_registry import invalidate_schema
 
 
 def get_force_casting(req: Request) -> Dict[str, str]:
     force_casting: Dict[str, str] = {}
     for key, value in req.data.items():
-        if key != "file":
+        if key.startswith("cast-col-"):
             column = key[len("cast-col-") :]
             force_casting[column] = value
 
     return force_casting
 
 
+def check_file_name(file_name: str) -> Optional[str]:
+    """
+    Checks that an uploaded file has a single extension and that it is supported.
+
+    Args:
+        file_name (str): The name of the file, with its extension.
+
+    Returns:
+        Optional[str]: Why the name is not valid, None if it is.
+    """
+
+    # Ensure file has correct naming
+    if file_name.count(".") != 1:
+        return "Incorrect file name"
+
+    # Ensure file has a correct extension
+    extension = file_name.split(".")[1]
+    if extension not in ["csv", "xlsx"]:
+        return f"Extension '.{extension}' not supported"
+
+    return None
+
+
+def generate_file_id(name: str, extension: str) -> str:
+    """
+    Creates a unique identifier for an uploaded file from its name.
+    The timestamp keeps ids sortable by upload time and the random suffix keeps them
+    unique when many files with the same name arrive at the same time.
+
+    Args:
+        name (str): The name of the file without its extension.
+        extension (str): The extension of the file.
+
+    Returns:
+        file_id (str): The id, short enough for the `file_id` of `TableCol`.
+    """
+
+    suffix = f"-{int(time.time() * 100)}-{uuid4().hex[:8]}.{extension}"
+    max_length = TableCol._meta.get_field("file_id").max_length
+    return f"{name[: max_length - len(suffix)]}{suffix}"
+
+
+def generate_sheet_file_ids(
+    name: str, extension: str, sheets: List[str]
+) -> Dict[str, str]:
+    """
+    Creates the ids of the sheets of an uploaded workbook, each sheet is stored as its own file.
+    A workbook with a single sheet keeps the id it would have as a file.
+
+    Args:
+        name (str): The name of the file without its extension.
+        extension (str): The extension of the file.
+        sheets (List[str]): The names of the sheets.
+
+    Returns:
+        file_ids (Dict[str, str]): The id of each sheet, by name.
+    """
+
+    if len(sheets) == 1:
+        return {sheets[0]: generate_file_id(name, extension)}
+
+    return {sheet: generate_file_id(f"{name}-{sheet}", extension) for sheet in sheets}
+
+
 def timer(func):
     def wrapper(*args, **kwargs):
         start_time = time.time()
@@ -49,32 +123,195 @@ def error400(message: str) -> Response:
     return Response({"error": message}, status=status.HTTP_400_BAD_REQUEST)
 
 
+def stored_response(
+    file_ids: Dict[Optional[str], str], errors: Dict[Optional[str], Dict[str, str]]
+) -> Response:
+    """A function to return the response of a stored upload.
+
+    Args:
+        file_ids (Dict[Optional[str], str]): The id of each sheet by name, or of the whole file under None.
+        errors (Dict[Optional[str], Dict[str, str]]): The force casting errors, like `file_ids`.
+
+    Returns:
+        response (Response): The response with the file_id and errors of the file or first sheet,
+            and for workbooks, the ones of every sheet under "sheets".
+    """
+
+    first_sheet = next(iter(file_ids))
+    response = {"file_id": file_ids[first_sheet], "errors": errors[first_sheet]}
+    if first_sheet is not None:
+        response["sheets"] = {
+            sheet: {"file_id": file_ids[sheet], "errors": errors[sheet]}
+            for sheet in file_ids
+        }
+
+    return Response(response)
+
+
+def page_cursors(
+    source: StorageEngine,
+    cols: Dict[str, Dict[str, Any]],
+    request_query: Dict[str, Any],
+    rows: List[Dict[str, Any]],
+) -> Dict[str, Optional[str]]:
+    """
+    The cursors of the pages next to a page read with a cursor, see `CursorField`.
+
+    Args:
+        source (StorageEngine): The storage engine, or column cache, the page was read from.
+        cols (Dict[str, Dict[str, Any]]): The serialized columns of the file, by name.
+        request_query (Dict[str, Any]): The validated query parameters of the request.
+        rows (List[Dict[str, Any]]): The rows of the page.
+
+    Returns:
+        cursors (Dict[str, Optional[str]]): The `next_cursor` and `prev_cursor`,
+            `None` when there is no page there.
+    """
+
+    sort_by: str = request_query["sort_by"]
+    asc: bool = request_query["asc"]
+    cursor: Dict[str, Any] = request_query["cursor"]
+    if not rows:
+        return {"next_cursor": None, "prev_cursor": None}
+
+    edges = [rows[0]["row_index"], rows[-1]["row_index"]]
+    keys = [None, None]
+    if sort_by != "row_index":
+        keys = source.sort_keys(request_query["file_id"], cols[sort_by], edges)
+
+    # A short page is the last one, or the first one when reading backwards
+    full = len(rows) == request_query["page_size"]
+    first = cursor["row"] is None or (cursor["before"] and not full)
+    last = not cursor["before"] and not full
+
+    return {
+        "next_cursor": (
+            None if last else CursorField.encode(sort_by, asc, keys[1], edges[1], False)
+        ),
+        "prev_cursor": (
+            None if first else CursorField.encode(sort_by, asc, keys[0], edges[0], True)
+        ),
+    }
+
+
+def columnar_rows(
+    rows: List[Dict[str, Any]], col_names: List[str]
+) -> Tuple[List[int], Dict[str, List[Any]]]:
+    """
+    Turns the rows of a page into columns, the `columnar` format of `get-data`,
+    so the name of every column is only sent once.
+
+    Args:
+        rows (List[Dict[str, Any]]): The rows of the page, each one with its
+            `row_index` and its `values` by column name.
+        col_names (List[str]): The names of the columns of the file, in order.
+
+    Returns:
+        Tuple: A tuple containing:
+            - row_index (List[int]): The row index of every row of the page.
+            - values (Dict[str, List[Any]]): The values of every column, in row order.
+    """
+
+    row_index = [row["row_index"] for row in rows]
+    values = {
+        col_name: [row["values"][col_name] for row in rows] for col_name in col_names
+    }
+    return row_index, values
+
+
 @timer
 # VERY VERY HEAVY FUNCTION, around .7 ms for data.
 def validate(data):
     GenericDataSerializer(None, data=data).is_valid(raise_exception=True)
 
 
-# All the keys of the GenericData model to represent data.
-ALL_KEYS = {
-    "string_value",
-    "int_sign_value",
-    "uint_value",
-    "double_value",
-    "double_imag_value",
-    "datetime_value",
-    "time_zone_info_value",
-    "bool_value",
-}
+def create_table_cols(
+    file_id: str, df: pd.DataFrame, storage: str = "rows"
+) -> List[TableCol]:
+    """
+    Creates the `TableCol` of every column in the DataFrame.
+
+    Args:
+        file_id (str): The pregenerated id of the file.
+        df (DataFrame): The (already converted) DataFrame whose columns we describe,
+            with the formats of its datetime columns in `get_datetime_formats`.
+        storage (str): The name of the storage engine of the cells, see `TableCol.STORAGES`.
+
+    Raises:
+        ValidationError: When a column is not valid for the `TableColSerializer`.
+
+    Returns:
+        table_cols (List[TableCol]): The list of all created columns, ordered as in the DataFrame.
+    """
+
+    datetime_formats = get_datetime_formats(df)
+    table_cols: List[TableCol] = []
+    for col_index, col in enumerate(df.columns):
+        table_col_serializer = TableColSerializer(
+            data={
+                "file_id": file_id,
+                "col_name": col,
+                "col_type": df[col].dtype,
+                "col_index": col_index,
+                "datetime_format": datetime_formats.get(col),
+                "storage": storage,
+            }
+        )
+
+        # Check that the col has been created correctly
+        table_col_serializer.is_valid(raise_exception=True)
+        table_col = table_col_serializer.save()
+        table_cols.append(table_col)
+
+    return table_cols
+
+
+def frame_bytes(df: pd.DataFrame) -> int:
+    """The memory of the cells of a DataFrame, the `byte_size` of its `FileMeta`."""
+    return int(df.memory_usage(deep=True, index=False).sum())
+
+
+def save_file_meta(file_id: str, rows: int, columns: int, byte_size: int) -> FileMeta:
+    """
+    Writes the `FileMeta` of a file once it is ingested, replacing the one of a
+    previous ingest of the same `file_id` and bumping its `version`.
+
+    Args:
+        file_id (str): The id of the file.
+        rows (int): The amount of rows of the file.
+        columns (int): The amount of columns of the file.
+        byte_size (int): The memory of the converted data of the file.
+
+    Returns:
+        file_meta (FileMeta): The saved metadata.
+    """
+
+    fields = {
+        "rows": rows,
+        "columns": columns,
+        "byte_size": byte_size,
+        "ingested_at": timezone.now(),
+    }
+    file_meta, created = FileMeta.objects.update_or_create(
+        file_id=file_id,
+        defaults={**fields, "version": F("version") + 1},
+        create_defaults=fields,
+    )
+    if not created:
+        file_meta.refresh_from_db(fields=["version"])
+
+    # A schema loaded while the file was ingested has no metadata
+    invalidate_schema(file_id)
+    return file_meta
 
 
 @transaction.atomic
 @timer
-def create_data(
-    file_id: str, df: pd.DataFrame
-) -> Tuple[List[GenericData], List[TableCol]]:
+def create_data(file_id: str, df: pd.DataFrame) -> Tuple[int, List[TableCol]]:
     """
     An atomic operation to create all data in the database to represent the file.
+    The cells are stored by the `STORAGE_ENGINE` of new files, and also written to the column cache.
+    The `FileMeta` of the file is written with them.
 
     Args:
         file_id (str): The pregenerated id of the file.
@@ -85,65 +322,23 @@ def create_data(
 
     Returns:
         Tuple: A tuple containing:
-            - generic_data (List[GenericData]): The list of all created data from the file cells.
+            - created (int): The amount of created cells.
             - table_cols (List[TableCol]): The list of all created columns.
     """
+    engine = get_engine()
+    table_cols: List[TableCol] = []
     try:
-        generic_data: List[GenericData] = []
-        table_cols: List[TableCol] = []
-        for col_index, col in enumerate(df.columns):
-            table_col_serializer = TableColSerializer(
-                data={
-                    "file_id": file_id,
-                    "col_name": col,
-                    "col_type": df[col].dtype,
-                    "col_index": col_index,
-                }
-            )
-
-            # Check that the col has been created correctly
-            table_col_serializer.is_valid(raise_exception=True)
-            table_col = table_col_serializer.save()
-            table_cols.append(table_col)
-
-            for row_index, value in enumerate(df[col]):
-
-                data = {
-                    "column": table_col.id,
-                    "row": row_index,
-                    **{key: None for key in ALL_KEYS},
-                }
-
-                dtype: str = table_col.col_type
-                if dtype == "object":
-                    data["string_value"] = value
-                elif dtype.startswith("uint"):
-                    data["uint_value"] = value
-                elif dtype.startswith("int"):
-                    data["uint_value"] = abs(value)
-                    data["int_sign_value"] = 1 if value >= 0 else -1
-                elif dtype.startswith("float"):
-                    data["double_value"] = value
-                elif dtype.startswith("complex"):
-                    value: complex
-                    data["double_value"] = value.real
-                    data["double_imag_value"] = value.imag
-                elif dtype == "datetime64[ns]":
-                    data["datetime_value"] = value
-                elif dtype == "category":
-                    value: str
-                    data["string_value"] = value
-                elif dtype == "timedelta64[ns]":
-                    value: pd.Timedelta
-                    data["uint_value"] = value.value
-
-                # validate(data)  # Too time expensive function
-
-                data["column"] = table_col
-                generic_data.append(GenericData(**data))
-
-        generic_data = GenericData.objects.bulk_create(generic_data)
-        return generic_data, table_cols
+        table_cols = create_table_cols(file_id, df, engine.name)
+        with engine.writer() as writer, ColumnCacheWriter(file_id) as cache:
+            created = writer.write(table_cols, df)
+            cache.write(table_cols, df)
+        save_file_meta(file_id, len(df), len(table_cols), frame_bytes(df))
+
+        # A file id may be ingested again, after a failed or deleted upload
+        invalidate_pages(file_id)
+        return created, table_cols
 
     except Exception as e:
+        # The columns are rolled back, but not what the engine stored outside the database
+        engine.clear(table_cols)
         raise ValidationError(f"Failed to create data. {str(e)}")
@@ -1,20 +1,60 @@
 from io import BytesIO
-from time import time
+from pathlib import Path
+from typing import Dict
+from zipfile import BadZipFile
 
 import pandas as pd
-from django.core.files.uploadedfile import InMemoryUploadedFile
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import UploadedFile
 from django.db.models import Case, When
-from rest_framework.decorators import api_view
+from openpyxl.utils.exceptions import InvalidFileException
+from rest_framework import status
+from rest_framework.decorators import api_view, renderer_classes
 from rest_framework.request import Request
 from rest_framework.response import Response
-
-from .models.generic_data_model import GenericData
-from .models.table_col_model import TableCol
+from rest_framework.settings import api_settings
+
+from .ingestion.dedup import (
+    claim_duplicate,
+    register_upload,
+    release_file,
+    upload_digest,
+)
+from .ingestion.jobs import start_jobs
+from .ingestion.resumable import (
+    OffsetMismatch,
+    SpooledUpload,
+    append_chunk,
+    finalize_upload,
+    received_bytes,
+    start_upload,
+)
+from .ingestion.streaming import read_chunks, stream_data, stream_workbook
+from .ingestion.xlsx import list_sheets
+from .models.chunked_upload_model import ChunkedUpload
+from .models.ingest_job_model import IngestJob
+from .renderers import NumpyJSONRenderer, binary_renderers
 from .scripts.infer_data_types import infer_and_convert_data_types
-from .serializers.generic_data_serializer import GenericDataSerializer
 from .serializers.get_data_serializer import GetDataSerializer
-from .serializers.table_col_serializer import TableColSerializer
-from .utils import create_data, error400, get_force_casting
+from .serializers.ingest_job_serializer import IngestJobSerializer
+from .storage.column_cache import ColumnCache
+from .storage.engines import file_engine
+from .storage.page_cache import get_page_cache
+from .utils import (
+    check_file_name,
+    columnar_rows,
+    create_data,
+    error400,
+    generate_file_id,
+    generate_sheet_file_ids,
+    get_force_casting,
+    page_cursors,
+    stored_response,
+)
+
+# The ways a file can be ingested, waiting for it or in the background
+MODES = ["sync", "job"]
 
 
 @api_view(["POST"])
@@ -26,51 +66,160 @@ def process_file(req: Request) -> Response:
             The request object from the user.
             It should contain the header "Content-Type": "multipart/form-data"
             where we can find "file" and "cast-col-*" fields.
+            Files that Django spools to disk are streamed chunk by chunk.
+            An optional "mode" field set to "job" ingests the file in the background.
+            Every sheet of a `.xlsx` workbook is stored as its own file, in parallel.
+            A file already uploaded with the same "cast-col-*" fields is not stored again.
 
     Returns:
-        Response: A json response containing the file_id and errors from the force casting process.
+        Response:
+            A json response containing the file_id and errors from the force casting process.
+            In "job" mode it is returned right away with the file_id and a job_id instead,
+            the errors can later be found in `job-status`.
+            For workbooks those are the ones of the first sheet, and "sheets" has the
+            ones of every sheet by name.
+            An identical upload gets the files already stored, in any mode.
     """
 
     # Get the file from the request
     file = req.FILES.get("file")
 
     # Ensure file exists
-    if type(file) != InMemoryUploadedFile:
+    if not isinstance(file, UploadedFile):
         return error400("no file uploaded")
 
-    # Ensure file has correct naming
-    if file.name.count(".") != 1:
-        return error400("Incorrect file name")
+    # Ensure file has a correct name and extension
+    file_name_error = check_file_name(file.name)
+    if file_name_error is not None:
+        return error400(file_name_error)
+
+    # Ensure the mode is valid
+    mode = req.data.get("mode", "sync")
+    if mode not in MODES:
+        return error400(f"Mode '{mode}' not supported")
+
+    return ingest_file(file, mode, get_force_casting(req))
+
+
+def ingest_file(
+    file: UploadedFile, mode: str, force_casting: Dict[str, str]
+) -> Response:
+    """Infers, converts and stores a validated upload, see `process_file`.
+
+    Args:
+        file (UploadedFile): The uploaded file, with a valid name.
+        mode (str): Either "sync" or "job".
+        force_casting (Dict[str, str]): The dictionary of force casting options.
+
+    Returns:
+        Response: The response of `process_file`.
+    """
 
-    # Ensure file has a correct extension
     name, extension = file.name.split(".")
-    if extension not in ["csv", "xlsx"]:
-        return error400(f"Extension '.{extension}' not supported")
 
-    # Create the pandas dataframe
-    readable = BytesIO(file.read())
-    if extension == "csv":
-        df = pd.read_csv(readable)
+    # An identical upload reuses the files already stored for it
+    digest = upload_digest(file, extension, force_casting)
+    duplicate = claim_duplicate(digest, name, extension)
+    if duplicate is not None:
+        return stored_response(*duplicate)
+
+    # Create a unique identifier, one for each sheet of a workbook
+    if extension == "xlsx":
+        try:
+            sheets = list_sheets(file)
+        except (BadZipFile, InvalidFileException):
+            return error400("Could not read the workbook")
+
+        if not sheets:
+            return error400("The file has no columns")
+
+        file_ids = generate_sheet_file_ids(name, extension, sheets)
     else:
-        df = pd.read_excel(readable)
+        file_ids = {None: generate_file_id(name, extension)}
+
+    # Ingest the file in the background, the job_id is used to follow it
+    if mode == "job":
+        jobs = start_jobs(file, extension, file_ids, force_casting, digest)
+        first_job = next(iter(jobs.values()))
+        response = {"file_id": first_job.file_id, "job_id": first_job.job_id}
+        if extension == "xlsx":
+            response["sheets"] = {
+                sheet: {"file_id": job.file_id, "job_id": job.job_id}
+                for sheet, job in jobs.items()
+            }
+
+        return Response(response, status=status.HTTP_202_ACCEPTED)
+
+    # Sheets are read row by row, each thread opening the workbook from disk or memory
+    if extension == "xlsx":
+        if hasattr(file, "temporary_file_path"):
+            source = Path(file.temporary_file_path())
+        else:
+            file.seek(0)
+            source = file.read()
+
+        try:
+            sheet_errors = stream_workbook(source, file_ids, force_casting)
+        except ValidationError as e:
+            return error400(e.message)
+
+        for sheet, file_id in file_ids.items():
+            register_upload(digest, file_id, sheet_errors[sheet], sheet, len(file_ids))
+
+        return stored_response(file_ids, sheet_errors)
+
+    file_id = file_ids[None]
+
+    # Big files are stored chunk by chunk to keep memory bounded
+    if hasattr(file, "temporary_file_path"):
+        chunks = read_chunks(file, extension, settings.INGEST_CHUNK_ROWS)
+        try:
+            errors = stream_data(file_id, chunks, force_casting)
+        except ValidationError as e:
+            return error400(e.message)
 
-    # Get force casting options
-    force_casting = get_force_casting(req)
+    else:
+        # Create the pandas dataframe
+        df = pd.read_csv(BytesIO(file.read()))
 
-    # Process the data frame
-    df, errors = infer_and_convert_data_types(df, force_casting)
+        # Process the data frame
+        df, errors = infer_and_convert_data_types(df, force_casting)
 
-    # Create a unique identifier
-    file_id = f"{name}-{int(time() * 100)}.{extension}"
+        # Save data into db
+        create_data(file_id, df)
 
-    # Save data into db
-    create_data(file_id, df)
+    register_upload(digest, file_id, errors)
 
     # file_id can later be used to retrieve the data
-    return Response({"file_id": file_id, "errors": errors})
+    return stored_response(file_ids, {None: errors})
 
 
 @api_view(["GET"])
+def job_status(req: Request) -> Response:
+    """Get the state of a file ingested in the background.
+
+    Args:
+        req (Request):
+            The request object from the user.
+            It should contain the query parameter job_id returned by `process-file`.
+
+    Returns:
+        Response:
+            A json response containing the state of the job, the amount of rows already
+            ingested, the force casting errors and why it failed, if it did.
+    """
+
+    job = IngestJob.objects.filter(job_id=req.query_params.get("job_id")).first()
+    if job is None:
+        return error400("job not found")
+
+    return Response(IngestJobSerializer(job).data)
+
+
+@api_view(["GET"])
+@renderer_classes(
+    [*api_settings.DEFAULT_RENDERER_CLASSES, NumpyJSONRenderer, *binary_renderers()]
+)
 def get_data(req: Request) -> Response:
     """Get data from the database and return it in a json format.
 
@@ -83,10 +232,17 @@ def get_data(req: Request) -> Response:
             - page: The page number to return
             - sort_by: The column to sort by
             - asc: Whether to sort in ascending order
+            - cursor: Optionally, a cursor from a previous response, or empty for the
+                first page, to paginate with `next_cursor` and `prev_cursor` instead of `page`
+            - format: "rows" (default), a list of rows, or "columnar", a `row_index` list
+                and a list of values per column
 
     Returns:
         Response:
             A json response containing the data from the database formatted to be easy to display by the frontend.
+            It is rendered faster, to the same bytes, with `Accept: application/vnd.rhombus.numpy+json`,
+            and to Arrow or MessagePack with `Accept: application/vnd.apache.arrow.stream`
+            or `application/msgpack`, when `pyarrow` or `msgpack` is installed.
     """
 
     # Get the request and ensure it is valid
@@ -100,53 +256,252 @@ def get_data(req: Request) -> Response:
     page = request_query["page"]
     sort_by = request_query["sort_by"]
 
-    # Get the tables associated with the file
-    table_cols_models = TableCol.objects.filter(file_id=file_id)
-    cols = TableColSerializer(list(table_cols_models)).data
-
-    # Get all data from those columns
-    filtered_data_models = GenericData.get_objects_by_columns(cols)
+    # Pages of the page number are cached until their file changes, cursors are not
+    page_cache = None if "cursor" in request_query else get_page_cache()
+    if page_cache is not None:
+        cached = page_cache.get(request_query)
+        if cached is not None:
+            return Response(cached)
+
+    # Get the columns of the file, loaded once by the schema registry and checked by the serializer
+    schema = serialized_request.schema
+    table_cols_models = schema.table_cols
+    cols = schema.cols()
+
+    # Sort and slice the data from the column cache, or the engine that stores it
+    source = ColumnCache.open(file_id) or file_engine(table_cols_models)
+    if schema.file_meta is not None:
+        total_rows = schema.file_meta.rows
+    else:
+        # Files still being ingested are counted
+        total_rows = source.total_rows(file_id, cols)
+    rows = source.page(
+        cols, request_query, None if schema.file_meta is None else total_rows
+    )
 
-    # count the total amount of data
-    total_filtered_models = filtered_data_models.count()
+    # Keyset pagination answers with the cursors of the pages around
+    cursors = {}
+    if "cursor" in request_query:
+        cursors = page_cursors(source, cols, request_query, rows)
 
-    # Sort and slice the data
-    if sort_by == "row_index":
-        sorted_data_models = GenericData.slice_and_sort_by_row(
-            filtered_data_models, len(cols), request_query
-        )
-        rows = GenericDataSerializer(
-            list(sorted_data_models), num_of_cols=len(cols)
-        ).data["rows"]
+    # Cleanup internal ids
+    for _, col in cols.items():
+        col.pop("id")
 
+    # The columnar format sends a list per column instead of a dictionary per row
+    if request_query["format"] == "columnar":
+        row_index, values = columnar_rows(rows, list(cols))
+        page_data = {"row_index": row_index, "values": values}
     else:
-        sorted_sliced_col_data_models = GenericData.slice_and_sort_by_col(
-            filtered_data_models, cols, request_query
-        )
+        page_data = {"rows": rows}
+
+    response = {
+        "cols": cols,
+        **page_data,
+        "total_rows": total_rows,
+        "page": page,
+        "page_size": page_size,
+        **cursors,
+    }
+    if page_cache is not None and schema.file_meta is not None:
+        # Pages of a file still being ingested are not final, and the invalidation of
+        # its last chunk only reaches the cache of the process that ingests it
+        page_cache.set(request_query, response)
+
+    return Response(response)
+
+
+@api_view(["GET"])
+def page_cache_stats(req: Request) -> Response:
+    """Get the counters of the cache of `get-data` responses of this process.
+
+    Args:
+        req (Request): The request object from the user.
+
+    Returns:
+        Response:
+            The backend of the cache, its hits, misses, stores and evictions,
+            and the bytes it keeps, or a 400 when `PAGE_CACHE` is "off".
+    """
+
+    page_cache = get_page_cache()
+    if page_cache is None:
+        return error400("the page cache is off")
+
+    return Response(page_cache.stats())
+
+
+@api_view(["DELETE"])
+def delete_file(req: Request) -> Response:
+    """Delete a stored file.
+
+    Args:
+        req (Request):
+            The request object from the user.
+            It should contain the query parameter file_id.
+
+    Returns:
+        Response:
+            An empty response. Each upload of an identical file gets its own file_id,
+            which only drops its own reference, and the data is only deleted once
+            every upload deleted its file_id.
+    """
+
+    if not release_file(req.query_params.get("file_id")):
+        return error400("file not found")
+
+    return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+@api_view(["POST"])
+def upload_init(req: Request) -> Response:
+    """Start a resumable upload, whose file is then sent in chunks with `upload-append`.
+
+    Args:
+        req (Request):
+            The request object from the user.
+            It should contain the "file_name" and the "cast-col-*" fields.
+
+    Returns:
+        Response:
+            A json response containing the upload_id and the offset of the first chunk.
+            A `.csv` file is ingested as its chunks arrive, so it also contains
+            the file_id and the job_id to follow it in `job-status`.
+    """
+
+    file_name = req.data.get("file_name")
+    if not isinstance(file_name, str):
+        return error400("no file name")
 
-        sorted_row_indexes = [
-            GenericDataSerializer(col_data_model).data["row_index"]
-            for col_data_model in sorted_sliced_col_data_models
-        ]
+    file_name_error = check_file_name(file_name)
+    if file_name_error is not None:
+        return error400(file_name_error)
+
+    name, extension = file_name.split(".")
+    upload = start_upload(file_name, name, extension, get_force_casting(req))
+
+    response = {"upload_id": upload.upload_id, "offset": 0}
+    if upload.job_id is not None:
+        response["file_id"] = upload.file_id
+        response["job_id"] = upload.job_id
+
+    return Response(response, status=status.HTTP_201_CREATED)
+
+
+@api_view(["POST"])
+def upload_append(req: Request) -> Response:
+    """Append a chunk to a resumable upload.
+
+    Args:
+        req (Request):
+            The request object from the user.
+            It should contain the header "Content-Type": "multipart/form-data"
+            where we can find the "upload_id", the "offset" of the chunk in the file
+            and the "chunk" itself.
+
+    Returns:
+        Response:
+            A json response containing the offset of the next chunk.
+            When the offset is not where the received bytes end, nothing is appended
+            and a 409 response contains the offset to resume from.
+    """
 
-        row_filtered_data_models = filtered_data_models.filter(
-            row__in=sorted_row_indexes
+    upload = ChunkedUpload.objects.filter(upload_id=req.data.get("upload_id")).first()
+    if upload is None:
+        return error400("upload not found")
+
+    chunk = req.FILES.get("chunk")
+    if not isinstance(chunk, UploadedFile):
+        return error400("no chunk uploaded")
+
+    try:
+        offset = int(req.data.get("offset"))
+    except (TypeError, ValueError):
+        return error400("offset must be an integer")
+
+    try:
+        offset = append_chunk(upload, offset, chunk)
+    except OffsetMismatch as e:
+        return Response(
+            {"error": f"Chunk does not start at {e.offset}", "offset": e.offset},
+            status=status.HTTP_409_CONFLICT,
         )
+    except ValidationError as e:
+        return error400(e.message)
 
-        rows = GenericDataSerializer(
-            list(row_filtered_data_models), row_order=sorted_row_indexes
-        ).data["rows"]
+    return Response({"upload_id": upload.upload_id, "offset": offset})
 
-    # Cleanup internal ids
-    for _, col in cols.items():
-        col.pop("id")
+
+@api_view(["GET"])
+def upload_status(req: Request) -> Response:
+    """Get how much of a resumable upload was received, to resume it.
+
+    Args:
+        req (Request):
+            The request object from the user.
+            It should contain the query parameter upload_id.
+
+    Returns:
+        Response:
+            A json response containing the offset of the next chunk and whether
+            the upload was finalized.
+    """
+
+    upload = ChunkedUpload.objects.filter(
+        upload_id=req.query_params.get("upload_id")
+    ).first()
+    if upload is None:
+        return error400("upload not found")
 
     return Response(
         {
-            "cols": cols,
-            "rows": rows,
-            "total_rows": int(total_filtered_models / len(cols)),
-            "page": page,
-            "page_size": page_size,
+            "upload_id": upload.upload_id,
+            "offset": upload.size or received_bytes(upload),
+            "finalized": upload.size is not None,
         }
     )
+
+
+@api_view(["POST"])
+def upload_finalize(req: Request) -> Response:
+    """Finish a resumable upload and ingest its file.
+
+    Args:
+        req (Request):
+            The request object from the user.
+            It should contain the "upload_id" and the "size" of the whole file.
+            An optional "mode" field works as in `process-file`.
+
+    Returns:
+        Response:
+            A `.csv` file is already being ingested, so it gets the file_id and job_id.
+            Any other file is handed to `process-file` and gets its response.
+    """
+
+    upload = ChunkedUpload.objects.filter(upload_id=req.data.get("upload_id")).first()
+    if upload is None:
+        return error400("upload not found")
+
+    mode = req.data.get("mode", "sync")
+    if mode not in MODES:
+        return error400(f"Mode '{mode}' not supported")
+
+    try:
+        finalize_upload(upload, int(req.data.get("size")))
+    except (TypeError, ValueError):
+        return error400("size must be an integer")
+    except ValidationError as e:
+        return error400(e.message)
+
+    if upload.job_id is not None:
+        return Response(
+            {"file_id": upload.file_id, "job_id": upload.job_id},
+            status=status.HTTP_202_ACCEPTED,
+        )
+
+    file = SpooledUpload(upload)
+    try:
+        return ingest_file(file, mode, upload.force_casting)
+    finally:
+        file.close()
+        file.path.unlink(missing_ok=True)
@@ -64,6 +64,9 @@ MIDDLEWARE = [
 
 CORS_ALLOWED_ORIGINS = ["http://localhost:3000"]
 
+# `format` is a query parameter of `get-data`, renderers are only chosen with `Accept`
+REST_FRAMEWORK = {"URL_FORMAT_OVERRIDE": None}
+
 ROOT_URLCONF = "backend.urls"
 
 TEMPLATES = [
@@ -92,6 +95,13 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        "OPTIONS": {
+            # Background ingestion writes while requests read, so readers must not
+            # block on writers and writers must wait for each other
+            "init_command": "PRAGMA journal_mode=WAL;",
+            "transaction_mode": "IMMEDIATE",
+            "timeout": 30,
+        },
     }
 }
 
@@ -136,3 +146,65 @@ STATIC_URL = "static/"
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+
+
+# File ingestion
+
+# Number of file rows parsed, converted and stored at a time when streaming an upload
+INGEST_CHUNK_ROWS = int(os.environ.get("INGEST_CHUNK_ROWS", 50_000))
+
+# Number of cells inserted between two commits when a file is loaded outside of a single transaction
+INGEST_COMMIT_ROWS = int(os.environ.get("INGEST_COMMIT_ROWS", 500_000))
+
+# Number of threads that ingest files in the background, and where their uploads wait for them
+INGEST_JOB_WORKERS = int(os.environ.get("INGEST_JOB_WORKERS", 2))
+INGEST_SPOOL_DIR = BASE_DIR / "spool"
+
+# Resumable uploads: how often a file still arriving is checked for new bytes, and
+# after how long without any it is considered abandoned
+UPLOAD_POLL_SECONDS = float(os.environ.get("UPLOAD_POLL_SECONDS", 0.5))
+UPLOAD_IDLE_TIMEOUT = int(os.environ.get("UPLOAD_IDLE_TIMEOUT", 3600))
+
+# Seconds after which a queued or running ingestion job that was not updated is
+# considered left behind by a stopped process, see `clean_uploads`. Longer than
+# UPLOAD_IDLE_TIMEOUT, as a job parsing a resumable upload waits that long for its bytes
+INGEST_JOB_STALE_TIMEOUT = int(os.environ.get("INGEST_JOB_STALE_TIMEOUT", 7200))
+
+# Number of threads that parse resumable uploads while their chunks arrive, apart from the
+# ingestion jobs as they spend most of their time waiting for the client
+UPLOAD_PARSE_WORKERS = int(os.environ.get("UPLOAD_PARSE_WORKERS", 2))
+
+# The storage engine of the cells of new files, "rows" (`GenericData`), "typed" or "columnar",
+# and where the columnar engine keeps its segments
+STORAGE_ENGINE = os.environ.get("STORAGE_ENGINE", "rows")
+COLUMN_STORE_DIR = BASE_DIR / "column_store"
+
+# Whether pages are served from a memory mapped copy of the columns of every file,
+# written while it is ingested, and where it is kept
+COLUMN_CACHE = os.environ.get("COLUMN_CACHE", "true") == "true"
+COLUMN_CACHE_DIR = BASE_DIR / "column_cache"
+
+# Where `get-data` responses are cached: "locmem" (each process), "sqlite" (a file shared
+# by every worker of the machine) or "off", the bytes of responses kept before the least
+# recently used ones are evicted, and the file of the "sqlite" cache
+PAGE_CACHE = os.environ.get("PAGE_CACHE", "locmem")
+PAGE_CACHE_MAX_BYTES = int(os.environ.get("PAGE_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+PAGE_CACHE_PATH = BASE_DIR / "page_cache.sqlite3"
+
+# Seconds a hit of the "sqlite" page cache does not write when a page was last used, so
+# hits are reads and the least recently used order is only as precise as that
+PAGE_CACHE_TOUCH_SECONDS = float(os.environ.get("PAGE_CACHE_TOUCH_SECONDS", 60))
+
+# Number of files whose columns each process keeps in memory, instead of querying them in every request
+SCHEMA_REGISTRY_MAX_FILES = int(os.environ.get("SCHEMA_REGISTRY_MAX_FILES", 1024))
+
+# Number of threads that ingest the sheets of a workbook at the same time
+INGEST_SHEET_WORKERS = int(os.environ.get("INGEST_SHEET_WORKERS", 4))
+
+# Number of processes that infer the types of the columns of big files
+INFERENCE_PROCESSES = int(
+    os.environ.get("INFERENCE_PROCESSES", min(4, os.cpu_count() or 1))
+)
+
+# Whether text columns try every type on a sample before parsing the whole column
+INFERENCE_SAMPLING = os.environ.get("INFERENCE_SAMPLING", "true") == "true"